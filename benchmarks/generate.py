@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Gerador de repositórios sintéticos para os benchmarks do ChromaGit.
+
+Cria uma árvore de arquivos determinística (mesma semente = mesmos arquivos)
+com quantidade, distribuição de tamanhos, profundidade, proporção de binários
+e arquivos ignorados configuráveis, e opcionalmente um histórico de commits
+feito com as funções de obj/ (init, add, commit).
+"""
+
+import io
+import os
+import sys
+import math
+import json
+import random
+import argparse
+import contextlib
+from pathlib import Path
+
+# Os módulos de obj/ importam uns aos outros pelo nome (ex: from journal import ...)
+_obj_dir = Path(__file__).resolve().parent.parent / "obj"
+sys.path.insert(0, str(_obj_dir))
+
+TEXT_EXTENSIONS = ['.py', '.txt', '.md', '.json', '.csv']
+BINARY_EXTENSION = '.dat'
+IGNORED_EXTENSION = '.log'
+IGNORED_DIR = 'build'
+WRITE_BLOCK = 1024 * 1024
+PATCH_SIZE = 4096  # Alteração local em arquivos grandes (exercita delta e chunks)
+CORPUS_SIZE = 1024 * 1024
+VOCABULARY_SIZE = 2000
+
+DEFAULT_PARAMS = {
+    'files': 1000,
+    'median_size': 4096,        # Tamanhos seguem uma lognormal com esta mediana
+    'size_sigma': 1.5,
+    'max_size': 8 * 1024 * 1024,
+    'depth': 3,
+    'fanout': 6,                # Subpastas por pasta
+    'binary_ratio': 0.1,
+    'ignored_ratio': 0.05,      # Arquivos que caem nos padrões do .gitignore
+    'ignore_patterns': [f'*{IGNORED_EXTENSION}', f'{IGNORED_DIR}/'],
+    'commits': 5,
+    'change_ratio': 0.05,       # Fração dos arquivos alterada a cada commit do histórico
+    'seed': 42,
+}
+
+# Função para completar parâmetros com os valores padrão
+def resolve_params(params=None):
+    resolved = dict(DEFAULT_PARAMS)
+    resolved.update({key: value for key, value in (params or {}).items() if value is not None})
+    return resolved
+
+# Função para criar o texto de onde saem os arquivos de texto (comprimível, como código)
+def _make_corpus(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz_'
+    vocabulary = [''.join(rng.choices(letters, k=rng.randint(2, 10))) for _ in range(VOCABULARY_SIZE)]
+    lines = []
+    size = 0
+    while size < CORPUS_SIZE:
+        line = ' '.join(rng.choices(vocabulary, k=rng.randint(3, 14)))
+        lines.append(line)
+        size += len(line) + 1
+    return ('\n'.join(lines) + '\n').encode('ascii')
+
+def _write_text(f, size, rng, corpus):
+    while size > 0:
+        start = rng.randrange(len(corpus))
+        piece = corpus[start:start + min(size, WRITE_BLOCK)]
+        f.write(piece)
+        size -= len(piece)
+
+def _write_binary(f, size, rng):
+    while size > 0:
+        block = min(size, WRITE_BLOCK)
+        f.write(rng.getrandbits(block * 8).to_bytes(block, 'little'))
+        size -= block
+
+def _file_size(rng, params):
+    size = rng.lognormvariate(math.log(max(params['median_size'], 1)), params['size_sigma'])
+    return max(0, min(int(size), params['max_size']))
+
+def _directories(params):
+    directories = [Path('.')]
+    level = [Path('.')]
+    for depth in range(params['depth']):
+        level = [parent / f"dir{depth}_{index}" for parent in level for index in range(params['fanout'])]
+        directories.extend(level)
+    return directories
+
+# Função para gerar a árvore de arquivos
+def generate_tree(path, params=None):
+    """Retorna o resumo da árvore: arquivos e bytes gerados e os rastreados (fora do .gitignore)"""
+    params = resolve_params(params)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(params['seed'])
+    corpus = _make_corpus(rng)
+    directories = _directories(params)
+
+    with open(path / '.gitignore', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(params['ignore_patterns']) + '\n')
+
+    summary = {'files': 0, 'bytes': 0, 'tracked_files': 0, 'tracked_bytes': 0}
+    for index in range(params['files']):
+        directory = rng.choice(directories)
+        ignored = rng.random() < params['ignored_ratio']
+        binary = rng.random() < params['binary_ratio']
+        if ignored and rng.random() < 0.5:
+            directory = directory / IGNORED_DIR
+            extension = rng.choice(TEXT_EXTENSIONS)
+        elif ignored:
+            extension = IGNORED_EXTENSION
+        else:
+            extension = BINARY_EXTENSION if binary else rng.choice(TEXT_EXTENSIONS)
+        size = _file_size(rng, params)
+
+        file_path = path / directory / f"file_{index:06d}{extension}"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'wb') as f:
+            if binary and not ignored:
+                _write_binary(f, size, rng)
+            else:
+                _write_text(f, size, rng, corpus)
+
+        summary['files'] += 1
+        summary['bytes'] += size
+        if not ignored:
+            summary['tracked_files'] += 1
+            summary['tracked_bytes'] += size
+    return summary
+
+# Função para listar os arquivos rastreados da árvore gerada
+def _tracked_files(path):
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(name for name in dirs if name not in ('.chromagit', IGNORED_DIR))
+        files.extend(Path(root) / name for name in sorted(names)
+                     if not name.endswith(IGNORED_EXTENSION) and name != '.gitignore')
+    return files
+
+# Função para alterar uma fração dos arquivos rastreados
+def mutate_tree(path, params=None, round_number=1):
+    """Arquivos pequenos são reescritos; nos grandes um trecho de PATCH_SIZE bytes
+    é sobrescrito, como uma edição local. Retorna (arquivos alterados, bytes gravados)."""
+    params = resolve_params(params)
+    rng = random.Random(params['seed'] * 1000003 + round_number)
+    corpus = _make_corpus(random.Random(params['seed']))
+    files = _tracked_files(path)
+    if not files:
+        return 0, 0
+    count = max(1, int(len(files) * params['change_ratio']))
+    written = 0
+    for file_path in rng.sample(files, min(count, len(files))):
+        binary = file_path.suffix == BINARY_EXTENSION
+        size = file_path.stat().st_size
+        if size <= 2 * PATCH_SIZE:
+            with open(file_path, 'wb') as f:
+                size = max(size, 1)
+                if binary:
+                    _write_binary(f, size, rng)
+                else:
+                    _write_text(f, size, rng, corpus)
+            written += size
+        else:
+            with open(file_path, 'r+b') as f:
+                f.seek(rng.randrange(size - PATCH_SIZE))
+                if binary:
+                    _write_binary(f, PATCH_SIZE, rng)
+                else:
+                    _write_text(f, PATCH_SIZE, rng, corpus)
+            written += PATCH_SIZE
+    return min(count, len(files)), written
+
+# Opções do add usadas pelos benchmarks: inclui binários, varre sem o watcher e
+# aceita arquivos já em staging (como add -b --full-scan -f)
+ADD_OPTIONS = {'include_binary': True, 'use_watcher': False, 'log_files': False, 'force_conflicts': True}
+COMMIT_OPTIONS = {'interactive': False, 'author': 'benchmark', 'email': 'benchmark@example.com'}
+
+# Função para criar o histórico: rounds commits, cada um alterando change_ratio dos arquivos
+def build_history(path, params=None, rounds=None, first_round=1):
+    """Executa init (se preciso), add e commit pelas funções de obj/, com a saída descartada"""
+    from init import init
+    from add import add
+    from commit import commit
+
+    params = resolve_params(params)
+    path = Path(path).resolve()
+    rounds = params['commits'] if rounds is None else rounds
+    saved_cwd = os.getcwd()
+    output = io.StringIO()
+    try:
+        os.chdir(path)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            if not (path / '.chromagit').is_dir():
+                init(str(path))
+            for round_number in range(first_round, first_round + rounds):
+                # O primeiro commit de um repositório novo grava a árvore como foi gerada
+                if (path / '.chromagit' / 'commits.idx').exists():
+                    mutate_tree(path, params, round_number)
+                if not add(['.'], dict(ADD_OPTIONS)):
+                    raise RuntimeError(f"add falhou no commit {round_number}:\n{output.getvalue()[-2000:]}")
+                if not commit(f"Commit sintético {round_number}", dict(COMMIT_OPTIONS)):
+                    raise RuntimeError(f"commit falhou no commit {round_number}:\n{output.getvalue()[-2000:]}")
+    finally:
+        os.chdir(saved_cwd)
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Gera um repositório sintético para benchmarks do ChromaGit')
+    parser.add_argument('path', help='Pasta de destino (criada se não existir)')
+    parser.add_argument('-n', '--files', type=int, help=f"Número de arquivos (padrão: {DEFAULT_PARAMS['files']})")
+    parser.add_argument('--median-size', type=int, help='Tamanho mediano dos arquivos em bytes')
+    parser.add_argument('--size-sigma', type=float, help='Dispersão da distribuição lognormal de tamanhos')
+    parser.add_argument('--max-size', type=int, help='Tamanho máximo de um arquivo em bytes')
+    parser.add_argument('--depth', type=int, help='Profundidade das pastas')
+    parser.add_argument('--fanout', type=int, help='Subpastas por pasta')
+    parser.add_argument('--binary-ratio', type=float, help='Fração de arquivos binários (0 a 1)')
+    parser.add_argument('--ignored-ratio', type=float, help='Fração de arquivos ignorados pelo .gitignore (0 a 1)')
+    parser.add_argument('--ignore-pattern', action='append', dest='ignore_patterns',
+                        help='Padrão do .gitignore (pode repetir; padrão: *.log e build/)')
+    parser.add_argument('-c', '--commits', type=int, default=0,
+                        help='Commits de histórico feitos com o ChromaGit (padrão: 0, só a árvore)')
+    parser.add_argument('--change-ratio', type=float, help='Fração dos arquivos alterada a cada commit')
+    parser.add_argument('--seed', type=int, help='Semente (mesma semente gera os mesmos arquivos)')
+
+    args = parser.parse_args()
+    params = resolve_params({key: value for key, value in vars(args).items() if key != 'path'})
+
+    summary = generate_tree(args.path, params)
+    if params['commits']:
+        build_history(args.path, params)
+    summary['commits'] = params['commits']
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
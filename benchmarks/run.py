@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de escala do ChromaGit.
+
+Cada cenário gera um repositório sintético (generate.py) e mede init, add,
+commit, log, status e push (para um remoto em pasta local) chamando as funções
+de obj/. Cada etapa roda em um processo próprio, para que o pico de memória
+(RSS) seja o da etapa e não o acumulado do benchmark. O resultado é gravado em
+JSON; o modo compare aponta regressões em relação a um resultado de referência.
+
+Uso:
+    python benchmarks/run.py run [-s small -s medium] [-o resultado.json] [--baseline ref.json]
+    python benchmarks/run.py compare resultado.json ref.json [--threshold 0.15]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import statistics
+import contextlib
+import subprocess
+import multiprocessing
+from pathlib import Path
+
+_bench_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(_bench_dir))
+sys.path.insert(0, str(_bench_dir.parent / "obj"))
+
+from generate import resolve_params, generate_tree, mutate_tree, build_history, ADD_OPTIONS, COMMIT_OPTIONS
+from ui import LazyConsole
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+RESULTS_DIR = _bench_dir / 'results'
+RESULT_VERSION = 1
+DEFAULT_THRESHOLD = 0.15    # Mais de 15% pior que a referência é regressão
+MIN_SECONDS = 0.05          # Diferenças de tempo menores que isso são ignoradas
+MIN_RSS_MB = 8.0            # Diferenças de memória menores que isso são ignoradas
+
+# Cenários: parâmetros do gerador (ver generate.DEFAULT_PARAMS)
+SCENARIOS = {
+    'small': {'files': 1000, 'median_size': 4096, 'depth': 3, 'commits': 10},
+    'medium': {'files': 20000, 'median_size': 4096, 'depth': 4, 'commits': 20},
+    'large': {'files': 100000, 'median_size': 2048, 'depth': 5, 'fanout': 5, 'commits': 30,
+              'change_ratio': 0.01},
+    'bigfiles': {'files': 6, 'median_size': 96 * 1024 * 1024, 'size_sigma': 0.4,
+                 'max_size': 256 * 1024 * 1024, 'binary_ratio': 0.3, 'ignored_ratio': 0.0,
+                 'depth': 1, 'commits': 3, 'change_ratio': 0.5},
+}
+
+# Etapas, na ordem em que rodam. Cada uma retorna (arquivos, bytes) processados,
+# usados para calcular arquivos/s e MB/s. A preparação (opcional) roda antes, no
+# processo principal, e pode acrescentar dados ao contexto das etapas seguintes.
+def _step_init(repo_path, context):
+    from init import init
+    if not init(str(repo_path)):
+        raise RuntimeError("init falhou")
+    return 0, 0
+
+def _step_add_initial(repo_path, context):
+    from add import add
+    if not add(['.'], dict(ADD_OPTIONS)):
+        raise RuntimeError("add falhou")
+    return context['tracked_files'], context['tracked_bytes']
+
+def _step_commit_initial(repo_path, context):
+    from commit import commit
+    if not commit("Commit inicial do benchmark", dict(COMMIT_OPTIONS)):
+        raise RuntimeError("commit falhou")
+    return context['tracked_files'], context['tracked_bytes']
+
+def _step_history(repo_path, context):
+    # Preparação (não medida): commits - 1 commits alterando change_ratio dos arquivos
+    build_history(repo_path, context['params'], rounds=max(context['params']['commits'] - 1, 0), first_round=2)
+    return 0, 0
+
+def _step_add_unchanged(repo_path, context):
+    from add import add
+    add(['.'], dict(ADD_OPTIONS))
+    return context['tracked_files'], context['tracked_bytes']
+
+# Etapas incrementais contam só os arquivos e bytes alterados
+def _step_add_incremental(repo_path, context):
+    from add import add
+    if not add(['.'], dict(ADD_OPTIONS)):
+        raise RuntimeError("add falhou")
+    return context['changed']
+
+def _prepare_add_incremental(repo_path, context):
+    # Altera os arquivos no processo principal: a alteração não entra no tempo da etapa
+    context['changed'] = mutate_tree(repo_path, context['params'], round_number=context['params']['commits'] + 1)
+
+def _step_commit_incremental(repo_path, context):
+    from commit import commit
+    if not commit("Commit incremental do benchmark", dict(COMMIT_OPTIONS)):
+        raise RuntimeError("commit falhou")
+    return context['changed']
+
+def _step_log(repo_path, context):
+    from log import show_log
+    if not show_log(limit=context['params']['commits'] + 1):
+        raise RuntimeError("log falhou")
+    return 0, 0
+
+def _step_status(repo_path, context):
+    from status import show_status
+    show_status({'use_watcher': False})
+    return context['tracked_files'], context['tracked_bytes']
+
+def _step_push(repo_path, context):
+    from push import push
+    options = {'force': True, 'include_chromagit': False, 'project_name': 'benchmark'}
+    if not push(str(context['remote_path']), options):
+        raise RuntimeError("push falhou")
+    return context['tracked_files'], context['tracked_bytes']
+
+# (nome, função, medida, preparação)
+STEPS = [
+    ('init', _step_init, True, None),
+    ('add_initial', _step_add_initial, True, None),
+    ('commit_initial', _step_commit_initial, True, None),
+    ('history', _step_history, False, None),
+    ('add_incremental', _step_add_incremental, True, _prepare_add_incremental),
+    ('commit_incremental', _step_commit_incremental, True, None),
+    ('add_unchanged', _step_add_unchanged, True, None),
+    ('log', _step_log, True, None),
+    ('status', _step_status, True, None),
+    ('push', _step_push, True, None),
+    ('push_noop', _step_push, True, None),
+]
+
+# Função para obter o pico de memória do processo atual em MB (None se indisponível)
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# Função executada no processo de cada etapa
+def _run_step(name, repo_path, context, queue):
+    function = {step[0]: step[1] for step in STEPS}[name]
+    output = io.StringIO()
+    try:
+        os.chdir(repo_path)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            started = time.perf_counter()
+            files, size = function(repo_path, context)
+            finished = time.perf_counter()
+        queue.put({'seconds': finished - started, 'files': files, 'bytes': size, 'peak_rss_mb': peak_rss_mb()})
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}\n{output.getvalue()[-2000:]}"})
+
+# Função para executar uma etapa em um processo novo
+def measure_step(name, repo_path, context):
+    spawn = multiprocessing.get_context('spawn')
+    queue = spawn.Queue()
+    process = spawn.Process(target=_run_step, args=(name, str(repo_path), context, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f"Etapa {name}: {result['error']}")
+    seconds = result['seconds']
+    result['files_per_second'] = result['files'] / seconds if result['files'] and seconds else None
+    result['mb_per_second'] = result['bytes'] / 1024 / 1024 / seconds if result['bytes'] and seconds else None
+    return result
+
+# Função para executar um cenário uma vez
+def run_scenario(name, params, workdir):
+    scenario_path = Path(workdir) / name
+    if scenario_path.exists():
+        shutil.rmtree(scenario_path)
+    repo_path = scenario_path / 'repo'
+    remote_path = scenario_path / 'remote'
+    remote_path.mkdir(parents=True)
+
+    started = time.perf_counter()
+    summary = generate_tree(repo_path, params)
+    console.print(f'[blue]{name}: {summary["files"]} arquivos ({summary["bytes"] / 1024 / 1024:.1f} MB) '
+                  f'gerados em {time.perf_counter() - started:.1f}s[/blue]')
+
+    context = dict(summary, params=params, remote_path=str(remote_path))
+    steps = {}
+    for step_name, _, measured, prepare in STEPS:
+        if prepare is not None:
+            prepare(repo_path, context)
+        result = measure_step(step_name, repo_path, context)
+        if measured:
+            steps[step_name] = result
+            console.print(f'  {step_name:<20} {result["seconds"]:8.3f}s'
+                          + (f'  {result["peak_rss_mb"]:7.1f} MB RSS' if result['peak_rss_mb'] else ''))
+    return {'params': params, 'tree': summary, 'steps': steps}
+
+# Função para juntar repetições de um cenário: mediana de cada métrica
+def merge_runs(runs):
+    merged = dict(runs[0], repeat=len(runs))
+    merged['steps'] = {}
+    for step_name, first in runs[0]['steps'].items():
+        step = {}
+        for metric, value in first.items():
+            values = [run['steps'][step_name][metric] for run in runs]
+            step[metric] = statistics.median(values) if None not in values else None
+        merged['steps'][step_name] = step
+    return merged
+
+def _git_revision():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_bench_dir.parent,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+# Função para executar os cenários e gravar o resultado
+def run(scenarios, overrides=None, repeat=1, workdir=None, output=None, keep=False):
+    created_workdir = workdir is None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix='chromagit-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    results = {
+        'version': RESULT_VERSION,
+        'created_at': datetime.datetime.now().isoformat(),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scenarios': {}
+    }
+    try:
+        for name in scenarios:
+            params = resolve_params(dict(SCENARIOS.get(name, {}), **(overrides or {})))
+            runs = [run_scenario(name, params, workdir) for _ in range(repeat)]
+            results['scenarios'][name] = merge_runs(runs)
+    finally:
+        if created_workdir and not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    console.print(f'[green]Resultado gravado em {output}[/green]')
+    return results
+
+def _ratio(current, baseline):
+    if current is None or not baseline:
+        return None
+    return current / baseline
+
+# Função para comparar um resultado com a referência
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Retorna [(cenário, etapa, métrica, referência, atual, razão, situação)];
+    situação é 'regressão', 'melhora' ou 'ok'"""
+    rows = []
+    for scenario, data in current['scenarios'].items():
+        reference = baseline['scenarios'].get(scenario)
+        if reference is None:
+            continue
+        if reference.get('params') != data.get('params'):
+            console.print(f'[yellow]{scenario}: parâmetros diferentes da referência; comparação aproximada[/yellow]')
+        for step, metrics in data['steps'].items():
+            reference_metrics = reference['steps'].get(step)
+            if reference_metrics is None:
+                continue
+            for metric, minimum in (('seconds', MIN_SECONDS), ('peak_rss_mb', MIN_RSS_MB)):
+                value, reference_value = metrics.get(metric), reference_metrics.get(metric)
+                ratio = _ratio(value, reference_value)
+                if ratio is None:
+                    continue
+                if abs(value - reference_value) < minimum:
+                    status = 'ok'  # Diferença dentro do ruído de medição
+                elif ratio > 1 + threshold:
+                    status = 'regressão'
+                elif ratio < 1 - threshold:
+                    status = 'melhora'
+                else:
+                    status = 'ok'
+                rows.append((scenario, step, metric, reference_value, value, ratio, status))
+    return rows
+
+# Função para exibir a comparação; retorna False se houver regressões
+def show_comparison(current, baseline, threshold=DEFAULT_THRESHOLD):
+    from rich.table import Table
+
+    rows = compare(current, baseline, threshold)
+    if not rows:
+        console.print('[yellow]Nenhum cenário em comum com a referência.[/yellow]')
+        return True
+
+    table = Table(title=f"Comparação com a referência (limite: {threshold:.0%})")
+    table.add_column("Cenário", style="cyan")
+    table.add_column("Etapa", style="white")
+    table.add_column("Métrica", style="white")
+    table.add_column("Referência", justify="right")
+    table.add_column("Atual", justify="right")
+    table.add_column("Razão", justify="right")
+    table.add_column("Situação")
+    colors = {'regressão': 'red', 'melhora': 'green', 'ok': 'white'}
+    labels = {'seconds': 'tempo (s)', 'peak_rss_mb': 'RSS (MB)'}
+    for scenario, step, metric, reference_value, value, ratio, status in rows:
+        table.add_row(scenario, step, labels[metric], f"{reference_value:.3f}", f"{value:.3f}", f"{ratio:.2f}x",
+                      f"[{colors[status]}]{status}[/{colors[status]}]")
+    console.print(table)
+
+    regressions = [row for row in rows if row[6] == 'regressão']
+    if regressions:
+        console.print(f'[red]{len(regressions)} regressões acima de {threshold:.0%}.[/red]')
+        return False
+    console.print('[green]Nenhuma regressão.[/green]')
+    return True
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de escala do ChromaGit')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Executa os cenários e grava o resultado em JSON')
+    run_parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Cenário a executar (pode repetir; padrão: small)')
+    run_parser.add_argument('-o', '--output', help='Arquivo JSON de saída (padrão: benchmarks/results/bench_<data>.json)')
+    run_parser.add_argument('-r', '--repeat', type=int, default=1, help='Repetições de cada cenário (usa a mediana)')
+    run_parser.add_argument('--workdir', help='Pasta onde os repositórios são gerados (padrão: temporária)')
+    run_parser.add_argument('--keep', action='store_true', help='Mantém os repositórios gerados')
+    run_parser.add_argument('--baseline', help='Compara o resultado com este JSON de referência')
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Piora relativa considerada regressão (padrão: 0.15)')
+    run_parser.add_argument('-n', '--files', type=int, help='Sobrescreve o número de arquivos do cenário')
+    run_parser.add_argument('--median-size', type=int, help='Sobrescreve o tamanho mediano dos arquivos')
+    run_parser.add_argument('--depth', type=int, help='Sobrescreve a profundidade das pastas')
+    run_parser.add_argument('--binary-ratio', type=float, help='Sobrescreve a fração de binários')
+    run_parser.add_argument('--ignored-ratio', type=float, help='Sobrescreve a fração de arquivos ignorados')
+    run_parser.add_argument('-c', '--commits', type=int, help='Sobrescreve o número de commits do histórico')
+    run_parser.add_argument('--seed', type=int, help='Sobrescreve a semente do gerador')
+
+    compare_parser = subparsers.add_parser('compare', help='Compara um resultado com a referência')
+    compare_parser.add_argument('current', help='JSON do resultado atual')
+    compare_parser.add_argument('baseline', help='JSON de referência')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Piora relativa considerada regressão (padrão: 0.15)')
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        success = show_comparison(_load(args.current), _load(args.baseline), args.threshold)
+        sys.exit(0 if success else 1)
+
+    overrides = {key: getattr(args, key) for key in
+                 ('files', 'median_size', 'depth', 'binary_ratio', 'ignored_ratio', 'commits', 'seed')
+                 if getattr(args, key) is not None}
+    results = run(args.scenario or ['small'], overrides, max(args.repeat, 1), args.workdir, args.output, args.keep)
+    success = True
+    if args.baseline:
+        success = show_comparison(results, _load(args.baseline), args.threshold)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -55,6 +55,7 @@ class ChromaGitApp:
         menubar.add_cascade(label="Repositório", menu=repo_menu)
         repo_menu.add_command(label="Inicializar", command=self.init_repo)
         repo_menu.add_command(label="Status", command=self.show_status)
+        repo_menu.add_command(label="Detalhes do Commit", command=self.show_commit_details)
         repo_menu.add_separator()
         repo_menu.add_command(label="Fazer Push", command=self.push_repo)
         
@@ -287,6 +288,15 @@ class ChromaGitApp:
             target=lambda: self.run_chromagit_command("log", "--limit", "10")
         ).start()
     
+    def show_commit_details(self):
+        """Mostra os detalhes de um commit a partir do hash (completo ou abreviado)"""
+        commit_hash = tk.simpledialog.askstring("Detalhes do Commit",
+                                               "Hash do commit (pode ser abreviado):")
+        if commit_hash and commit_hash.strip():
+            threading.Thread(
+                target=lambda: self.run_chromagit_command("log", "--hash", commit_hash.strip())
+            ).start()
+    
     def show_status(self):
         """Mostra status detalhado"""
         threading.Thread(
@@ -3,16 +3,12 @@ import sys
 import subprocess
 import argparse
 from pathlib import Path
-from rich import print
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.columns import Columns
-from rich.text import Text
-from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
 import time
 
+# Tabelas, painéis, prompts e barras de progresso do rich são importados nas
+# funções que os usam, para não atrasar a execução direta de comandos
+
 console = Console()
 
 class ChromaGitCLI:
@@ -54,6 +50,9 @@ class ChromaGitCLI:
     
     def show_banner(self):
         """Exibe o banner do ChromaGit"""
+        from rich.text import Text
+        from rich.panel import Panel
+        
         banner_text = Text()
         banner_text.append("  ██████╗██╗  ██╗██████╗  ██████╗ ███╗   ███╗ █████╗  ██████╗ ██╗████████╗\n", style="bold blue")
         banner_text.append(" ██╔════╝██║  ██║██╔══██╗██╔═══██╗████╗ ████║██╔══██╗██╔════╝ ██║╚══██╔══╝\n", style="bold blue")
@@ -68,6 +67,8 @@ class ChromaGitCLI:
     
     def show_status_overview(self):
         """Exibe overview rápido do status"""
+        from rich.panel import Panel
+        
         try:
             # Verifica se está em um repositório ChromaGit
             chromagit_path = Path.cwd() / '.chromagit'
@@ -82,7 +83,7 @@ class ChromaGitCLI:
                         config = json.load(f)
                     
                     staged_count = len(config.get('staged', []))
-                    commits_count = len(config.get('commits', []))
+                    commits_count = config.get('metadata', {}).get('total_commits', len(config.get('commits', [])))
                     
                     info_panel = Panel(
                         f"{status_text}\n"
@@ -121,6 +122,8 @@ class ChromaGitCLI:
     
     def show_commands_table(self):
         """Exibe tabela de comandos disponíveis"""
+        from rich.table import Table
+        
         table = Table(title="Comandos Disponíveis", show_header=True, header_style="bold white")
         table.add_column("Comando", style="bold", width=12)
         table.add_column("Descrição", width=45)
@@ -140,6 +143,8 @@ class ChromaGitCLI:
     
     def show_quick_help(self):
         """Exibe ajuda rápida"""
+        from rich.panel import Panel
+        
         help_panel = Panel(
             "[white]Comandos rápidos:[/white]\n"
             "[cyan]chromagit init[/cyan] - Novo repositório\n"
@@ -173,6 +178,7 @@ class ChromaGitCLI:
             cmd_args = [str(exe_path)] + args
             
             # Exibe indicador de execução
+            from rich.progress import Progress, SpinnerColumn, TextColumn
             with Progress(
                 SpinnerColumn(),
                 TextColumn(f"[bold blue]Executando {command}..."),
@@ -203,6 +209,9 @@ class ChromaGitCLI:
     
     def interactive_mode(self):
         """Modo interativo do ChromaGit"""
+        from rich.columns import Columns
+        from rich.prompt import Prompt
+        
         self.show_banner()
         
         # Layout em colunas
@@ -290,6 +299,7 @@ class ChromaGitCLI:
             return
         
         if args.help:
+            from rich.panel import Panel
             self.show_banner()
             help_text = """
 [bold]USO:[/bold]
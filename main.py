@@ -9,23 +9,36 @@ Autor: ChromaGit Team
 Versão: 1.0.0
 """
 
+import time
+_startup_begin = time.perf_counter()
+
 import os
 import sys
 import subprocess
 import argparse
+import importlib
 from pathlib import Path
-from rich import print
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.columns import Columns
-from rich.text import Text
-from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
 import json
-import time
 
-console = Console()
+# Os módulos de obj/ importam uns aos outros pelo nome (ex: from journal import ...)
+_obj_dir = Path(__file__).parent / "obj"
+if Path(__file__).parent.name == "obj":
+    _obj_dir = Path(__file__).parent
+sys.path.insert(0, str(_obj_dir))
+
+# Componentes do rich são importados apenas nas funções que os usam, para que
+# comandos simples não paguem o custo de importação
+try:
+    from ui import LazyConsole
+    console = LazyConsole()
+except ImportError:
+    from rich.console import Console
+    console = Console()
+
+# Com CHROMAGIT_IMPORT_TIME=1 o tempo de inicialização é exibido ao fim do comando
+IMPORT_TIME_ENV = 'CHROMAGIT_IMPORT_TIME'
+STARTUP_BUDGET_MS = 150
+_startup_ms = (time.perf_counter() - _startup_begin) * 1000
 
 class ChromaGitMain:
     def __init__(self):
@@ -41,6 +54,7 @@ class ChromaGitMain:
             self.base_dir = self.base_dir.parent
         
         self.obj_dir = self.base_dir / "obj"
+        self.import_times = {'main.py': _startup_ms}
         
         # Configuração dos comandos
         self.commands = {
@@ -72,6 +86,13 @@ class ChromaGitMain:
                 'color': 'cyan',
                 'icon': '📊'
             },
+            'status': {
+                'script': 'status.py',
+                'exe': 'status.exe',
+                'description': 'Mostra arquivos modificados, em staging e não rastreados',
+                'color': 'yellow',
+                'icon': '🔄'
+            },
             'push': {
                 'script': 'push.py',
                 'exe': 'push.exe',
@@ -79,6 +100,41 @@ class ChromaGitMain:
                 'color': 'magenta',
                 'icon': '🚀'
             },
+            'repack': {
+                'script': 'repack.py',
+                'exe': 'repack.exe',
+                'description': 'Consolida objetos armazenados em packs',
+                'color': 'blue',
+                'icon': '📦'
+            },
+            'migrate-hash': {
+                'script': 'migrate_hash.py',
+                'exe': 'migrate_hash.exe',
+                'description': 'Troca o algoritmo de hash do repositório',
+                'color': 'blue',
+                'icon': '🔑'
+            },
+            'backup': {
+                'script': 'backup.py',
+                'exe': 'backup.exe',
+                'description': 'Lista, restaura e limpa backups do config.json',
+                'color': 'cyan',
+                'icon': '🗄'
+            },
+            'daemon': {
+                'script': 'daemon.py',
+                'exe': 'daemon.exe',
+                'description': 'Mantém o estado do repositório em memória',
+                'color': 'green',
+                'icon': '⚡'
+            },
+            'watch': {
+                'script': 'watch.py',
+                'exe': 'watch.exe',
+                'description': 'Registra arquivos alterados para add rápido',
+                'color': 'green',
+                'icon': '👁'
+            },
             'help': {
                 'script': 'help.py',
                 'exe': 'help.exe',
@@ -90,6 +146,9 @@ class ChromaGitMain:
     
     def show_banner(self):
         """Exibe o banner ASCII do ChromaGit"""
+        from rich.text import Text
+        from rich.panel import Panel
+        
         banner = Text()
         banner.append("  ██████╗██╗  ██╗██████╗  ██████╗ ███╗   ███╗ █████╗  ██████╗ ██╗████████╗\n", style="bold blue")
         banner.append(" ██╔════╝██║  ██║██╔══██╗██╔═══██╗████╗ ████║██╔══██╗██╔════╝ ██║╚══██╔══╝\n", style="bold blue")
@@ -125,7 +184,7 @@ class ChromaGitMain:
                 config = json.load(f)
             
             staged_count = len(config.get('staged', []))
-            commits_count = len(config.get('commits', []))
+            commits_count = config.get('metadata', {}).get('total_commits', len(config.get('commits', [])))
             remote_synced = config.get('metadata', {}).get('remote_synced', False)
             
             return {
@@ -146,6 +205,8 @@ class ChromaGitMain:
     
     def show_status_panel(self):
         """Exibe painel de status do repositório"""
+        from rich.panel import Panel
+        
         status = self.get_repository_status()
         
         if not status['is_repo']:
@@ -181,6 +242,8 @@ class ChromaGitMain:
     
     def show_quick_guide(self):
         """Exibe guia rápido de comandos"""
+        from rich.panel import Panel
+        
         return Panel(
             "[white]Comandos essenciais:[/white]\n"
             "[green]🏗️  python main.py init[/green] - Novo repositório\n"
@@ -197,6 +260,8 @@ class ChromaGitMain:
     
     def show_commands_table(self):
         """Exibe tabela completa de comandos"""
+        from rich.table import Table
+        
         table = Table(title="Comandos Disponíveis", show_header=True, header_style="bold white")
         table.add_column("Comando", style="bold", width=12)
         table.add_column("Descrição", width=40)
@@ -250,8 +315,68 @@ class ChromaGitMain:
         else:
             return None, None
     
+    def load_command_module(self, command):
+        """Importa (uma única vez) o módulo Python de um comando, ou None se não for possível"""
+        if os.environ.get('CHROMAGIT_SUBPROCESS') == '1' or command not in self.commands:
+            return None
+        script_path = self.obj_dir / self.commands[command]['script']
+        if not script_path.exists():
+            return None
+        
+        import_begin = time.perf_counter()
+        try:
+            module = importlib.import_module(script_path.stem)
+        except ImportError:
+            return None
+        self.import_times.setdefault(script_path.name, (time.perf_counter() - import_begin) * 1000)
+        return module if hasattr(module, 'main') else None
+    
+    def run_in_process(self, command, module, args):
+        """Executa main() do comando neste processo; retorna o código de saída"""
+        saved_argv = sys.argv
+        sys.argv = [str(self.obj_dir / self.commands[command]['script'])] + list(args)
+        try:
+            module.main()
+            return 0
+        except SystemExit as e:
+            # Mesma semântica do código de saída de um processo separado
+            if e.code is None:
+                return 0
+            if isinstance(e.code, int):
+                return e.code
+            console.print(f"[red]{e.code}[/red]")
+            return 1
+        finally:
+            sys.argv = saved_argv
+            # Grava os logs de operação agora, sem esperar o fim do processo
+            oplog = sys.modules.get('oplog')
+            if oplog is not None:
+                oplog.flush_all()
+    
+    def run_via_daemon(self, command, args):
+        """Encaminha o comando ao daemon do repositório; None se não houver daemon"""
+        try:
+            from daemon import run_via_daemon
+        except ImportError:
+            return None
+        return run_via_daemon(command, args)
+    
     def run_command(self, command, args):
         """Executa um comando ChromaGit"""
+        # Daemon em execução: estado do repositório já carregado em memória
+        exit_code = self.run_via_daemon(command, args)
+        if exit_code is not None:
+            return exit_code == 0
+        
+        # Caminho rápido: chama o comando diretamente, sem iniciar outro interpretador
+        module = self.load_command_module(command)
+        if module is not None:
+            try:
+                return self.run_in_process(command, module, args) == 0
+            except Exception as e:
+                console.print(f"[red]Erro ao executar '{command}': {e}[/red]")
+                return False
+        
         executable, mode = self.find_executable(command)
         
         if executable is None:
@@ -267,6 +392,7 @@ class ChromaGitMain:
                 cmd_args = [executable] + args
             
             # Indicador visual
+            from rich.progress import Progress, SpinnerColumn, TextColumn
             with Progress(
                 SpinnerColumn(),
                 TextColumn(f"[bold {self.commands[command]['color']}]Executando {command}..."),
@@ -275,12 +401,11 @@ class ChromaGitMain:
             ) as progress:
                 progress.add_task("running", total=None)
                 
-                # Executa comando
+                # Executa comando no diretório atual (o repositório do usuário)
                 result = subprocess.run(
                     cmd_args,
                     capture_output=False,
-                    text=True,
-                    cwd=str(self.base_dir)
+                    text=True
                 )
             
             return result.returncode == 0
@@ -289,6 +414,16 @@ class ChromaGitMain:
             console.print(f"[red]Erro ao executar '{command}': {e}[/red]")
             return False
     
+    def report_import_time(self):
+        """Exibe em stderr quanto tempo foi gasto importando módulos (CHROMAGIT_IMPORT_TIME=1)"""
+        total = sum(self.import_times.values())
+        for name, elapsed in self.import_times.items():
+            sys.stderr.write(f"[importação] {name}: {elapsed:.1f} ms\n")
+        sys.stderr.write(f"[importação] total: {total:.1f} ms (orçamento: {STARTUP_BUDGET_MS} ms)\n")
+        if total > STARTUP_BUDGET_MS:
+            sys.stderr.write("[importação] AVISO: orçamento de inicialização excedido; "
+                             "verifique imports pesados no topo dos módulos\n")
+    
     def show_available_commands(self):
         """Mostra comandos disponíveis quando comando inválido"""
         console.print("\n[yellow]Comandos disponíveis:[/yellow]")
@@ -298,6 +433,9 @@ class ChromaGitMain:
     
     def interactive_mode(self):
         """Modo interativo do ChromaGit"""
+        from rich.columns import Columns
+        from rich.prompt import Prompt
+        
         self.show_banner()
         
         # Layout em colunas
@@ -339,6 +477,7 @@ class ChromaGitMain:
                     status_panel = self.show_status_panel()
                     console.print(status_panel)
                     console.print()
+                    self.run_command('status', [])
                     continue
                 
                 # Parse comando
@@ -369,6 +508,8 @@ class ChromaGitMain:
     
     def show_help(self):
         """Exibe ajuda geral do main.py"""
+        from rich.panel import Panel
+        
         self.show_banner()
         
         help_content = f"""
@@ -384,7 +525,6 @@ class ChromaGitMain:
         help_content += f"""
 
 [bold]COMANDOS ESPECIAIS:[/bold]
-  [bold green]🔄 status[/bold green]     Exibe status detalhado do repositório
   [bold blue]🖥️  interactive[/bold blue] Inicia modo interativo
   [bold white]📖 help[/bold white]       Exibe esta ajuda
 
@@ -445,12 +585,6 @@ class ChromaGitMain:
             self.interactive_mode()
             return
         
-        # Comandos especiais
-        if args.command == 'status':
-            self.show_banner()
-            console.print(self.show_status_panel())
-            return
-        
         # Verificar se é um comando válido
         if args.command not in self.commands:
             console.print(f"[red]Erro: Comando '{args.command}' não encontrado ou não disponível.[/red]")
@@ -460,6 +594,8 @@ class ChromaGitMain:
         
         # Execução direta de comando
         success = self.run_command(args.command, args.args)
+        if os.environ.get(IMPORT_TIME_ENV) == '1':
+            self.report_import_time()
         sys.exit(0 if success else 1)
 
 def main():
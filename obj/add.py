@@ -1,25 +1,27 @@
 import os
 import json
+import tempfile
 import shutil
-import hashlib
 import datetime
 import argparse
 import sys
-import glob
 import time
-import stat
 from pathlib import Path
-from rich import print
-from rich.console import Console
-from rich.progress import track, Progress
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
-from rich.tree import Tree
-from collections import defaultdict
-import mimetypes
+from storage import store_object
+from compression import CompressionStats
+from index import FileIndex
+from hashing import calculate_file_hash, hash_files, repository_algorithm
+from staging import load_staged, save_staged
+from journal import iter_commits, ensure_migrated, load_head_tree
+from backup import create_snapshot
+from ignore import compile_ignore
+from walker import scan_files, stat_entry
+from oplog import get_logger
+from lock import locked
+from ui import LazyConsole
 
-console = Console()
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
 
 CHROMAGIT_DIR = '.chromagit'
 CONFIG_FILE = 'config.json'
@@ -28,27 +30,20 @@ GITIGNORE_FILE = '.gitignore'
 BACKUP_DIR = 'backup'
 LOGS_DIR = 'logs'
 TEMP_DIR = 'temp'
-MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+MAX_FILE_SIZE = None  # Sem limite: arquivos grandes são gravados em chunks (ver storage.py)
 BINARY_EXTENSIONS = {'.exe', '.dll', '.so', '.dylib', '.bin', '.zip', '.rar', '.7z', '.tar', '.gz'}
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.ico'}
 VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv'}
 AUDIO_EXTENSIONS = {'.mp3', '.wav', '.flac', '.aac', '.ogg'}
 
-# Função para calcular hash de arquivo (detecção de mudanças)
-def calculate_file_hash(file_path):
-    sha256_hash = hashlib.sha256()
+# Função para validar tamanho do arquivo (reaproveita o stat da varredura quando informado)
+def is_file_too_large(file_path, max_size=MAX_FILE_SIZE, file_stat=None):
     try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception:
-        return None
-
-# Função para validar tamanho do arquivo
-def is_file_too_large(file_path, max_size=MAX_FILE_SIZE):
-    try:
-        return file_path.stat().st_size > max_size
+        if max_size is None:
+            return False
+        if file_stat is None:
+            file_stat = file_path.stat()
+        return file_stat.st_size > max_size
     except Exception:
         return False
 
@@ -66,26 +61,17 @@ def is_binary_file(file_path):
 
 # Função para obter tipo MIME
 def get_file_type(file_path):
+    import mimetypes
     mime_type, _ = mimetypes.guess_type(str(file_path))
     return mime_type or 'unknown'
 
-# Função para criar backup antes de operações
+# Função para criar backup antes de operações (incremental, ver backup.py)
 def create_backup(config_path):
-    backup_path = config_path.parent / BACKUP_DIR
-    backup_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = backup_path / f"config_backup_{timestamp}.json"
-    shutil.copy2(config_path, backup_file)
-    return backup_file
+    return create_snapshot(config_path.parent, 'add')
 
-# Função para log de operações
-def log_operation(operation, details, chromagit_path):
-    logs_path = chromagit_path / LOGS_DIR
-    logs_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().isoformat()
-    log_file = logs_path / f"add_operations_{datetime.date.today()}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {operation}: {details}\n")
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path, per_file=False):
+    get_logger(chromagit_path, 'add').log(operation, details, per_file=per_file)
 
 # Função para validar permissões
 def check_file_permissions(file_path):
@@ -110,11 +96,23 @@ def find_repo_root(start_path=None):
     
     return None
 
-# Função para ler padrões do .gitignore
+# Matchers já compilados neste processo: {caminho do .gitignore: (stat, matcher)}
+_gitignore_cache = {}
+
+# Função para ler padrões do .gitignore e compilá-los em um matcher
 def read_gitignore(repo_path):
     gitignore_path = repo_path / GITIGNORE_FILE
+    try:
+        st = gitignore_path.stat()
+        key = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        key = None
+    cached = _gitignore_cache.get(str(gitignore_path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
     ignore_patterns = []
-    if gitignore_path.exists():
+    if key is not None:
         with open(gitignore_path, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
@@ -124,13 +122,13 @@ def read_gitignore(repo_path):
     # Adiciona padrões padrão do ChromaGit
     default_patterns = ['.chromagit', '*.tmp', '*.temp', '__pycache__', '*.pyc']
     ignore_patterns.extend(default_patterns)
-    return ignore_patterns
+    matcher = compile_ignore(ignore_patterns)
+    _gitignore_cache[str(gitignore_path)] = (key, matcher)
+    return matcher
 
-# Função para verificar se arquivo/pasta deve ser ignorado
-def is_ignored(path, ignore_patterns):
-    from fnmatch import fnmatch
-    path_str = str(path)
-    return any(fnmatch(path_str, pat) or fnmatch(path.name, pat) for pat in ignore_patterns)
+# Função para verificar se arquivo/pasta deve ser ignorado (inclui as pastas pai)
+def is_ignored(path, ignore_matcher, is_dir=False):
+    return ignore_matcher.match(path, is_dir=is_dir)
 
 # Função para expandir wildcards avançados
 def expand_wildcards(patterns, repo_path):
@@ -147,35 +145,29 @@ def expand_wildcards(patterns, repo_path):
     return expanded_paths
 
 # Função para detectar mudanças em arquivos já versionados
-def detect_file_changes(file_path, config):
-    rel_path = str(file_path.relative_to(Path.cwd()))
-    file_hash = calculate_file_hash(file_path)
+def detect_file_changes(file_path, chromagit_path, algorithm=None):
+    rel_path = file_path.relative_to(Path.cwd()).as_posix()
+    file_hash = calculate_file_hash(file_path, algorithm)
     
-    # Verifica se arquivo já foi commitado
-    for commit in config.get('commits', []):
+    # Verifica se arquivo já foi commitado (do commit mais recente para o mais antigo)
+    for commit in iter_commits(chromagit_path, reverse=True):
         if 'files' in commit:
             for committed_file in commit['files']:
                 if committed_file.get('path') == rel_path:
                     return committed_file.get('hash') != file_hash
     return True  # Arquivo novo
 
-# Função para compressão de arquivos (opcional)
-def compress_file(source, destination):
-    import gzip
-    with open(source, 'rb') as f_in:
-        with gzip.open(f"{destination}.gz", 'wb') as f_out:
-            shutil.copyfileobj(f_in, f_out)
-    return f"{destination}.gz"
-
 # Função para criar árvore de estrutura de pastas
 def create_folder_tree(paths):
+    from rich.tree import Tree
     tree = Tree("Arquivos/Pastas Adicionados")
     for path in sorted(paths):
         tree.add(str(path))
     return tree
 
 # Função para estatísticas de operação
-def calculate_statistics(files_added, folders_added, total_size, duration):
+def calculate_statistics(files_added, folders_added, total_size, duration, compression_stats=None):
+    from rich.table import Table
     stats = Table(title="Estatísticas da Operação")
     stats.add_column("Métrica", style="cyan")
     stats.add_column("Valor", style="green")
@@ -185,23 +177,32 @@ def calculate_statistics(files_added, folders_added, total_size, duration):
     stats.add_row("Tamanho total", f"{total_size / 1024 / 1024:.2f} MB")
     stats.add_row("Tempo de execução", f"{duration:.2f} segundos")
     stats.add_row("Velocidade média", f"{(total_size / 1024 / 1024) / duration:.2f} MB/s")
+    if compression_stats is not None and (compression_stats.compressed or compression_stats.skipped):
+        stats.add_row("Arquivos comprimidos", str(compression_stats.compressed))
+        stats.add_row("Sem compressão (incompressíveis)", str(compression_stats.skipped))
+        stats.add_row("Espaço economizado", f"{compression_stats.saved / 1024 / 1024:.2f} MB")
+        stats.add_row("Tempo de compressão", f"{compression_stats.seconds:.2f} segundos")
     
     return stats
 
 # Função para verificar conflitos com arquivos existentes
 def check_conflicts(files, config):
     conflicts = []
-    staged = set(config.get('staged', []))
+    staged = load_staged(config)
     
     for file in files:
-        rel_path = str(file.relative_to(Path.cwd()))
+        rel_path = file.relative_to(Path.cwd()).as_posix()
         if rel_path in staged:
             conflicts.append(rel_path)
     
     return conflicts
 
 # Função principal para adicionar arquivos/pastas ao staging e copiar para packages
+@locked()
 def add(paths, options=None):
+    from rich.progress import Progress
+    from rich.panel import Panel
+    
     if options is None:
         options = {}
     
@@ -222,16 +223,28 @@ def add(paths, options=None):
         console.print('[red]Repositório não inicializado! Execute o comando init primeiro.[/red]')
         return False
     
+    # Eventos por arquivo podem ser desligados com --no-file-log
+    get_logger(chromagit_path, 'add').per_file = options.get('log_files', True)
+    
     # Cria backup do config
     backup_file = create_backup(config_path)
-    console.print(f'[blue]Backup criado: {backup_file}[/blue]')
+    if backup_file is not None:
+        console.print(f'[blue]Backup criado: {backup_file.id}[/blue]')
     
-    # Carrega configuração
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    # Carrega configuração (commits antigos guardados no config.json vão para o journal)
+    config = ensure_migrated(chromagit_path)
+    algorithm = repository_algorithm(config)
     
     # Lê padrões do .gitignore
-    ignore_patterns = read_gitignore(repo_path)
+    ignore_matcher = read_gitignore(repo_path)
+    
+    # Com o watcher em execução, pastas são relidas apenas nos caminhos alterados desde o último add
+    dirty, watch_offset = None, None
+    if options.get('use_watcher', True):
+        from watch import snapshot
+        dirty, watch_offset = snapshot(chromagit_path)
+        if dirty is not None and options.get('verbose', False):
+            console.print(f'[blue]Watcher: {len(dirty)} caminhos alterados desde o último add[/blue]')
     
     # Garante que estruturas necessárias existam
     packages_path.mkdir(exist_ok=True)
@@ -245,10 +258,11 @@ def add(paths, options=None):
     else:
         expanded_paths = {repo_path / path for path in paths}
     
-    # Coleta arquivos e pastas válidos
-    files_to_add = set()
+    # Coleta arquivos e pastas válidos (caminho -> stat obtido na varredura)
+    files_to_add = {}
     folders_to_add = set()
     skipped_files = []
+    skipped_paths = []  # Caminhos relativos dos arquivos deixados de fora (o watcher volta a oferecê-los)
     total_size = 0
     
     with Progress() as progress:
@@ -261,7 +275,7 @@ def add(paths, options=None):
                 console.print(f'[yellow]Arquivo/pasta não encontrado: {path.relative_to(repo_path)}[/yellow]')
                 continue
                 
-            if is_ignored(path.relative_to(repo_path), ignore_patterns):
+            if is_ignored(path.relative_to(repo_path), ignore_matcher, is_dir=path.is_dir()):
                 if options.get('verbose', False):
                     console.print(f'[yellow]Ignorado: {path.relative_to(repo_path)}[/yellow]')
                 continue
@@ -272,26 +286,35 @@ def add(paths, options=None):
             
             if path.is_dir():
                 folders_to_add.add(path)
-                # Adiciona arquivos da pasta recursivamente
-                for file in path.rglob('*'):
-                    if file.is_file() and not is_ignored(file.relative_to(repo_path), ignore_patterns):
-                        if is_file_too_large(file) and not options.get('force_large_files', False):
-                            skipped_files.append(f"{file.relative_to(repo_path)} (muito grande)")
-                            continue
-                        if is_binary_file(file) and not options.get('include_binary', False):
-                            skipped_files.append(f"{file.relative_to(repo_path)} (binário)")
-                            continue
-                        files_to_add.add(file)
-                        total_size += file.stat().st_size
+                # Adiciona arquivos da pasta recursivamente, sem percorrer pastas ignoradas
+                if dirty is not None:
+                    from watch import iter_dirty_entries
+                    entries = iter_dirty_entries(dirty, path, repo_path, ignore_matcher)
+                else:
+                    entries = scan_files(path, repo_path, ignore_matcher)
+                for entry in entries:
+                    if is_file_too_large(entry.path, file_stat=entry.stat) and not options.get('force_large_files', False):
+                        skipped_files.append(f"{entry.rel_path} (muito grande)")
+                        skipped_paths.append(entry.rel_path)
+                        continue
+                    if is_binary_file(entry.path) and not options.get('include_binary', False):
+                        skipped_files.append(f"{entry.rel_path} (binário)")
+                        skipped_paths.append(entry.rel_path)
+                        continue
+                    files_to_add[entry.path] = entry.stat
+                    total_size += entry.size
             elif path.is_file():
-                if is_file_too_large(path) and not options.get('force_large_files', False):
-                    skipped_files.append(f"{path.relative_to(repo_path)} (muito grande)")
+                entry = stat_entry(path, repo_path)
+                if is_file_too_large(path, file_stat=entry.stat) and not options.get('force_large_files', False):
+                    skipped_files.append(f"{entry.rel_path} (muito grande)")
+                    skipped_paths.append(entry.rel_path)
                     continue
                 if is_binary_file(path) and not options.get('include_binary', False):
-                    skipped_files.append(f"{path.relative_to(repo_path)} (binário)")
+                    skipped_files.append(f"{entry.rel_path} (binário)")
+                    skipped_paths.append(entry.rel_path)
                     continue
-                files_to_add.add(path)
-                total_size += path.stat().st_size
+                files_to_add[path] = entry.stat
+                total_size += entry.size
     
     if not files_to_add and not folders_to_add:
         console.print('[yellow]Nenhum arquivo ou pasta válido para adicionar.[/yellow]')
@@ -307,53 +330,94 @@ def add(paths, options=None):
             return False
     
     # Adiciona ao staging com progresso visual
-    staged = set(config.get('staged', []))
+    staged = load_staged(config)
     files_added = []
     folders_added = []
-    
-    with Progress() as progress:
-        task = progress.add_task("[green]Adicionando arquivos...", total=len(files_to_add))
-        
-        for file in files_to_add:
-            progress.update(task, advance=1)
-            rel_file = str(file.relative_to(repo_path))
-            
+    had_errors = False
+    
+    # Versão anterior de cada arquivo (staging ou último commit) serve de base para deltas
+    use_delta = options.get('use_delta', True) and config.get('settings', {}).get('delta_storage', True)
+    head_tree = load_head_tree(chromagit_path) if use_delta else {}
+    
+    # Compressão: opção da linha de comando ou, se omitida, settings.compress_files
+    compress = options.get('compress_files')
+    if compress is None:
+        compress = config.get('settings', {}).get('compress_files', False)
+    compression_stats = CompressionStats() if compress else None
+    
+    with FileIndex(chromagit_path) as index, Progress() as progress:
+        # Seleciona os arquivos e reaproveita o hash do índice quando o stat não mudou
+        candidates = []
+        for file in sorted(files_to_add):
+            # Chaves do staging e do índice usam '/' em qualquer sistema, como o walker e o watcher
+            rel_file = file.relative_to(repo_path).as_posix()
             if rel_file in staged and not options.get('force_conflicts', False):
+                skipped_paths.append(rel_file)
                 continue
-            
-            # Calcula hash do arquivo
-            file_hash = calculate_file_hash(file)
+            file_stat = files_to_add[file]
+            candidates.append((file, rel_file, file_stat, index.lookup(rel_file, file_stat)))
+        
+        # Calcula em paralelo apenas os hashes que não estavam em cache
+        misses = [c for c in candidates if c[3] is None]
+        hash_task = progress.add_task("[green]Calculando hashes...", total=len(misses))
+        computed = hash_files(
+            [c[0] for c in misses],
+            sizes=[c[2].st_size for c in misses],
+            workers=options.get('hash_workers'),
+            progress_callback=lambda path, file_hash: progress.update(hash_task, advance=1),
+            algorithm=algorithm
+        )
+        new_hashes = {}
+        for (file, rel_file, file_stat, _), file_hash in zip(misses, computed):
+            index.record(rel_file, file_stat, file_hash)
+            new_hashes[rel_file] = file_hash
+        
+        task = progress.add_task("[green]Adicionando arquivos...", total=len(candidates))
+        
+        for file, rel_file, file_stat, file_hash in candidates:
+            progress.update(task, advance=1)
+            if file_hash is None:
+                file_hash = new_hashes[rel_file]
             file_info = {
                 'path': rel_file,
                 'hash': file_hash,
-                'size': file.stat().st_size,
+                'size': file_stat.st_size,
                 'type': get_file_type(file),
                 'added_at': datetime.datetime.now().isoformat(),
-                'permissions': oct(file.stat().st_mode)[-3:]
+                'permissions': oct(file_stat.st_mode)[-3:],
+                'mtime_ns': file_stat.st_mtime_ns
             }
             
-            staged.add(rel_file)
-            files_added.append(file_info)
+            if file_hash is None:
+                console.print(f'[red]Erro ao ler {file}[/red]')
+                log_operation("ERROR", f"Falha ao ler {rel_file}", chromagit_path)
+                had_errors = True
+                continue
             
-            # Copia arquivo para packages
-            dest_file = packages_path / rel_file
-            dest_file.parent.mkdir(parents=True, exist_ok=True)
+            previous = staged.get(rel_file)
+            base_hash = previous.get('hash') if previous else head_tree.get(rel_file)
+            staged[rel_file] = file_info
+            files_added.append(file_info)
             
+            # Armazena conteúdo em packages endereçado pelo hash (conteúdo idêntico é gravado uma vez)
             try:
-                if options.get('compress_files', False):
-                    compress_file(file, dest_file)
-                else:
-                    shutil.copy2(file, dest_file)
-                    
+                dest_file, stored = store_object(file, packages_path, file_hash,
+                                                 compress=compress,
+                                                 base_hash=base_hash if use_delta else None,
+                                                 stats=compression_stats,
+                                                 algorithm=algorithm)
+                
                 # Log da operação
-                log_operation("ADD_FILE", f"{rel_file} -> {dest_file}", chromagit_path)
+                if stored:
+                    log_operation("ADD_FILE", f"{rel_file} -> {dest_file}", chromagit_path, per_file=True)
                 
             except Exception as e:
                 console.print(f'[red]Erro ao copiar {file}: {e}[/red]')
                 log_operation("ERROR", f"Falha ao copiar {rel_file}: {e}", chromagit_path)
+                had_errors = True
     
-    # Atualiza configuração
-    config['staged'] = sorted(staged)
+    # Atualiza configuração (o staging guarda o registro completo de cada arquivo)
+    save_staged(config, staged)
     config['last_add_operation'] = {
         'timestamp': datetime.datetime.now().isoformat(),
         'files_count': len(files_added),
@@ -362,8 +426,8 @@ def add(paths, options=None):
     }
     
     # Salva configuração com backup automático
-    temp_config = chromagit_path / TEMP_DIR / 'config_temp.json'
-    with open(temp_config, 'w', encoding='utf-8') as f:
+    fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path / TEMP_DIR)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4)
     
     # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
@@ -376,15 +440,27 @@ def add(paths, options=None):
     if os.name == 'nt':
         os.system(f'attrib +h "{config_path}"')
     
+    # O repositório inteiro foi processado: alterações até aqui não precisam ser relidas,
+    # exceto os arquivos deixados de fora, que ficam pendentes para o próximo add
+    if watch_offset is not None and repo_path in expanded_paths and not had_errors:
+        from watch import save_checkpoint
+        save_checkpoint(chromagit_path, watch_offset, skipped_paths)
+    
     # Exibe resultados
     end_time = time.time()
     duration = end_time - start_time
     
     # Painel de resumo
+    compression_line = ''
+    if compression_stats is not None and compression_stats.compressed:
+        compression_line = (f"[cyan]⇣[/cyan] {compression_stats.compressed} comprimidos, "
+                            f"{compression_stats.saved / 1024 / 1024:.2f} MB economizados "
+                            f"em {compression_stats.seconds:.2f}s\n")
     summary = Panel(
         f"[green]✓[/green] {len(files_added)} arquivos adicionados\n"
         f"[green]✓[/green] {len(folders_added)} pastas processadas\n"
         f"[blue]ℹ[/blue] {len(skipped_files)} arquivos ignorados\n"
+        f"{compression_line}"
         f"[yellow]⚡[/yellow] Operação concluída em {duration:.2f}s",
         title="Resumo da Operação",
         border_style="green"
@@ -401,7 +477,7 @@ def add(paths, options=None):
     
     # Exibe estatísticas detalhadas
     if options.get('show_stats', False):
-        stats = calculate_statistics(files_added, folders_added, total_size, duration)
+        stats = calculate_statistics(files_added, folders_added, total_size, duration, compression_stats)
         console.print(stats)
     
     # Exibe árvore de estrutura
@@ -420,12 +496,19 @@ def main():
     parser.add_argument('-v', '--verbose', action='store_true', help='Modo verboso')
     parser.add_argument('-f', '--force', action='store_true', help='Força adição mesmo com conflitos')
     parser.add_argument('-b', '--binary', action='store_true', help='Inclui arquivos binários')
-    parser.add_argument('-l', '--large', action='store_true', help='Inclui arquivos grandes')
-    parser.add_argument('-c', '--compress', action='store_true', help='Comprime arquivos ao copiar')
+    parser.add_argument('-l', '--large', action='store_true', help='Mantido por compatibilidade: não há mais limite de tamanho')
+    parser.add_argument('-c', '--compress', action='store_true', default=None,
+                        help='Comprime arquivos ao copiar (padrão: settings.compress_files)')
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                        help='Grava sem compressão mesmo com settings.compress_files ativo')
     parser.add_argument('-s', '--stats', action='store_true', help='Exibe estatísticas detalhadas')
     parser.add_argument('-t', '--tree', action='store_true', help='Exibe árvore de estrutura')
     parser.add_argument('--no-wildcards', action='store_true', help='Desabilita expansão de wildcards')
     parser.add_argument('--auto-resolve', action='store_true', help='Resolve conflitos automaticamente')
+    parser.add_argument('--no-file-log', action='store_true', help='Não registra no log um evento por arquivo adicionado')
+    parser.add_argument('-w', '--workers', type=int, help='Número de threads para cálculo de hash')
+    parser.add_argument('--full-scan', action='store_true', help='Ignora o watcher e varre todas as pastas')
+    parser.add_argument('--no-delta', action='store_true', help='Grava sempre o conteúdo completo, sem delta da versão anterior')
     
     args = parser.parse_args()
     
@@ -438,13 +521,18 @@ def main():
         'show_stats': args.stats,
         'show_tree': args.tree,
         'use_wildcards': not args.no_wildcards,
-        'auto_resolve': args.auto_resolve
+        'auto_resolve': args.auto_resolve,
+        'hash_workers': args.workers,
+        'log_files': not args.no_file_log,
+        'use_watcher': not args.full_scan,
+        'use_delta': not args.no_delta
     }
     
     success = add(args.paths, options)
     sys.exit(0 if success else 1)
 
 # Função para remover arquivos do staging
+@locked()
 def remove_from_staging(paths):
     repo_path = find_repo_root()
     if repo_path is None:
@@ -461,18 +549,19 @@ def remove_from_staging(paths):
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
     
-    staged = set(config.get('staged', []))
+    staged = load_staged(config)
     removed = []
     
     for path_str in paths:
+        path_str = Path(path_str).as_posix()
         if path_str in staged:
-            staged.remove(path_str)
+            del staged[path_str]
             removed.append(path_str)
             console.print(f'[green]Removido do staging: {path_str}[/green]')
         else:
             console.print(f'[yellow]Não encontrado no staging: {path_str}[/yellow]')
     
-    config['staged'] = sorted(staged)
+    save_staged(config, staged)
     with open(config_path, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4)
     
@@ -480,6 +569,7 @@ def remove_from_staging(paths):
     return True
 
 # Função para limpar staging
+@locked()
 def clear_staging():
     repo_path = find_repo_root()
     if repo_path is None:
@@ -507,7 +597,10 @@ def clear_staging():
     return True
 
 # Função para exibir status do staging
+@locked(exclusive=False)
 def show_status():
+    from rich.table import Table
+    
     repo_path = find_repo_root()
     if repo_path is None:
         console.print('[red]Repositório ChromaGit não encontrado![/red]')
@@ -523,7 +616,7 @@ def show_status():
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
     
-    staged = config.get('staged', [])
+    staged = load_staged(config)
     
     if not staged:
         console.print('[yellow]Nenhum arquivo no staging.[/yellow]')
@@ -535,12 +628,12 @@ def show_status():
     table.add_column("Tamanho", style="yellow")
     
     total_size = 0
-    for file_path in staged:
+    for file_path, record in staged.items():
         full_path = repo_path / file_path
         if full_path.exists():
-            size = full_path.stat().st_size
+            size = record.get('size', full_path.stat().st_size)
             total_size += size
-            file_type = get_file_type(full_path)
+            file_type = record.get('type') or get_file_type(full_path)
             size_str = f"{size / 1024:.1f} KB" if size < 1024*1024 else f"{size / 1024 / 1024:.1f} MB"
             table.add_row(file_path, file_type, size_str)
         else:
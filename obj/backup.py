@@ -0,0 +1,435 @@
+import os
+import sys
+import json
+import tempfile
+import zlib
+import datetime
+import argparse
+from pathlib import Path
+from hashing import hash_bytes, repository_algorithm
+from journal import count_commits
+from oplog import get_logger
+from lock import repository_lock, LockTimeout
+from ui import LazyConsole
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+CONFIG_FILE = 'config.json'
+BACKUP_DIR = 'backup'
+SNAPSHOTS_DIR = 'snapshots'
+SEGMENTS_DIR = 'segments'
+SNAPSHOT_VERSION = 1
+LEGACY_PATTERNS = ('config_backup_', 'push_backup_', 'migrate_hash_backup_')
+DEFAULT_RETENTION = {'keep_last': 20, 'keep_daily': 14}
+GROUP_TARGET = 64   # Listas são divididas em grupos de ~64 itens em média
+GROUP_MAX = 1024
+
+# Backups incrementais do config.json
+#
+# Cada backup (snapshot) é um arquivo pequeno em backup/snapshots/ que lista,
+# para cada chave do config, o hash do conteúdo; o conteúdo fica uma única vez
+# em backup/segments/<hash>.json e é compartilhado por todos os snapshots.
+# Listas longas (staging, commits de configs antigos) são divididas em grupos
+# com limites definidos pelo conteúdo (como os chunks de chunking.py): incluir
+# ou remover um arquivo do staging muda só o grupo ao redor, e os demais
+# grupos não são gravados de novo.
+#
+# Um snapshot não é criado quando o config.json não mudou desde o último (mesmo
+# stat ou mesmos segmentos). Depois de cada snapshot a política de retenção
+# (settings.backup_retention) remove os snapshots antigos e os segmentos que
+# nenhum snapshot usa mais. Backups antigos (config_backup_*.json e afins, cópias
+# inteiras do config) são listados, restaurados e removidos pela mesma política.
+
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path):
+    get_logger(chromagit_path, 'backup').log(operation, details)
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+class Snapshot:
+    """Backup listado em backup/: incremental (snapshots/) ou cópia inteira antiga"""
+
+    def __init__(self, snapshot_id, created_at, path, operation, legacy=False):
+        self.id = snapshot_id
+        self.created_at = created_at
+        self.path = path
+        self.operation = operation
+        self.legacy = legacy
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def _write_atomic(path, data):
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+# Função para dividir uma lista em grupos com limites definidos pelo conteúdo
+def _split_groups(items):
+    """Gera o JSON de cada grupo; o limite fica depois de um item cujo CRC é múltiplo de GROUP_TARGET"""
+    group = []
+    for item in items:
+        encoded = _encode(item)
+        group.append(encoded)
+        if zlib.crc32(encoded) % GROUP_TARGET == 0 or len(group) >= GROUP_MAX:
+            yield b'[' + b','.join(group) + b']'
+            group = []
+    if group:
+        yield b'[' + b','.join(group) + b']'
+
+# Função para gravar um segmento, se ainda não existir
+def _store_segment(segments_path, data, stats):
+    segment_hash = hash_bytes(data)
+    path = segments_path / f"{segment_hash}.json"
+    if not path.exists():
+        _write_atomic(path, data)
+        stats['written'] += len(data)
+    return segment_hash
+
+# Função para separar o config em segmentos: [[chave, hash ou [hashes dos grupos]], ...]
+def _store_config(segments_path, config, stats):
+    keys = []
+    for key, value in config.items():
+        if isinstance(value, list) and len(value) > GROUP_TARGET:
+            keys.append([key, [_store_segment(segments_path, group, stats) for group in _split_groups(value)]])
+        else:
+            keys.append([key, _store_segment(segments_path, _encode(value), stats)])
+    return keys
+
+def _read_segment(segments_path, segment_hash):
+    with open(segments_path / f"{segment_hash}.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Função para montar o config de um snapshot a partir dos segmentos
+def rebuild_config(chromagit_path, snapshot):
+    data = snapshot.load()
+    if snapshot.legacy:
+        return data
+    segments_path = Path(chromagit_path) / BACKUP_DIR / SEGMENTS_DIR
+    config = {}
+    for key, reference in data['keys']:
+        if isinstance(reference, list):
+            value = []
+            for segment_hash in reference:
+                value.extend(_read_segment(segments_path, segment_hash))
+            config[key] = value
+        else:
+            config[key] = _read_segment(segments_path, reference)
+    return config
+
+def _legacy_snapshot(path):
+    for prefix in LEGACY_PATTERNS:
+        if path.name.startswith(prefix) and path.suffix == '.json':
+            try:
+                created_at = datetime.datetime.strptime(path.stem[len(prefix):], "%Y%m%d_%H%M%S")
+            except ValueError:
+                return None
+            return Snapshot(path.stem, created_at, path, prefix[:-len('_backup_')], legacy=True)
+    return None
+
+# Função para listar os backups, do mais antigo para o mais recente
+def list_snapshots(chromagit_path):
+    backup_path = Path(chromagit_path) / BACKUP_DIR
+    snapshots = []
+    try:
+        names = os.listdir(backup_path / SNAPSHOTS_DIR)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        snapshot_id = name[:-len('.json')]
+        stamp, _, operation = snapshot_id.partition('-')
+        try:
+            created_at = datetime.datetime.strptime(stamp, "%Y%m%d_%H%M%S_%f")
+        except ValueError:
+            continue
+        snapshots.append(Snapshot(snapshot_id, created_at, backup_path / SNAPSHOTS_DIR / name, operation))
+    try:
+        legacy = [_legacy_snapshot(backup_path / name) for name in os.listdir(backup_path)]
+    except FileNotFoundError:
+        legacy = []
+    snapshots.extend(snapshot for snapshot in legacy if snapshot is not None)
+    snapshots.sort(key=lambda snapshot: (snapshot.created_at, snapshot.id))
+    return snapshots
+
+def _retention(config):
+    retention = dict(DEFAULT_RETENTION)
+    retention.update((config.get('settings') or {}).get('backup_retention') or {})
+    return retention
+
+# Função para escolher os snapshots mantidos pela política de retenção
+def select_kept(snapshots, keep_last, keep_daily):
+    """Mantém os keep_last mais recentes e o mais recente de cada um dos últimos keep_daily dias"""
+    newest_first = sorted(snapshots, key=lambda snapshot: (snapshot.created_at, snapshot.id), reverse=True)
+    kept = {snapshot.id for snapshot in newest_first[:max(keep_last, 1)]}
+    days = set()
+    for snapshot in newest_first:
+        day = snapshot.created_at.date()
+        if day in days:
+            continue
+        if len(days) >= keep_daily:
+            break
+        days.add(day)
+        kept.add(snapshot.id)
+    return kept
+
+# Função para aplicar a retenção e remover segmentos sem uso
+def prune(chromagit_path, config):
+    chromagit_path = Path(chromagit_path)
+    retention = _retention(config)
+    snapshots = list_snapshots(chromagit_path)
+    kept = select_kept(snapshots, int(retention['keep_last']), int(retention['keep_daily']))
+    removed = [snapshot for snapshot in snapshots if snapshot.id not in kept]
+    if not removed:
+        return 0, 0
+    for snapshot in removed:
+        try:
+            snapshot.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # Segmentos referenciados pelos snapshots que ficaram (poucos, por causa da retenção)
+    used = set()
+    for snapshot in snapshots:
+        if snapshot.id not in kept or snapshot.legacy:
+            continue
+        for _, reference in snapshot.load()['keys']:
+            used.update(reference if isinstance(reference, list) else [reference])
+    segments_path = chromagit_path / BACKUP_DIR / SEGMENTS_DIR
+    freed = 0
+    try:
+        names = os.listdir(segments_path)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if name.endswith('.json') and name[:-len('.json')] not in used:
+            try:
+                (segments_path / name).unlink()
+                freed += 1
+            except FileNotFoundError:
+                pass
+    log_operation("PRUNE", f"{len(removed)} backups e {freed} segmentos removidos", chromagit_path)
+    return len(removed), freed
+
+# Função para criar um snapshot do config.json antes de uma operação
+def create_snapshot(chromagit_path, operation, force=False):
+    """Retorna o Snapshot criado, ou None se o config não mudou desde o último
+    backup (ou se settings.auto_backup estiver desligado e force for falso)"""
+    chromagit_path = Path(chromagit_path)
+    config_path = chromagit_path / CONFIG_FILE
+    backup_path = chromagit_path / BACKUP_DIR
+    snapshots_path = backup_path / SNAPSHOTS_DIR
+    segments_path = backup_path / SEGMENTS_DIR
+
+    config_stat = config_path.stat()
+    source = [config_stat.st_size, config_stat.st_mtime_ns]
+    latest = None
+    snapshots = list_snapshots(chromagit_path)
+    for snapshot in reversed(snapshots):
+        if not snapshot.legacy:
+            latest = snapshot.load()
+            break
+    # Caminho rápido: o config não foi regravado desde o último snapshot
+    if not force and latest is not None and latest.get('source') == source:
+        return None
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not force and not (config.get('settings') or {}).get('auto_backup', True):
+        return None
+
+    snapshots_path.mkdir(parents=True, exist_ok=True)
+    segments_path.mkdir(exist_ok=True)
+    stats = {'written': 0}
+    keys = _store_config(segments_path, config, stats)
+    if not force and latest is not None and latest.get('keys') == keys:
+        return None
+
+    created_at = datetime.datetime.now()
+    snapshot_id = f"{created_at.strftime('%Y%m%d_%H%M%S_%f')}-{operation}"
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'created_at': created_at.isoformat(),
+        'operation': operation,
+        'source': source,
+        'commits': count_commits(chromagit_path),
+        'keys': keys
+    }
+    path = snapshots_path / f"{snapshot_id}.json"
+    _write_atomic(path, json.dumps(data).encode('utf-8'))
+    log_operation("BACKUP", f"{snapshot_id}: {stats['written']} bytes novos", chromagit_path)
+
+    prune(chromagit_path, config)
+    return Snapshot(snapshot_id, created_at, path, operation)
+
+# Função para localizar um backup pelo id (ou prefixo do id); 'latest' = mais recente
+def find_snapshot(chromagit_path, name):
+    snapshots = list_snapshots(chromagit_path)
+    if name == 'latest':
+        return snapshots[-1] if snapshots else None
+    matches = [snapshot for snapshot in snapshots if snapshot.id == name]
+    if not matches:
+        matches = [snapshot for snapshot in snapshots if snapshot.id.startswith(name)]
+    if len(matches) > 1:
+        raise ValueError(f"Identificador ambíguo: {name} ({len(matches)} backups)")
+    return matches[0] if matches else None
+
+# Função para restaurar o config.json de um backup
+def restore(chromagit_path, name):
+    chromagit_path = Path(chromagit_path)
+    config_path = chromagit_path / CONFIG_FILE
+    snapshot = find_snapshot(chromagit_path, name)
+    if snapshot is None:
+        console.print(f'[red]Backup não encontrado: {name}[/red]')
+        return False
+
+    # Tudo é lido antes do backup do estado atual, cuja retenção pode remover este snapshot
+    config = rebuild_config(chromagit_path, snapshot)
+    commits = None if snapshot.legacy else snapshot.load().get('commits')
+
+    # Objetos, índice e journal seguem o algoritmo atual; um config de outro algoritmo não serve
+    with open(config_path, 'r', encoding='utf-8') as f:
+        current_algorithm = repository_algorithm(json.load(f))
+    if repository_algorithm(config) != current_algorithm:
+        console.print(f'[red]O backup {snapshot.id} usa {repository_algorithm(config)} e o repositório usa '
+                      f'{current_algorithm}. Execute migrate-hash {repository_algorithm(config)} antes de restaurar.[/red]')
+        return False
+
+    # O estado atual vira um backup, para que a restauração possa ser desfeita
+    current = create_snapshot(chromagit_path, 'restore', force=True)
+    if current is not None:
+        console.print(f'[blue]Backup do estado atual: {current.id}[/blue]')
+
+    fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
+
+    # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
+    if os.name == 'nt' and config_path.exists():
+        os.system(f'attrib -r -h "{config_path}"')
+
+    os.replace(temp_config, config_path)
+
+    # Restaura atributo oculto após salvar (Windows)
+    if os.name == 'nt':
+        os.system(f'attrib +h "{config_path}"')
+
+    log_operation("RESTORE", f"config.json restaurado de {snapshot.id}", chromagit_path)
+    console.print(f'[green]config.json restaurado do backup {snapshot.id}.[/green]')
+
+    if commits is not None and commits != count_commits(chromagit_path):
+        console.print(f'[yellow]O backup é de quando havia {commits} commits; '
+                      f'o histórico atual ({count_commits(chromagit_path)}) não foi alterado.[/yellow]')
+    return True
+
+# Função para exibir os backups
+def show_snapshots(chromagit_path):
+    from rich.table import Table
+
+    snapshots = list_snapshots(chromagit_path)
+    if not snapshots:
+        console.print('[yellow]Nenhum backup encontrado.[/yellow]')
+        return
+
+    table = Table(title="Backups do config.json")
+    table.add_column("Id", style="cyan")
+    table.add_column("Data", style="white")
+    table.add_column("Operação", style="green")
+    table.add_column("Commits", style="yellow", justify="right")
+    for snapshot in reversed(snapshots):
+        if snapshot.legacy:
+            commits = "-"
+        else:
+            commits = str(snapshot.load().get('commits', '-'))
+        table.add_row(snapshot.id, snapshot.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                      snapshot.operation + (" (cópia inteira)" if snapshot.legacy else ""), commits)
+    console.print(table)
+
+    segments_path = Path(chromagit_path) / BACKUP_DIR / SEGMENTS_DIR
+    try:
+        with os.scandir(segments_path) as it:
+            size = sum(entry.stat().st_size for entry in it if entry.is_file())
+    except FileNotFoundError:
+        size = 0
+    console.print(f'[blue]{len(snapshots)} backups, segmentos ocupam {size / 1024:.1f} KB[/blue]')
+
+# Função para executar uma ação sobre os backups
+def backup(action='list', name=None):
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        return False
+
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    config_path = chromagit_path / CONFIG_FILE
+    if not config_path.exists():
+        console.print('[red]Repositório não inicializado! Execute o comando init primeiro.[/red]')
+        return False
+
+    # Só a listagem não altera nada; as outras ações pegam o lock exclusivo
+    try:
+        with repository_lock(chromagit_path, exclusive=action != 'list'):
+            if action == 'list':
+                show_snapshots(chromagit_path)
+                return True
+
+            if action == 'create':
+                snapshot = create_snapshot(chromagit_path, 'manual', force=True)
+                console.print(f'[green]Backup criado: {snapshot.id}[/green]')
+                return True
+
+            if action == 'prune':
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                removed, freed = prune(chromagit_path, config)
+                console.print(f'[green]{removed} backups e {freed} segmentos removidos.[/green]')
+                return True
+
+            if action == 'restore':
+                try:
+                    return restore(chromagit_path, name or 'latest')
+                except (ValueError, OSError, KeyError) as e:
+                    console.print(f'[red]Erro ao restaurar backup: {e}[/red]')
+                    return False
+    except LockTimeout as e:
+        console.print(f'[red]{e}[/red]')
+        return False
+
+    return False
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Lista, cria, restaura e limpa backups do config.json')
+    parser.add_argument('action', nargs='?', default='list', choices=['list', 'create', 'restore', 'prune'],
+                        help='Ação (padrão: list)')
+    parser.add_argument('snapshot', nargs='?', help='Id do backup a restaurar (ou prefixo; padrão: latest)')
+
+    args = parser.parse_args()
+
+    success = backup(args.action, args.snapshot)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import hashlib
+
+# Chunking definido pelo conteúdo (no estilo do FastCDC)
+#
+# Arquivos grandes são divididos em chunks cujos limites dependem apenas dos
+# bytes próximos ao corte, e não da posição no arquivo: inserir ou remover bytes
+# muda só os chunks ao redor da alteração, e o restante continua com o mesmo
+# hash (e não é gravado de novo).
+#
+# Para cada posição calcula-se um hash de 1 byte da janela dos WINDOW bytes
+# anteriores. Um loop em Python byte a byte (como o gear hash do FastCDC) fica
+# em poucos MB/s, então o hash é montado com operações que rodam em C sobre um
+# bloco inteiro: bytes.translate (substituição por uma tabela) e XOR/shift de
+# inteiros grandes. Cada nível dobra a janela:
+#   h0[i] = S0[b[i]]
+#   hn[i] = h(n-1)[i] ^ Sn[h(n-1)[i - 2^(n-1)]]
+# Há um corte depois da posição i quando h[i-2] == h[i-1] == 0 e h[i] < CUT_THRESHOLD,
+# o que acontece em média a cada 2^AVERAGE_BITS bytes. Como no FastCDC, os
+# primeiros MIN_CHUNK_SIZE bytes de cada chunk nem são examinados e um chunk
+# nunca passa de MAX_CHUNK_SIZE.
+
+MIN_CHUNK_SIZE = 512 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+AVERAGE_BITS = 19  # Depois do mínimo, um corte a cada 512KB em média (chunks de ~1MB)
+WINDOW_LEVELS = 4
+WINDOW = 2 ** WINDOW_LEVELS  # 16 bytes
+CUT_THRESHOLD = 256 >> (AVERAGE_BITS - 16)
+SCAN_SIZE = 128 * 1024  # Posições examinadas por vez; o corte costuma vir logo depois do mínimo
+READ_SIZE = 4 * 1024 * 1024
+
+# Tabelas fixas derivadas do SHA-256: os limites precisam ser os mesmos em
+# qualquer máquina e versão do Python para que chunks iguais tenham o mesmo hash
+def _substitution_table(level):
+    order = sorted(range(256), key=lambda value: hashlib.sha256(bytes((level, value))).digest())
+    return bytes(order)
+
+_TABLES = [_substitution_table(level) for level in range(WINDOW_LEVELS + 1)]
+
+def _window_hashes(data):
+    """Hash de 1 byte por posição; só é válido a partir de data[WINDOW - 1]"""
+    size = len(data)
+    hashed = data.translate(_TABLES[0])
+    value = int.from_bytes(hashed, 'little')
+    shift = 1
+    for table in _TABLES[1:]:
+        value ^= int.from_bytes(hashed.translate(table), 'little') << (8 * shift)
+        hashed = value.to_bytes(size + WINDOW, 'little')[:size]
+        shift *= 2
+    return hashed
+
+# Função para encontrar o fim do chunk que começa em data[0]
+def find_cut(data, final=False):
+    """Retorna o tamanho do chunk, ou None se for preciso ler mais dados.
+
+    `final` indica que data vai até o fim do arquivo.
+    """
+    if len(data) < MAX_CHUNK_SIZE and not final:
+        return None
+    limit = min(len(data), MAX_CHUNK_SIZE)
+    if limit <= MIN_CHUNK_SIZE:
+        return limit
+
+    # position é a primeira posição da janela de corte (o corte fica 3 bytes depois)
+    position = MIN_CHUNK_SIZE - 3
+    while position < limit - 2:
+        stop = min(position + SCAN_SIZE, limit - 2)
+        offset = position - (WINDOW - 1)
+        hashes = _window_hashes(bytes(data[offset:stop + 2]))
+        index = hashes.find(b'\0\0', WINDOW - 1)
+        while index != -1 and index + offset < stop:
+            if hashes[index + 2] < CUT_THRESHOLD:
+                return index + offset + 3
+            index = hashes.find(b'\0\0', index + 1)
+        position = stop
+    return limit
+
+# Função para ler um arquivo em chunks definidos pelo conteúdo
+def iter_chunks(path):
+    """Gera o conteúdo de cada chunk; a memória em uso fica em torno de MAX_CHUNK_SIZE + READ_SIZE"""
+    buffer = bytearray()
+    final = False
+    with open(path, 'rb') as f:
+        while buffer or not final:
+            while not final and len(buffer) < MAX_CHUNK_SIZE:
+                block = f.read(READ_SIZE)
+                if not block:
+                    final = True
+                buffer += block
+            if not buffer:
+                break
+            cut = find_cut(buffer, final)
+            yield bytes(buffer[:cut])
+            del buffer[:cut]
+
+# Função para listar os chunks de uma versão que não estão na mesma posição da versão anterior
+def changed_chunks(chunks, previous):
+    """chunks e previous: listas de (hash, tamanho). Gera (offset, hash, tamanho)
+    dos chunks que precisam ser gravados para transformar previous em chunks."""
+    unchanged = set()
+    offset = 0
+    for chunk_hash, size in previous:
+        unchanged.add((offset, chunk_hash))
+        offset += size
+    offset = 0
+    for chunk_hash, size in chunks:
+        if (offset, chunk_hash) not in unchanged:
+            yield offset, chunk_hash, size
+        offset += size
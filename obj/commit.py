@@ -1,19 +1,22 @@
 import os
 import json
-import hashlib
+import tempfile
 import datetime
 import argparse
 import sys
 import uuid
 from pathlib import Path
-from rich import print
-from rich.console import Console
-from rich.progress import Progress
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
+from index import FileIndex
+from hashing import hash_files, get_hasher, repository_algorithm
+from staging import load_staged, is_modified_since_staged
+from oplog import get_logger
+from journal import append_commit, count_commits, last_commit, ensure_migrated
+from backup import create_snapshot
+from lock import locked
+from ui import LazyConsole
 
-console = Console()
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
 
 # Constantes compatíveis com add.py e init.py
 CHROMAGIT_DIR = '.chromagit'
@@ -23,14 +26,9 @@ BACKUP_DIR = 'backup'
 LOGS_DIR = 'logs'
 TEMP_DIR = 'temp'
 
-# Função para log de operações (compatível com add.py)
-def log_operation(operation, details, chromagit_path):
-    logs_path = chromagit_path / LOGS_DIR
-    logs_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().isoformat()
-    log_file = logs_path / f"commit_operations_{datetime.date.today()}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {operation}: {details}\n")
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path, per_file=False):
+    get_logger(chromagit_path, 'commit').log(operation, details, per_file=per_file)
 
 # Função para encontrar a raiz do repositório
 def find_repo_root(start_path=None):
@@ -48,27 +46,25 @@ def find_repo_root(start_path=None):
     
     return None
 
-# Função para criar backup antes de operações
+# Função para criar backup antes de operações (incremental, ver backup.py)
 def create_backup(config_path):
-    backup_path = config_path.parent / BACKUP_DIR
-    backup_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = backup_path / f"config_backup_{timestamp}.json"
-    import shutil
-    shutil.copy2(config_path, backup_file)
-    return backup_file
+    return create_snapshot(config_path.parent, 'commit')
 
 # Função para gerar hash único do commit
-def generate_commit_hash(commit_data):
-    """Gera hash SHA-256 único baseado nos dados do commit"""
+def generate_commit_hash(commit_data, algorithm=None):
+    """Gera hash único baseado nos dados do commit, com o algoritmo do repositório"""
     commit_string = f"{commit_data['timestamp']}{commit_data['message']}{len(commit_data['files'])}"
     for file_info in commit_data['files']:
         commit_string += f"{file_info['path']}{file_info['hash']}"
     
-    return hashlib.sha256(commit_string.encode()).hexdigest()[:16]
+    digest = get_hasher(algorithm)()
+    digest.update(commit_string.encode())
+    return digest.hexdigest()[:16]
 
 # Função para obter informações do autor
 def get_author_info(options=None):
+    from rich.prompt import Prompt
+    
     if options is None:
         options = {}
     
@@ -148,7 +144,13 @@ def update_packages_state(config, commit_hash):
     return config
 
 # Função principal para fazer commit
+@locked()
 def commit(message=None, options=None):
+    from rich.progress import Progress
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich.prompt import Prompt, Confirm
+    
     if options is None:
         options = {}
     
@@ -170,22 +172,22 @@ def commit(message=None, options=None):
     
     # Cria backup do config
     backup_file = create_backup(config_path)
-    console.print(f'[blue]Backup criado: {backup_file}[/blue]')
+    if backup_file is not None:
+        console.print(f'[blue]Backup criado: {backup_file.id}[/blue]')
     
-    # Carrega configuração
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    # Carrega configuração (commits antigos guardados no config.json vão para o journal)
+    config = ensure_migrated(chromagit_path)
     
-    staged_files = config.get('staged', [])
+    staged_records = load_staged(config)
     
     # Verifica se há arquivos no staging
-    if not staged_files:
+    if not staged_records:
         console.print('[yellow]Nenhum arquivo no staging para commit.[/yellow]')
         console.print('[blue]Use o comando add para adicionar arquivos primeiro.[/blue]')
         return False
     
     # Valida arquivos do staging
-    valid_files, missing_files = validate_staging(staged_files, repo_path)
+    valid_files, missing_files = validate_staging(staged_records, repo_path)
     
     if missing_files:
         console.print('[red]Arquivos removidos desde o último add:[/red]')
@@ -206,61 +208,82 @@ def commit(message=None, options=None):
     # Obter informações do autor
     author_info = get_author_info(options)
     
-    # Coleta informações detalhadas dos arquivos
+    # Monta os dados dos arquivos a partir dos registros gravados pelo add
     files_data = []
+    modified_files = []
+    legacy_entries = []
     
-    with Progress() as progress:
-        task = progress.add_task("[green]Processando arquivos...", total=len(valid_files))
+    for file_path in valid_files:
+        record = staged_records[file_path]
+        full_path = repo_path / file_path
+        file_stat = full_path.stat()
         
-        for file_path in valid_files:
-            progress.update(task, advance=1)
-            
-            full_path = repo_path / file_path
-            
-            # Calcula hash do arquivo
-            file_hash = None
-            try:
-                sha256_hash = hashlib.sha256()
-                with open(full_path, "rb") as f:
-                    for byte_block in iter(lambda: f.read(4096), b""):
-                        sha256_hash.update(byte_block)
-                file_hash = sha256_hash.hexdigest()
-            except Exception as e:
-                console.print(f'[yellow]Erro ao calcular hash de {file_path}: {e}[/yellow]')
-                file_hash = "error"
-            
-            # Coleta metadados do arquivo
-            file_info = {
-                'path': file_path,
-                'hash': file_hash,
-                'size': full_path.stat().st_size if full_path.exists() else 0,
-                'type': full_path.suffix.lower() if full_path.exists() else 'unknown',
-                'modified_time': full_path.stat().st_mtime if full_path.exists() else 0
-            }
+        # Verificação barata por stat: o conteúdo commitado é sempre o do staging
+        if is_modified_since_staged(record, file_stat):
+            modified_files.append(file_path)
+        
+        file_info = {
+            'path': file_path,
+            'hash': record.get('hash'),
+            'size': record.get('size', file_stat.st_size),
+            'type': full_path.suffix.lower(),
+            'modified_time': record['mtime_ns'] / 1e9 if 'mtime_ns' in record else file_stat.st_mtime
+        }
+        files_data.append(file_info)
+        
+        if file_info['hash'] is None:
+            legacy_entries.append((file_info, full_path, file_stat))
+    
+    if modified_files:
+        console.print('[yellow]Arquivos modificados após o add (a versão do staging será commitada):[/yellow]')
+        for modified in modified_files:
+            console.print(f'  - {modified}')
+    
+    # Entradas de staging antigas guardam só o caminho e precisam ter o hash calculado
+    if legacy_entries:
+        with FileIndex(chromagit_path) as index, Progress() as progress:
+            misses = []
+            for file_info, full_path, file_stat in legacy_entries:
+                file_info['hash'] = index.lookup(file_info['path'], file_stat)
+                if file_info['hash'] is None:
+                    misses.append((file_info, full_path, file_stat))
             
-            files_data.append(file_info)
+            # Calcula em paralelo apenas os hashes que não estavam em cache
+            task = progress.add_task("[green]Processando arquivos...", total=len(misses))
+            computed = hash_files(
+                [m[1] for m in misses],
+                sizes=[m[2].st_size for m in misses],
+                workers=options.get('hash_workers'),
+                progress_callback=lambda path, file_hash: progress.update(task, advance=1),
+                algorithm=repository_algorithm(config)
+            )
+            for (file_info, full_path, file_stat), file_hash in zip(misses, computed):
+                if file_hash is None:
+                    console.print(f'[yellow]Erro ao calcular hash de {file_info["path"]}[/yellow]')
+                    file_hash = "error"
+                else:
+                    index.record(file_info['path'], file_stat, file_hash)
+                file_info['hash'] = file_hash
     
     # Cria dados do commit
+    parent_commit = last_commit(chromagit_path)
     commit_data = {
         'message': message,
         'timestamp': start_time.isoformat(),
         'author': author_info,
         'files': files_data,
-        'parent': config.get('commits', [])[-1]['hash'] if config.get('commits') else None,
+        'parent': parent_commit['hash'] if parent_commit else None,
         'branch': config.get('repository', {}).get('branch', 'main')
     }
     
     # Gera hash único do commit
-    commit_data['hash'] = generate_commit_hash(commit_data)
+    commit_data['hash'] = generate_commit_hash(commit_data, repository_algorithm(config))
     
     # Calcula estatísticas
     commit_data['stats'] = calculate_commit_stats(files_data)
     
-    # Atualiza configuração
-    if 'commits' not in config:
-        config['commits'] = []
-    
-    config['commits'].append(commit_data)
+    # Acrescenta o commit ao journal (o config.json guarda apenas o estado mutável)
+    append_commit(chromagit_path, commit_data)
     config['staged'] = []  # Limpa staging após commit
     
     # Atualiza estado dos pacotes
@@ -272,12 +295,12 @@ def commit(message=None, options=None):
     
     config['metadata']['last_commit'] = commit_data['hash']
     config['metadata']['last_commit_time'] = commit_data['timestamp']
-    config['metadata']['total_commits'] = len(config['commits'])
+    config['metadata']['total_commits'] = count_commits(chromagit_path)
     config['metadata']['last_modified'] = datetime.datetime.now().isoformat()
     
     # Salva configuração
-    temp_config = chromagit_path / TEMP_DIR / 'config_temp.json'
-    with open(temp_config, 'w', encoding='utf-8') as f:
+    fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path / TEMP_DIR)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4)
     
     # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
@@ -357,6 +380,7 @@ def main():
     parser.add_argument('-s', '--stats', action='store_true', help='Exibe estatísticas detalhadas')
     parser.add_argument('--show-files', action='store_true', help='Exibe lista de arquivos commitados')
     parser.add_argument('--no-interactive', action='store_true', help='Desabilita prompts interativos')
+    parser.add_argument('-w', '--workers', type=int, help='Número de threads para cálculo de hash')
     
     args = parser.parse_args()
     
@@ -366,53 +390,19 @@ def main():
         'force': args.force,
         'interactive': args.interactive and not args.no_interactive,
         'show_stats': args.stats,
-        'show_files': args.show_files
+        'show_files': args.show_files,
+        'hash_workers': args.workers
     }
     
     success = commit(args.message, options)
     sys.exit(0 if success else 1)
 
 # Função para exibir histórico de commits
-def show_log(limit=10):
-    repo_path = find_repo_root()
-    if repo_path is None:
-        console.print('[red]Repositório ChromaGit não encontrado![/red]')
-        return False
-    
-    config_path = repo_path / CHROMAGIT_DIR / CONFIG_FILE
-    
-    if not config_path.exists():
-        console.print('[red]Repositório não inicializado![/red]')
-        return False
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-    
-    commits = config.get('commits', [])
-    
-    if not commits:
-        console.print('[yellow]Nenhum commit encontrado.[/yellow]')
-        return True
-    
-    # Exibe commits mais recentes primeiro
-    recent_commits = commits[-limit:] if len(commits) > limit else commits
-    recent_commits.reverse()
-    
-    for commit_data in recent_commits:
-        commit_panel = Panel(
-            f"[yellow]Hash:[/yellow] {commit_data['hash']}\n"
-            f"[blue]Autor:[/blue] {commit_data['author']['name']} <{commit_data['author']['email']}>\n"
-            f"[green]Data:[/green] {commit_data['timestamp']}\n"
-            f"[cyan]Arquivos:[/cyan] {len(commit_data['files'])}\n"
-            f"[white]Mensagem:[/white] {commit_data['message']}",
-            border_style="blue"
-        )
-        console.print(commit_panel)
-    
-    if len(commits) > limit:
-        console.print(f"\n[blue]Mostrando {limit} commits mais recentes de {len(commits)} total.[/blue]")
-    
-    return True
+@locked(exclusive=False)
+def show_log(limit=10, skip=0, oneline=False):
+    # O histórico é exibido por log.py, que lê apenas os commits mostrados
+    from log import show_log as show_journal_log
+    return show_journal_log(limit, skip, oneline)
 
 # Exemplo de uso:
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import os
+import zlib
+
+# Constantes compatíveis com add.py
+BINARY_EXTENSIONS = {'.exe', '.dll', '.so', '.dylib', '.bin', '.zip', '.rar', '.7z', '.tar', '.gz'}
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.ico'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv'}
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.flac', '.aac', '.ogg'}
+
+# Formatos que não são comprimidos (já comprimidos ou binários); SVG é XML e comprime bem
+SKIP_EXTENSIONS = (BINARY_EXTENSIONS | IMAGE_EXTENSIONS | VIDEO_EXTENSIONS | AUDIO_EXTENSIONS) - {'.svg'}
+SAMPLE_SIZE = 64 * 1024
+MIN_SAMPLE_RATIO = 0.9  # Amostra que não reduz pelo menos 10% indica conteúdo incompressível
+MIN_COMPRESS_SIZE = 512  # Abaixo disso o cabeçalho do gzip come o ganho
+
+# Nível do gzip pelo tamanho do arquivo: arquivos pequenos pagam pouco pelo nível máximo,
+# arquivos grandes ficam no nível mais rápido para não dominar o tempo do add
+LEVELS_BY_SIZE = [
+    (1024 * 1024, 9),         # até 1MB
+    (64 * 1024 * 1024, 6),    # até 64MB
+]
+LARGE_FILE_LEVEL = 1
+
+class CompressionStats:
+    """Totais de uma operação: arquivos comprimidos, ignorados, bytes e tempo gasto"""
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def record(self, size_in, size_out, seconds):
+        self.compressed += 1
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+        self.seconds += seconds
+
+    @property
+    def saved(self):
+        return self.bytes_in - self.bytes_out
+
+# Função para escolher o nível de compressão pelo tamanho
+def level_for_size(size):
+    for limit, level in LEVELS_BY_SIZE:
+        if size <= limit:
+            return level
+    return LARGE_FILE_LEVEL
+
+# Função para decidir se e como comprimir um arquivo
+def choose_level(path, size=None):
+    """Retorna o nível do gzip, ou None se o arquivo deve ser gravado sem compressão"""
+    if os.path.splitext(str(path))[1].lower() in SKIP_EXTENSIONS:
+        return None
+    if size is None:
+        size = os.path.getsize(path)
+    if size < MIN_COMPRESS_SIZE:
+        return None
+    # Testa uma amostra do início no nível mais rápido
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_SIZE)
+    if len(zlib.compress(sample, 1)) > len(sample) * MIN_SAMPLE_RATIO:
+        return None
+    return level_for_size(size)
@@ -0,0 +1,328 @@
+import io
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import importlib
+import contextlib
+import subprocess
+from pathlib import Path
+from ui import LazyConsole
+
+console = LazyConsole()
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+SOCKET_FILE = 'daemon.sock'
+DAEMON_COMMANDS = ('add', 'commit', 'log', 'status')
+NO_DAEMON_ENV = 'CHROMAGIT_NO_DAEMON'
+ENV_PREFIX = 'CHROMAGIT_'  # Configurações do cliente repassadas ao daemon (lock_timeout, hash_workers...)
+IMPORT_TIME_ENV = 'CHROMAGIT_IMPORT_TIME'  # Mede o import no cliente: não faz sentido no daemon
+CONNECT_TIMEOUT = 0.5  # Segundos para desistir de um daemon que não responde
+START_TIMEOUT = 5.0
+IDLE_TIMEOUT = 30 * 60  # Daemon encerra sozinho após 30 minutos sem requisições
+POLL_INTERVAL = 1.0
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# O daemon atende um repositório por um socket Unix em .chromagit/daemon.sock.
+# Cada conexão leva uma requisição JSON de uma linha e recebe uma resposta JSON:
+#   {"op": "run", "command": "log", "args": [...], "cwd": "...", "env": {...}} -> {"exit_code": 0, "output": "..."}
+#   {"op": "ping"} -> {"ok": true, "pid": ..., "requests": ...}
+#   {"op": "stop"} -> {"ok": true}
+# Os módulos dos comandos ficam importados e os caches em memória (índice de
+# arquivos, matcher do .gitignore) continuam válidos entre as requisições.
+# "env" traz as variáveis CHROMAGIT_* do cliente, que valem apenas durante a
+# requisição, como se o comando rodasse no processo do cliente.
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+def socket_path(repo_path):
+    return Path(repo_path) / CHROMAGIT_DIR / SOCKET_FILE
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX')
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+def _receive(conn):
+    with conn.makefile('rb') as f:
+        line = f.readline(MAX_REQUEST_SIZE)
+    return json.loads(line) if line else None
+
+# Função para enviar uma requisição ao daemon do repositório
+def request(repo_path, message, timeout=None):
+    """Retorna a resposta do daemon, ou None se não houver daemon em execução.
+
+    Falhas depois que a requisição foi enviada não retornam None, para que
+    quem chamou não execute o comando uma segunda vez.
+    """
+    path = socket_path(repo_path)
+    if not is_supported() or not path.exists():
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(str(path))
+        except OSError:
+            return None
+        client.settimeout(timeout)
+        try:
+            _send(client, message)
+            response = _receive(client)
+        except (OSError, ValueError) as e:
+            return {'ok': False, 'exit_code': 1, 'output': f"Erro de comunicação com o daemon: {e}\n"}
+        if response is None:
+            return {'ok': False, 'exit_code': 1, 'output': "Daemon encerrou a conexão sem resposta\n"}
+        return response
+    finally:
+        client.close()
+
+# Comandos que podem pedir confirmação no terminal não passam pelo daemon
+def needs_terminal(command, args):
+    if '-i' in args or '--interactive' in args:
+        return True
+    if command == 'commit' and not any(a in ('-m', '--message') or a.startswith('--message=') for a in args):
+        return True
+    return False
+
+# Função usada pelos clientes (main.py) para executar um comando pelo daemon
+def run_via_daemon(command, args, cwd=None):
+    """Executa o comando no daemon e repassa a saída; retorna o código de saída ou None"""
+    if os.environ.get(NO_DAEMON_ENV) == '1' or command not in DAEMON_COMMANDS:
+        return None
+    if os.environ.get(IMPORT_TIME_ENV) == '1':
+        return None
+    if needs_terminal(command, args):
+        return None
+    cwd = Path(cwd) if cwd else Path.cwd()
+    repo_path = find_repo_root(cwd)
+    if repo_path is None:
+        return None
+    env = {key: value for key, value in os.environ.items() if key.startswith(ENV_PREFIX)}
+    response = request(repo_path, {'op': 'run', 'command': command, 'args': list(args), 'cwd': str(cwd),
+                                   'env': env})
+    if response is None:
+        return None
+    sys.stdout.write(response.get('output', ''))
+    sys.stdout.flush()
+    return response.get('exit_code', 1)
+
+class DaemonServer:
+    """Servidor do daemon; atende uma requisição por vez no processo atual"""
+
+    def __init__(self, repo_path):
+        self.repo_path = Path(repo_path).resolve()
+        self.path = socket_path(self.repo_path)
+        self.running = False
+        self.requests = 0
+        self.started_at = time.time()
+        self.last_request = time.monotonic()
+
+    def run_command(self, command, args, cwd, env=None):
+        cwd = Path(cwd).resolve()
+        if cwd != self.repo_path and self.repo_path not in cwd.parents:
+            return {'exit_code': 1, 'output': f"Diretório {cwd} não pertence ao repositório do daemon\n"}
+
+        module = importlib.import_module(command)
+        output = io.StringIO()
+        saved_argv, saved_stdin, saved_cwd = sys.argv, sys.stdin, os.getcwd()
+        sys.argv = [f"{command}.py"] + list(args)
+        # Sem terminal: prompts recebem fim de arquivo em vez de travar o daemon
+        sys.stdin = io.StringIO()
+        # Variáveis CHROMAGIT_* do daemon são trocadas pelas do cliente durante a requisição
+        saved_env = {key: value for key, value in os.environ.items() if key.startswith(ENV_PREFIX)}
+        exit_code = 0
+        try:
+            for key in saved_env:
+                del os.environ[key]
+            if isinstance(env, dict):
+                os.environ.update({key: str(value) for key, value in env.items()
+                                   if key.startswith(ENV_PREFIX)})
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                try:
+                    module.main()
+                except SystemExit as e:
+                    if isinstance(e.code, int) or e.code is None:
+                        exit_code = e.code or 0
+                    else:
+                        output.write(f"{e.code}\n")
+                        exit_code = 1
+                except EOFError:
+                    output.write(f"Comando pediu entrada interativa; execute com {NO_DAEMON_ENV}=1\n")
+                    exit_code = 1
+                except Exception as e:
+                    output.write(f"Erro inesperado no daemon: {e}\n")
+                    exit_code = 1
+        finally:
+            sys.argv, sys.stdin = saved_argv, saved_stdin
+            for key in [key for key in os.environ if key.startswith(ENV_PREFIX)]:
+                del os.environ[key]
+            os.environ.update(saved_env)
+            os.chdir(saved_cwd)
+            oplog = sys.modules.get('oplog')
+            if oplog is not None:
+                oplog.flush_all()
+        return {'exit_code': exit_code, 'output': output.getvalue()}
+
+    def handle(self, conn):
+        try:
+            message = _receive(conn)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            _send(conn, {'ok': False, 'exit_code': 2, 'output': "Requisição inválida\n"})
+            return
+
+        op = message.get('op')
+        if op == 'ping':
+            response = {'ok': True, 'pid': os.getpid(), 'requests': self.requests,
+                        'started_at': self.started_at, 'repo': str(self.repo_path)}
+        elif op == 'stop':
+            self.running = False
+            response = {'ok': True}
+        elif op == 'run' and message.get('command') in DAEMON_COMMANDS:
+            self.requests += 1
+            response = self.run_command(message['command'], message.get('args', []),
+                                        message.get('cwd', str(self.repo_path)), message.get('env'))
+        else:
+            response = {'ok': False, 'exit_code': 2, 'output': f"Requisição não suportada: {op}\n"}
+        _send(conn, response)
+
+    def serve(self):
+        """Atende requisições até receber 'stop', SIGTERM ou ficar ocioso por IDLE_TIMEOUT"""
+        # Remove o socket de um daemon que não está mais em execução
+        if self.path.exists():
+            if request(self.repo_path, {'op': 'ping'}) is not None:
+                raise RuntimeError('Daemon já está em execução para este repositório')
+            self.path.unlink()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # Socket acessível apenas pelo dono
+        try:
+            server.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        server.listen(8)
+        server.settimeout(POLL_INTERVAL)
+
+        def stop(signum, frame):
+            self.running = False
+        signal.signal(signal.SIGTERM, stop)
+
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    if (time.monotonic() - self.last_request > IDLE_TIMEOUT
+                            or not (self.repo_path / CHROMAGIT_DIR).is_dir()):
+                        break
+                    continue
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        self.handle(conn)
+                    except OSError:
+                        pass
+                self.last_request = time.monotonic()
+        finally:
+            server.close()
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+# Função para iniciar o daemon em segundo plano
+def start_daemon(repo_path):
+    if request(repo_path, {'op': 'ping'}) is not None:
+        console.print('[yellow]Daemon já está em execução para este repositório.[/yellow]')
+        return True
+
+    if getattr(sys, 'frozen', False):
+        cmd = [sys.executable, 'run']
+    else:
+        cmd = [sys.executable, str(Path(__file__).resolve()), 'run']
+    subprocess.Popen(cmd, cwd=str(repo_path), stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        response = request(repo_path, {'op': 'ping'})
+        if response is not None and response.get('ok'):
+            console.print(f"[green]Daemon iniciado (pid {response['pid']}) em {socket_path(repo_path)}[/green]")
+            return True
+        time.sleep(0.05)
+    console.print('[red]Daemon não respondeu a tempo.[/red]')
+    return False
+
+def show_daemon_status(repo_path):
+    response = request(repo_path, {'op': 'ping'})
+    if response is None or not response.get('ok'):
+        console.print('[yellow]Daemon não está em execução.[/yellow]')
+        return False
+    uptime = time.time() - response['started_at']
+    console.print(f"[green]Daemon em execução[/green] (pid {response['pid']}, "
+                  f"{response['requests']} requisições, ativo há {uptime:.0f}s)")
+    return True
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Daemon que mantém o estado do repositório ChromaGit em memória')
+    parser.add_argument('action', nargs='?', default='start', choices=['start', 'stop', 'status', 'run'],
+                        help='start (segundo plano), run (primeiro plano), stop ou status')
+
+    args = parser.parse_args()
+
+    if not is_supported():
+        console.print('[red]Daemon requer sockets Unix, indisponíveis nesta plataforma.[/red]')
+        sys.exit(1)
+
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        sys.exit(1)
+
+    if args.action == 'start':
+        success = start_daemon(repo_path)
+    elif args.action == 'status':
+        success = show_daemon_status(repo_path)
+    elif args.action == 'stop':
+        response = request(repo_path, {'op': 'stop'})
+        success = response is not None and response.get('ok', False)
+        if success:
+            console.print('[green]Daemon encerrado.[/green]')
+        else:
+            console.print('[yellow]Daemon não está em execução.[/yellow]')
+    else:
+        try:
+            DaemonServer(repo_path).serve()
+            success = True
+        except (RuntimeError, OSError) as e:
+            console.print(f'[red]Erro ao iniciar daemon: {e}[/red]')
+            success = False
+
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
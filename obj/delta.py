@@ -0,0 +1,103 @@
+# Delta binário entre duas versões de um arquivo
+#
+# O delta é uma sequência de operações que reconstrói o alvo a partir da base:
+#   0x00 <varint offset> <varint tamanho> - copia bytes da base
+#   0x01 <varint tamanho> <dados>         - insere bytes literais
+#
+# As cópias são encontradas por linha (splitlines), o que funciona bem para os
+# arquivos que mais se beneficiam (logs, dumps SQL, código gerado) e é rápido
+# em Python puro. Arquivos binários sem quebras de linha geram deltas grandes e
+# acabam armazenados por inteiro.
+
+COPY_OP = 0x00
+INSERT_OP = 0x01
+MIN_COPY = 8  # Linhas menores só são copiadas quando continuam uma cópia anterior
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+# Função para calcular o delta que transforma `base` em `target`
+def create_delta(base, target):
+    base_lines = base.splitlines(keepends=True)
+    offsets = []
+    first_index = {}
+    offset = 0
+    for index, line in enumerate(base_lines):
+        offsets.append(offset)
+        offset += len(line)
+        first_index.setdefault(line, index)
+
+    out = bytearray()
+    literal = []
+    copy_offset = copy_length = 0
+    next_index = None
+
+    def flush_copy():
+        if copy_length:
+            out.append(COPY_OP)
+            write_varint(out, copy_offset)
+            write_varint(out, copy_length)
+
+    def flush_literal():
+        if literal:
+            data = b''.join(literal)
+            out.append(INSERT_OP)
+            write_varint(out, len(data))
+            out.extend(data)
+            literal.clear()
+
+    for line in target.splitlines(keepends=True):
+        # Continua a cópia atual enquanto as linhas seguirem a base
+        if next_index is not None and next_index < len(base_lines) and base_lines[next_index] == line:
+            copy_length += len(line)
+            next_index += 1
+            continue
+        index = first_index.get(line) if len(line) >= MIN_COPY else None
+        if index is None:
+            flush_copy()
+            copy_length = 0
+            next_index = None
+            literal.append(line)
+            continue
+        flush_copy()
+        flush_literal()
+        copy_offset, copy_length, next_index = offsets[index], len(line), index + 1
+
+    flush_copy()
+    flush_literal()
+    return bytes(out)
+
+# Função para reconstruir o alvo aplicando o delta sobre a base
+def apply_delta(base, delta):
+    out = bytearray()
+    position = 0
+    while position < len(delta):
+        op = delta[position]
+        position += 1
+        if op == COPY_OP:
+            offset, position = read_varint(delta, position)
+            length, position = read_varint(delta, position)
+            if offset + length > len(base):
+                raise ValueError('Delta corrompido: cópia fora da base')
+            out.extend(base[offset:offset + length])
+        elif op == INSERT_OP:
+            length, position = read_varint(delta, position)
+            out.extend(delta[position:position + length])
+            position += length
+        else:
+            raise ValueError(f'Delta corrompido: operação {op}')
+    return bytes(out)
@@ -0,0 +1,127 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Tamanho de cada leitura; a memória em uso fica limitada a workers * CHUNK_SIZE
+CHUNK_SIZE = 1024 * 1024  # 1MB
+MAX_WORKERS = 32
+PENDING_PER_WORKER = 4  # Tarefas enfileiradas por worker (limita memória com muitos arquivos)
+WORKERS_ENV = 'CHROMAGIT_HASH_WORKERS'
+
+# Algoritmos de hash do repositório (settings.hash_algorithm). Todos geram 32
+# bytes (64 caracteres hexadecimais), tamanho esperado pelo índice dos packs.
+# Trocar o algoritmo de um repositório existente exige o comando migrate-hash,
+# que renomeia os objetos e reescreve os hashes já gravados.
+HASH_ALGORITHMS = {
+    'sha256': hashlib.sha256,
+    'blake2b': lambda: hashlib.blake2b(digest_size=32),  # Mais rápido que SHA-256 sem SHA-NI
+}
+DEFAULT_ALGORITHM = 'sha256'
+
+# Função para obter o construtor do algoritmo de hash
+def get_hasher(algorithm=None):
+    try:
+        return HASH_ALGORITHMS[algorithm or DEFAULT_ALGORITHM]
+    except KeyError:
+        raise ValueError(f"Algoritmo de hash desconhecido: {algorithm}") from None
+
+# Função para obter o algoritmo de hash configurado no repositório
+def repository_algorithm(config):
+    return (config or {}).get('settings', {}).get('hash_algorithm') or DEFAULT_ALGORITHM
+
+# Função para calcular o hash de um arquivo aberto em modo binário
+def digest_file(f, algorithm=None):
+    """Usa hashlib.file_digest (Python 3.11+), que lê direto para um buffer
+    reaproveitado; nas versões anteriores faz o mesmo com readinto"""
+    hasher = get_hasher(algorithm)
+    if hasattr(hashlib, 'file_digest'):
+        return hashlib.file_digest(f, hasher).hexdigest()
+    digest = hasher()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        size = f.readinto(buffer)
+        if not size:
+            break
+        digest.update(view[:size])
+    return digest.hexdigest()
+
+# Função para calcular hash de arquivo (detecção de mudanças)
+def calculate_file_hash(file_path, algorithm=None):
+    """Calcula o hash de um arquivo; retorna None se não puder ser lido"""
+    try:
+        with open(file_path, "rb") as f:
+            return digest_file(f, algorithm)
+    except Exception:
+        return None
+
+# Função para calcular o hash de um conteúdo já em memória (chunks de arquivos grandes)
+def hash_bytes(data, algorithm=None):
+    digest = get_hasher(algorithm)()
+    digest.update(data)
+    return digest.hexdigest()
+
+# Função para definir o número de workers de hashing
+def resolve_workers(workers=None):
+    """Usa o valor informado, depois CHROMAGIT_HASH_WORKERS, depois o número de CPUs"""
+    if not workers:
+        workers = os.environ.get(WORKERS_ENV)
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, MAX_WORKERS))
+
+# Função para calcular hashes de vários arquivos em paralelo
+def hash_files(paths, sizes=None, workers=None, progress_callback=None, algorithm=None):
+    """Retorna a lista de hashes na mesma ordem de paths.
+
+    O hashlib libera o GIL ao processar blocos grandes, então um pool de threads
+    aproveita vários núcleos. Os maiores arquivos são agendados primeiro para que
+    um arquivo grande não fique sozinho no final da fila.
+    """
+    paths = list(paths)
+    results = [None] * len(paths)
+    if not paths:
+        return results
+
+    if sizes is None:
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(os.stat(path).st_size)
+            except OSError:
+                sizes.append(0)
+
+    order = sorted(range(len(paths)), key=lambda i: sizes[i], reverse=True)
+    workers = min(resolve_workers(workers), len(paths))
+
+    if workers == 1:
+        for i in order:
+            results[i] = calculate_file_hash(paths[i], algorithm)
+            if progress_callback:
+                progress_callback(paths[i], results[i])
+        return results
+
+    max_pending = workers * PENDING_PER_WORKER
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        queue = iter(order)
+        for i in queue:
+            pending[executor.submit(calculate_file_hash, paths[i], algorithm)] = i
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                results[i] = future.result()
+                if progress_callback:
+                    progress_callback(paths[i], results[i])
+            for i in queue:
+                pending[executor.submit(calculate_file_hash, paths[i], algorithm)] = i
+                if len(pending) >= max_pending:
+                    break
+
+    return results
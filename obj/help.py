@@ -362,8 +362,8 @@ def show_status_help():
     console.print(title)
     
     description = Panel(
-        "[white]Exibe o status atual do repositório incluindo arquivos em staging, "
-        "commits, configurações e sincronização com remoto.[/white]",
+        "[white]Classifica os arquivos como em staging, modificados, removidos, "
+        "não rastreados ou sem alterações em relação ao último commit.[/white]",
         title="Descrição",
         border_style="green"
     )
@@ -382,8 +382,10 @@ def show_status_help():
     options_table.add_column("Opção", style="cyan", width=25)
     options_table.add_column("Descrição", style="white", width=55)
     
-    options_table.add_row("--detailed", "Exibe informações detalhadas")
-    options_table.add_row("--remote", "Inclui status do repositório remoto")
+    options_table.add_row("-s, --short", "Uma linha por arquivo, sem cores")
+    options_table.add_row("-u, --unchanged", "Lista também os arquivos sem alterações")
+    options_table.add_row("-n, --limit", "Máximo de arquivos por categoria (0 = todos)")
+    options_table.add_row("--full-scan", "Ignora o watcher e varre todas as pastas")
     
     console.print(options_table)
 
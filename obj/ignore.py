@@ -0,0 +1,118 @@
+import os
+import re
+
+# Tipos de regra do .gitignore
+BASENAME_RULE = 'basename'  # Sem barra: vale para o nome em qualquer nível (ex: *.pyc)
+ANCHORED_RULE = 'anchored'  # Com barra: relativo à raiz do repositório (ex: build/*.o)
+
+# Função para converter um padrão do .gitignore em expressão regular
+def translate_pattern(pattern):
+    regex = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == '*':
+            if pattern[i:i + 3] == '**/':
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                regex.append('.*')
+                i += 2
+                continue
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                content = pattern[i + 1:end]
+                if content.startswith('!'):
+                    content = '^' + content[1:]
+                regex.append(f'[{content}]')
+                i = end
+        elif char == '\\' and i + 1 < length:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return ''.join(regex)
+
+# Função para interpretar uma linha do .gitignore
+def parse_rule(line):
+    """Retorna (negada, somente_diretório, tipo, regex) ou None para linhas vazias"""
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    if '/' in line:
+        return negate, dir_only, ANCHORED_RULE, translate_pattern(line.lstrip('/'))
+    return negate, dir_only, BASENAME_RULE, translate_pattern(line)
+
+class IgnoreMatcher:
+    """Padrões do .gitignore compilados em poucas expressões regulares.
+
+    Regras consecutivas do mesmo tipo (negação, somente diretório, nome ou
+    caminho ancorado) viram uma única regex. Como no git, a última regra que
+    casa decide, então os grupos são avaliados de trás para frente.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.groups = []
+        current_key = None
+        current = []
+        for pattern in self.patterns:
+            rule = parse_rule(pattern)
+            if rule is None:
+                continue
+            key = rule[:3]
+            if key != current_key and current:
+                self.groups.append(self._compile_group(current_key, current))
+                current = []
+            current_key = key
+            current.append(rule[3])
+        if current:
+            self.groups.append(self._compile_group(current_key, current))
+        self.groups.reverse()
+
+    @staticmethod
+    def _compile_group(key, regexes):
+        negate, dir_only, kind = key
+        combined = re.compile('(?:' + '|'.join(regexes) + r')\Z', re.DOTALL)
+        return negate, dir_only, kind, combined
+
+    @staticmethod
+    def _normalize(rel_path):
+        return str(rel_path).replace(os.sep, '/').strip('/')
+
+    # Verifica apenas o próprio caminho (os diretórios pais já foram aceitos)
+    def match_entry(self, rel_path, is_dir=False):
+        rel_path = self._normalize(rel_path)
+        name = rel_path.rsplit('/', 1)[-1]
+        for negate, dir_only, kind, regex in self.groups:
+            if dir_only and not is_dir:
+                continue
+            target = name if kind == BASENAME_RULE else rel_path
+            if regex.match(target):
+                return not negate
+        return False
+
+    # Verifica o caminho e todos os diretórios pais
+    def match(self, rel_path, is_dir=False):
+        parts = self._normalize(rel_path).split('/')
+        for depth in range(1, len(parts)):
+            if self.match_entry('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return self.match_entry('/'.join(parts), is_dir=is_dir)
+
+# Função para compilar uma lista de padrões
+def compile_ignore(patterns):
+    return IgnoreMatcher(patterns)
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+from pathlib import Path
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+INDEX_FILE = 'index'
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000  # Arquivos modificados há menos de 2s não são confiáveis
+COMPACT_RATIO = 2  # Compacta quando há o dobro de linhas em relação às entradas vivas
+
+# Entradas já carregadas neste processo, por arquivo de índice: {caminho: (stat, entradas, linhas)}.
+# Processos longos (modo interativo, daemon) não relêem o índice se ele não mudou.
+_loaded = {}
+
+def _file_key(path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+class FileIndex:
+    """Cache de (tamanho, mtime_ns, inode) -> hash persistido em .chromagit/index.
+
+    O arquivo é um log JSON de uma entrada por linha, gravado de forma incremental.
+    Ao carregar, a última linha de cada caminho prevalece e uma linha final
+    truncada (queda no meio da gravação) é simplesmente descartada.
+    """
+
+    def __init__(self, chromagit_path):
+        self.path = Path(chromagit_path) / INDEX_FILE
+        self.entries = {}
+        self._lines = 0
+        self._handle = None
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load(self):
+        key = _file_key(self.path)
+        if key is None:
+            return
+        cached = _loaded.get(str(self.path))
+        if cached is not None and cached[0] == key:
+            self.entries = dict(cached[1])
+            self._lines = cached[2]
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        # Decodifica tudo em uma chamada; só relê linha a linha se houver uma linha corrompida
+        try:
+            decoded = json.loads('[' + ','.join(line for line in lines if line) + ']')
+        except ValueError:
+            decoded = []
+            for line in lines:
+                try:
+                    decoded.append(json.loads(line))
+                except ValueError:
+                    continue
+        self._lines = len(decoded)
+        for entry in decoded:
+            if entry.get('deleted'):
+                self.entries.pop(entry['path'], None)
+            else:
+                self.entries[entry['path']] = entry
+
+    def _append(self, entry):
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        self._handle.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._lines += 1
+
+    # Retorna o hash em cache se os metadados do arquivo não mudaram
+    def lookup(self, rel_path, st):
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return None
+        if (entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+                and entry['ino'] == st.st_ino):
+            return entry['hash']
+        return None
+
+    # Registra o hash calculado para os metadados atuais do arquivo
+    def record(self, rel_path, st, file_hash):
+        if file_hash is None:
+            return
+        # Arquivo alterado no mesmo intervalo de resolução do mtime pode mudar sem alterar o stat
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        entry = {
+            'path': rel_path,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'ino': st.st_ino,
+            'hash': file_hash
+        }
+        if self.entries.get(rel_path) == entry:
+            return
+        self.entries[rel_path] = entry
+        self._append(entry)
+
+    def remove(self, rel_path):
+        if self.entries.pop(rel_path, None) is not None:
+            self._append({'path': rel_path, 'deleted': True})
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    # Reescreve o índice apenas com as entradas vivas
+    def compact(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        temp_path = self.path.with_name(f"{INDEX_FILE}.tmp{os.getpid()}")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._lines = len(self.entries)
+
+    def close(self):
+        self.flush()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._lines > COMPACT_RATIO * max(len(self.entries), 1024):
+            self.compact()
+        key = _file_key(self.path)
+        if key is not None:
+            _loaded[str(self.path)] = (key, self.entries, self._lines)
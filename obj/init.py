@@ -1,9 +1,13 @@
 import os
 import json
+import tempfile
 import datetime
 import argparse
 import sys
 from pathlib import Path
+from oplog import get_logger
+from hashing import HASH_ALGORITHMS, DEFAULT_ALGORITHM, repository_algorithm
+from lock import repository_lock, LockTimeout
 
 try:
     from rich import print
@@ -23,17 +27,45 @@ PACKAGES_DIR = 'packages'
 BACKUP_DIR = 'backup'
 LOGS_DIR = 'logs'
 TEMP_DIR = 'temp'
+INDEX_FILE = 'index'
+WATCH_DIR = 'watch'
 
-# Função para log de operações (compatível com add.py)
-def log_operation(operation, details, chromagit_path):
-    logs_path = chromagit_path / LOGS_DIR
-    logs_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().isoformat()
-    log_file = logs_path / f"init_operations_{datetime.date.today()}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {operation}: {details}\n")
+# Arquivos que dependem do histórico ou do staging: apagados ao reinicializar,
+# para que log e metadata.total_commits concordem com o config novo. commits.idx
+# vem primeiro: um commit só existe pelo seu offset, então uma interrupção no meio
+# deixa no máximo bytes órfãos, nunca offsets apontando para um journal apagado
+RESET_FILES = [
+    'commits.idx', 'commits.hashidx', 'commits.hashtail', 'head.tree', 'commits.jsonl',
+    INDEX_FILE,
+    f'{WATCH_DIR}/checkpoint', f'{WATCH_DIR}/worktree.json',
+]
 
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path, per_file=False):
+    get_logger(chromagit_path, 'init').log(operation, details, per_file=per_file)
+
+# Função para descartar histórico e caches de um repositório reinicializado
+def reset_repository_files(chromagit_path):
+    for name in RESET_FILES:
+        try:
+            (chromagit_path / name).unlink()
+        except FileNotFoundError:
+            pass
+
+# Função principal: num repositório existente, roda sob o lock exclusivo
+# (a reinicialização apaga journal, índices e config usados pelos outros comandos)
 def init(path, options=None):
+    chromagit_path = Path(path) / CHROMAGIT_DIR
+    if not chromagit_path.is_dir():
+        return _init(path, options)
+    try:
+        with repository_lock(chromagit_path, exclusive=True):
+            return _init(path, options)
+    except LockTimeout as e:
+        console.print(f'[red]{e}[/red]')
+        return False
+
+def _init(path, options=None):
     if options is None:
         options = {}
     
@@ -44,6 +76,8 @@ def init(path, options=None):
         log_path = chromagit_path / 'log.txt'
         packages_path = chromagit_path / PACKAGES_DIR
 
+        hash_algorithm = options.get('hash_algorithm')
+        
         # Verifica se já está inicializado
         if chromagit_path.exists():
             if not options.get('force', False):
@@ -51,7 +85,16 @@ def init(path, options=None):
                 console.print('[blue]Use --force para reinicializar.[/blue]')
                 return False
             else:
+                # Os objetos em packages são mantidos: trocar o algoritmo exige migrá-los
+                current_algorithm = repository_algorithm(get_repo_info(repo_path))
+                if hash_algorithm and hash_algorithm != current_algorithm:
+                    console.print(f'[red]O repositório usa {current_algorithm}; a reinicialização não troca o algoritmo de hash.[/red]')
+                    console.print(f'[blue]Use: python main.py migrate-hash {hash_algorithm}[/blue]')
+                    return False
+                hash_algorithm = current_algorithm
                 console.print('[yellow]Reinicializando repositório...[/yellow]')
+                reset_repository_files(chromagit_path)
+                log_operation("REINIT_RESET", "Removed commit journal, index and watcher state", chromagit_path)
 
         # Cria estrutura principal do .chromagit
         chromagit_path.mkdir(parents=True, exist_ok=True)
@@ -78,31 +121,35 @@ def init(path, options=None):
                 "branch": "main"
             },
             "version": "0.1.0",
-            "commits": [],
             "packages": {},
             "staged": [],
             "metadata": {
                 "created_at": datetime.datetime.now().isoformat(),
                 "created_by": "ChromaGit Init",
+                "total_commits": 0,
                 "last_modified": datetime.datetime.now().isoformat()
             },
             "settings": {
                 "auto_backup": True,
-                "max_file_size": 100 * 1024 * 1024,  # 100MB
+                "backup_retention": {"keep_last": 20, "keep_daily": 14},
+                "lock_timeout": 30,
+                "max_file_size": None,  # Sem limite: arquivos grandes são gravados em chunks
                 "compress_files": False,
+                "delta_storage": True,
+                "hash_algorithm": hash_algorithm or DEFAULT_ALGORITHM,
                 "ignore_binary": True
             }
         }
         
         # Salva config usando método compatível com add.py
-        temp_config = chromagit_path / TEMP_DIR / 'config_temp.json'
-        with open(temp_config, 'w', encoding='utf-8') as f:
+        fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path / TEMP_DIR)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=4)
         
         if config_path.exists() and os.name == 'nt':
             os.system(f'attrib -r -h "{config_path}"')
         
-        temp_config.rename(config_path)
+        os.replace(temp_config, config_path)
         
         if os.name == 'nt':
             os.system(f'attrib +h "{config_path}"')
@@ -159,12 +206,16 @@ def main():
     parser.add_argument('path', nargs='?', default=os.getcwd(), help='Caminho para inicializar o repositório')
     parser.add_argument('-f', '--force', action='store_true', help='Força reinicialização mesmo se já existir')
     parser.add_argument('-v', '--verbose', action='store_true', help='Modo verboso com informações extras')
+    parser.add_argument('--hash-algorithm', choices=sorted(HASH_ALGORITHMS),
+                        help=f'Algoritmo de hash do repositório (padrão: {DEFAULT_ALGORITHM}; '
+                             'na reinicialização, o atual; ver migrate-hash --benchmark)')
     
     args = parser.parse_args()
     
     options = {
         'force': args.force,
-        'verbose': args.verbose
+        'verbose': args.verbose,
+        'hash_algorithm': args.hash_algorithm
     }
     
     success = init(args.path, options)
@@ -0,0 +1,354 @@
+import os
+import json
+import mmap
+import struct
+import tempfile
+from pathlib import Path
+from lock import repository_lock, MIGRATE_LOCK_FILE
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+CONFIG_FILE = 'config.json'
+TEMP_DIR = 'temp'
+JOURNAL_FILE = 'commits.jsonl'
+JOURNAL_INDEX_FILE = 'commits.idx'
+OFFSET_FORMAT = '>Q'
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+HASH_INDEX_FILE = 'commits.hashidx'
+HASH_TAIL_FILE = 'commits.hashtail'
+HASH_KEY_SIZE = 16  # Tamanho do hash de commit gerado por generate_commit_hash
+HASH_RECORD_FORMAT = f'>{HASH_KEY_SIZE}sQ'
+HASH_RECORD_SIZE = struct.calcsize(HASH_RECORD_FORMAT)
+HASH_TAIL_MAX = 512  # Registros fora de ordem antes de reordenar o índice
+HEAD_TREE_FILE = 'head.tree'
+
+# Árvores já carregadas neste processo (daemon): {caminho: (stat do commits.idx, árvore)}
+_head_trees = {}
+
+# O histórico de commits fica em um journal somente de acréscimo:
+#   commits.jsonl - um commit JSON por linha, na ordem em que foram criados
+#   commits.idx   - offset (8 bytes) do início de cada linha do journal
+# Um commit só existe depois que seu offset foi gravado no índice, então uma
+# queda no meio da gravação deixa apenas bytes órfãos no fim do journal, que
+# são descartados na próxima gravação.
+#
+# Para buscar commits por hash abreviado existe ainda um índice de hashes:
+#   commits.hashidx  - registros (hash, posição) ordenados por hash (busca binária)
+#   commits.hashtail - registros dos commits mais recentes, ainda fora de ordem
+# Quando a cauda passa de HASH_TAIL_MAX registros ela é incorporada ao índice
+# ordenado. Se os dois arquivos não cobrirem todos os commits (queda, migração),
+# o índice é reconstruído a partir do journal.
+#
+# head.tree guarda o conteúdo do último commit (caminho -> hash). Cada commit
+# registra apenas os arquivos do staging, então a árvore é o acúmulo de todos
+# os commits; o arquivo anota quantos commits já foram aplicados e é atualizado
+# apenas com os commits novos.
+
+def _journal_paths(chromagit_path):
+    chromagit_path = Path(chromagit_path)
+    return chromagit_path / JOURNAL_FILE, chromagit_path / JOURNAL_INDEX_FILE
+
+# Função para contar commits sem ler o journal
+def count_commits(chromagit_path):
+    _, index_path = _journal_paths(chromagit_path)
+    try:
+        return index_path.stat().st_size // OFFSET_SIZE
+    except FileNotFoundError:
+        return 0
+
+def _read_offset(index_file, position):
+    index_file.seek(position * OFFSET_SIZE)
+    return struct.unpack(OFFSET_FORMAT, index_file.read(OFFSET_SIZE))[0]
+
+# Função para ler um commit pela posição (0 = mais antigo)
+def read_commit(chromagit_path, position):
+    journal_path, index_path = _journal_paths(chromagit_path)
+    with open(index_path, 'rb') as index_file:
+        offset = _read_offset(index_file, position)
+    with open(journal_path, 'rb') as journal_file:
+        journal_file.seek(offset)
+        return json.loads(journal_file.readline())
+
+# Função para percorrer commits, opcionalmente do mais recente para o mais antigo
+def iter_commits(chromagit_path, reverse=False, skip=0, limit=None):
+    """Decodifica apenas os commits percorridos, usando o índice de offsets"""
+    total = count_commits(chromagit_path)
+    if total == 0:
+        return
+    positions = range(total - 1, -1, -1) if reverse else range(total)
+    positions = positions[skip:]
+    if limit is not None:
+        positions = positions[:limit]
+
+    journal_path, index_path = _journal_paths(chromagit_path)
+    with open(index_path, 'rb') as index_file, open(journal_path, 'rb') as journal_file:
+        for position in positions:
+            journal_file.seek(_read_offset(index_file, position))
+            yield json.loads(journal_file.readline())
+
+# Função para obter o commit mais recente
+def last_commit(chromagit_path):
+    total = count_commits(chromagit_path)
+    if total == 0:
+        return None
+    return read_commit(chromagit_path, total - 1)
+
+# Função para acrescentar um commit ao journal
+def append_commit(chromagit_path, commit_data):
+    """Grava o commit no fim do journal e registra seu offset; retorna a posição"""
+    journal_path, index_path = _journal_paths(chromagit_path)
+    record = (json.dumps(commit_data, ensure_ascii=False) + '\n').encode('utf-8')
+
+    with open(index_path, 'ab+') as index_file:
+        # Descarta um offset parcialmente gravado
+        index_size = index_file.seek(0, os.SEEK_END)
+        total = index_size // OFFSET_SIZE
+        if index_size % OFFSET_SIZE:
+            index_file.truncate(total * OFFSET_SIZE)
+
+        with open(journal_path, 'ab+') as journal_file:
+            # Calcula onde termina o último commit confirmado
+            end = 0
+            if total:
+                journal_file.seek(_read_offset(index_file, total - 1))
+                journal_file.readline()
+                end = journal_file.tell()
+            if journal_file.seek(0, os.SEEK_END) != end:
+                journal_file.truncate(end)
+
+            journal_file.write(record)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+        index_file.seek(0, os.SEEK_END)
+        index_file.write(struct.pack(OFFSET_FORMAT, end))
+        index_file.flush()
+        os.fsync(index_file.fileno())
+
+    _append_hash_record(chromagit_path, commit_data['hash'], total)
+    return total
+
+def _hash_paths(chromagit_path):
+    chromagit_path = Path(chromagit_path)
+    return chromagit_path / HASH_INDEX_FILE, chromagit_path / HASH_TAIL_FILE
+
+def _hash_key(commit_hash):
+    return commit_hash[:HASH_KEY_SIZE].encode('ascii').ljust(HASH_KEY_SIZE, b'\0')
+
+def _read_hash_records(path):
+    if not path.exists():
+        return []
+    data = path.read_bytes()
+    usable = len(data) - len(data) % HASH_RECORD_SIZE
+    return [struct.unpack_from(HASH_RECORD_FORMAT, data, i) for i in range(0, usable, HASH_RECORD_SIZE)]
+
+def _record_count(path):
+    try:
+        return path.stat().st_size // HASH_RECORD_SIZE
+    except FileNotFoundError:
+        return 0
+
+# Função para gravar o índice ordenado de hashes de forma atômica
+def _write_sorted_hash_index(chromagit_path, records):
+    index_path, tail_path = _hash_paths(chromagit_path)
+    temp_path = index_path.with_name(f"{HASH_INDEX_FILE}.tmp{os.getpid()}")
+    with open(temp_path, 'wb') as f:
+        for key, position in sorted(records):
+            f.write(struct.pack(HASH_RECORD_FORMAT, key, position))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, index_path)
+    with open(tail_path, 'wb'):
+        pass
+
+def _append_hash_record(chromagit_path, commit_hash, position):
+    index_path, tail_path = _hash_paths(chromagit_path)
+    # Índice desatualizado: a próxima busca reconstrói a partir do journal
+    if _record_count(index_path) + _record_count(tail_path) != position:
+        return
+    with open(tail_path, 'ab') as f:
+        f.write(struct.pack(HASH_RECORD_FORMAT, _hash_key(commit_hash), position))
+    if _record_count(tail_path) > HASH_TAIL_MAX:
+        _write_sorted_hash_index(chromagit_path, _read_hash_records(index_path) + _read_hash_records(tail_path))
+
+# Função para reconstruir o índice de hashes percorrendo o journal uma vez
+def rebuild_hash_index(chromagit_path):
+    records = [(_hash_key(commit['hash']), position)
+               for position, commit in enumerate(iter_commits(chromagit_path))]
+    _write_sorted_hash_index(chromagit_path, records)
+
+def _search_sorted_index(index_path, prefix):
+    size = _record_count(index_path)
+    if size == 0:
+        return []
+    matches = []
+    with open(index_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # Busca binária pelo primeiro hash >= prefixo
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * HASH_RECORD_SIZE
+            if data[start:start + HASH_KEY_SIZE] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        while low < size:
+            key, position = struct.unpack_from(HASH_RECORD_FORMAT, data, low * HASH_RECORD_SIZE)
+            if not key.startswith(prefix):
+                break
+            matches.append((key.rstrip(b'\0').decode('ascii'), position))
+            low += 1
+    return matches
+
+# Função para encontrar commits a partir de um hash abreviado
+def find_commits_by_prefix(chromagit_path, prefix):
+    """Retorna [(hash, posição)] dos commits cujo hash começa com o prefixo.
+
+    Mais de um resultado significa que o prefixo é ambíguo.
+    """
+    prefix = prefix.strip().lower()[:HASH_KEY_SIZE].encode('ascii', 'ignore')
+    if not prefix:
+        return []
+    index_path, tail_path = _hash_paths(chromagit_path)
+    if _record_count(index_path) + _record_count(tail_path) != count_commits(chromagit_path):
+        rebuild_hash_index(chromagit_path)
+
+    matches = _search_sorted_index(index_path, prefix)
+    for key, position in _read_hash_records(tail_path):
+        if key.startswith(prefix):
+            matches.append((key.rstrip(b'\0').decode('ascii'), position))
+    return sorted(matches, key=lambda match: match[1])
+
+# Função para obter a árvore do último commit (caminho -> hash)
+def load_head_tree(chromagit_path):
+    """Aplica ao head.tree apenas os commits ainda não incorporados.
+
+    O dicionário retornado é compartilhado com o cache do processo e não deve
+    ser alterado por quem chama.
+    """
+    tree_path = Path(chromagit_path) / HEAD_TREE_FILE
+    total = count_commits(chromagit_path)
+    try:
+        st = _journal_paths(chromagit_path)[1].stat()
+        key = (st.st_size, st.st_mtime_ns, st.st_ino)
+    except FileNotFoundError:
+        key = None
+    cached = _head_trees.get(str(tree_path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    applied, files = 0, {}
+    try:
+        with open(tree_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        applied, files = data['commits'], data['files']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    # Journal menor que a árvore (restaurado de backup): reconstrói do início
+    if applied > total:
+        applied, files = 0, {}
+    if applied == total:
+        _head_trees[str(tree_path)] = (key, files)
+        return files
+
+    for commit in iter_commits(chromagit_path, skip=applied):
+        for file_info in commit.get('files', []):
+            files[file_info['path']] = file_info.get('hash')
+
+    temp_path = tree_path.with_name(f"{HEAD_TREE_FILE}.tmp{os.getpid()}")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'commits': total, 'files': files}, separators=(',', ':')))
+        os.replace(temp_path, tree_path)
+    except OSError:
+        pass  # Sem permissão de escrita: a árvore é recalculada na próxima vez
+    _head_trees[str(tree_path)] = (key, files)
+    return files
+
+# Função para reescrever todos os commits em uma única passada
+def rewrite_commits(chromagit_path, transform):
+    """Aplica transform(commit) -> commit a cada commit, lendo e gravando uma linha por vez.
+
+    Journal e offsets novos são gravados em temporários e renomeados no fim. As
+    posições não mudam; se os hashes de commit forem mantidos, o índice de hashes
+    continua válido. head.tree é descartado e reconstruído na próxima leitura.
+    Retorna o número de commits reescritos.
+    """
+    chromagit_path = Path(chromagit_path)
+    journal_path, index_path = _journal_paths(chromagit_path)
+    total = count_commits(chromagit_path)
+    if total == 0:
+        return 0
+    temp_journal = journal_path.with_name(f"{JOURNAL_FILE}.tmp{os.getpid()}")
+    temp_index = index_path.with_name(f"{JOURNAL_INDEX_FILE}.tmp{os.getpid()}")
+    try:
+        with open(temp_journal, 'wb') as journal_file, open(temp_index, 'wb') as index_file:
+            for commit_data in iter_commits(chromagit_path):
+                index_file.write(struct.pack(OFFSET_FORMAT, journal_file.tell()))
+                commit_data = transform(commit_data)
+                journal_file.write((json.dumps(commit_data, ensure_ascii=False) + '\n').encode('utf-8'))
+            for f in (journal_file, index_file):
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_journal, journal_path)
+        os.replace(temp_index, index_path)
+    except Exception:
+        for temp in (temp_journal, temp_index):
+            if temp.exists():
+                temp.unlink()
+        raise
+
+    tree_path = chromagit_path / HEAD_TREE_FILE
+    _head_trees.pop(str(tree_path), None)
+    try:
+        tree_path.unlink()
+    except FileNotFoundError:
+        pass
+    return total
+
+# Função para migrar commits guardados no config.json para o journal
+def migrate_config_commits(chromagit_path, config):
+    """Move config['commits'] (formato antigo) para o journal; retorna True se migrou"""
+    if 'commits' not in config:
+        return False
+    commits = config.pop('commits') or []
+    # Só migra se o journal estiver vazio, para que uma migração interrompida não duplique commits
+    if count_commits(chromagit_path) == 0:
+        for commit_data in commits:
+            append_commit(chromagit_path, commit_data)
+    config.setdefault('metadata', {})['total_commits'] = count_commits(chromagit_path)
+    return True
+
+# Função para garantir que o config.json já esteja no formato com journal
+def ensure_migrated(chromagit_path):
+    chromagit_path = Path(chromagit_path)
+    config_path = chromagit_path / CONFIG_FILE
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if 'commits' not in config:
+        return config
+
+    # log e status também chegam aqui (com o lock compartilhado): a migração é
+    # serializada por um lock próprio e o config é relido depois de obtê-lo
+    with repository_lock(chromagit_path, name=MIGRATE_LOCK_FILE):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not migrate_config_commits(chromagit_path, config):
+            return config
+
+        temp_dir = chromagit_path / TEMP_DIR
+        temp_dir.mkdir(exist_ok=True)
+        fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=temp_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4)
+
+        # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
+        if os.name == 'nt' and config_path.exists():
+            os.system(f'attrib -r -h "{config_path}"')
+
+        os.replace(temp_config, config_path)
+
+        # Restaura atributo oculto após salvar (Windows)
+        if os.name == 'nt':
+            os.system(f'attrib +h "{config_path}"')
+
+    return config
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import functools
+import threading
+import contextlib
+from pathlib import Path
+from ui import LazyConsole
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+CONFIG_FILE = 'config.json'
+LOCK_FILE = 'lock'
+MIGRATE_LOCK_FILE = 'migrate.lock'
+DEFAULT_TIMEOUT = 30.0  # Segundos; settings.lock_timeout ou CHROMAGIT_LOCK_TIMEOUT mudam o valor
+TIMEOUT_ENV = 'CHROMAGIT_LOCK_TIMEOUT'
+POLL_INTERVAL = 0.05
+
+# Lock do repositório
+#
+# Comandos que só leem (log, status) pegam o lock compartilhado de
+# .chromagit/lock; comandos que alteram config.json, staging, journal ou
+# objetos (add, commit, push, repack, migrate-hash, backup restore, init --force)
+# pegam o lock exclusivo. Vários leitores rodam juntos; um escritor espera os demais
+# terminarem, até o timeout.
+#
+# O lock usa flock (fcntl) sobre um descritor aberto a cada aquisição, então
+# também separa threads do mesmo processo (ChromaGit Desktop, daemon). Dentro de
+# uma thread o lock é reentrante: funções que já rodam sob o lock exclusivo
+# (create_backup, por exemplo) podem pedir o lock de novo sem travar.
+# A migração de configs antigos (journal.ensure_migrated) também roda a partir
+# de leitores, então usa um lock exclusivo próprio (MIGRATE_LOCK_FILE).
+# No Windows sem fcntl usa-se msvcrt.locking, que só tem modo exclusivo; sem
+# nenhum dos dois o lock não faz nada.
+
+# Locks em poder da thread atual: {caminho do lock: [exclusivo, contagem]}
+_held = threading.local()
+
+class LockTimeout(TimeoutError):
+    """O lock não foi obtido dentro do timeout"""
+
+# Função para ler o timeout: variável de ambiente, settings.lock_timeout ou padrão
+def lock_timeout(chromagit_path):
+    value = os.environ.get(TIMEOUT_ENV)
+    if value is None:
+        try:
+            with open(Path(chromagit_path) / CONFIG_FILE, 'r', encoding='utf-8') as f:
+                value = (json.load(f).get('settings') or {}).get('lock_timeout')
+        except (OSError, ValueError):
+            value = None
+    try:
+        return DEFAULT_TIMEOUT if value is None else float(value)
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+def _try_lock(fd, exclusive):
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+    if msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    return True
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+# Função para obter o lock do repositório enquanto o bloco executa
+@contextlib.contextmanager
+def repository_lock(chromagit_path, exclusive=True, timeout=None, name=LOCK_FILE):
+    """name permite locks separados para partes do repositório (ver journal.ensure_migrated)"""
+    path = str(Path(chromagit_path) / name)
+    held = getattr(_held, 'locks', None)
+    if held is None:
+        held = _held.locks = {}
+
+    current = held.get(path)
+    if current is not None:
+        if exclusive and not current[0]:
+            raise RuntimeError("Lock compartilhado não pode ser promovido a exclusivo")
+        current[1] += 1
+        try:
+            yield
+        finally:
+            current[1] -= 1
+        return
+
+    if timeout is None:
+        timeout = lock_timeout(chromagit_path)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = time.monotonic() + timeout
+        while not _try_lock(fd, exclusive):
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Repositório em uso por outra operação (aguardou {timeout:g}s)")
+            time.sleep(POLL_INTERVAL)
+        held[path] = [exclusive, 1]
+        try:
+            yield
+        finally:
+            del held[path]
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+# Decorador para comandos: executa a função sob o lock do repositório do diretório atual
+def locked(exclusive=True):
+    """Sem repositório a função roda sem lock (e exibe o próprio erro); se o lock
+    não vier dentro do timeout, exibe o erro e retorna False"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            repo_path = find_repo_root()
+            if repo_path is None:
+                return function(*args, **kwargs)
+            try:
+                with repository_lock(repo_path / CHROMAGIT_DIR, exclusive=exclusive):
+                    return function(*args, **kwargs)
+            except LockTimeout as e:
+                console.print(f'[red]{e}[/red]')
+                return False
+        return wrapper
+    return decorator
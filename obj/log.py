@@ -1,13 +1,12 @@
 import os
-import json
 import sys
 from pathlib import Path
-from rich import print
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+from journal import count_commits, iter_commits, read_commit, find_commits_by_prefix, ensure_migrated
+from lock import locked
+from ui import LazyConsole
 
-console = Console()
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
 
 CHROMAGIT_DIR = '.chromagit'
 CONFIG_FILE = 'config.json'
@@ -27,98 +26,118 @@ def find_repo_root(start_path=None):
     
     return None
 
-def show_log(limit=10):
-    """Exibe o histórico de commits do ChromaGit"""
+def format_date(timestamp):
+    try:
+        from datetime import datetime
+        dt = datetime.fromisoformat(timestamp)
+        return dt.strftime("%d/%m/%Y %H:%M:%S")
+    except:
+        return timestamp
+
+@locked(exclusive=False)
+def show_log(limit=10, skip=0, oneline=False):
+    """Exibe o histórico de commits do ChromaGit.
+
+    Os commits são lidos do fim do journal, do mais recente para o mais antigo,
+    e apenas os `limit` commits exibidos (após pular `skip`) são decodificados.
+    """
     repo_path = find_repo_root()
     if repo_path is None:
         console.print('[red]Repositório ChromaGit não encontrado![/red]')
         return False
     
-    config_path = repo_path / CHROMAGIT_DIR / CONFIG_FILE
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    config_path = chromagit_path / CONFIG_FILE
     
     if not config_path.exists():
         console.print('[red]Repositório não inicializado![/red]')
         return False
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    ensure_migrated(chromagit_path)
+    total_commits = count_commits(chromagit_path)
+    skip = max(skip, 0)
+    
+    if not total_commits:
+        if not oneline:
+            console.print('[yellow]Nenhum commit encontrado.[/yellow]')
+        return True
     
-    commits = config.get('commits', [])
+    commits = iter_commits(chromagit_path, reverse=True, skip=skip, limit=limit)
     
-    if not commits:
-        console.print('[yellow]Nenhum commit encontrado.[/yellow]')
+    # Formato compacto: uma linha por commit, sem cores, próprio para pipes e pagers
+    if oneline:
+        for commit_data in commits:
+            sys.stdout.write(f"{commit_data['hash'][:12]} {format_date(commit_data['timestamp'])} "
+                             f"{commit_data['author']['name']}: {commit_data['message']}\n")
+        sys.stdout.flush()
         return True
     
+    from rich.panel import Panel
+    
+    console.print(f"\n[bold]Histórico de Commits ({total_commits} total)[/bold]\n")
+    
     # Exibe commits mais recentes primeiro
-    recent_commits = commits[-limit:] if len(commits) > limit else commits
-    recent_commits.reverse()
-    
-    console.print(f"\n[bold]Histórico de Commits ({len(commits)} total)[/bold]\n")
-    
-    for i, commit_data in enumerate(recent_commits):
-        # Formata data
-        try:
-            from datetime import datetime
-            dt = datetime.fromisoformat(commit_data['timestamp'])
-            date_str = dt.strftime("%d/%m/%Y %H:%M:%S")
-        except:
-            date_str = commit_data['timestamp']
-        
+    shown = 0
+    for i, commit_data in enumerate(commits):
         # Painel do commit
         commit_panel = Panel(
             f"[yellow]Hash:[/yellow] {commit_data['hash']}\n"
             f"[blue]Autor:[/blue] {commit_data['author']['name']} <{commit_data['author']['email']}>\n"
-            f"[green]Data:[/green] {date_str}\n"
+            f"[green]Data:[/green] {format_date(commit_data['timestamp'])}\n"
             f"[cyan]Arquivos:[/cyan] {len(commit_data['files'])}\n"
             f"[magenta]Tamanho:[/magenta] {commit_data.get('stats', {}).get('total_size', 0) / 1024 / 1024:.2f} MB\n"
             f"[white]Mensagem:[/white] {commit_data['message']}",
             border_style="blue",
-            title=f"Commit #{len(commits) - i}"
+            title=f"Commit #{total_commits - skip - i}"
         )
         console.print(commit_panel)
+        shown += 1
     
-    if len(commits) > limit:
-        console.print(f"\n[blue]Mostrando {limit} commits mais recentes de {len(commits)} total.[/blue]")
-        console.print(f"[dim]Use 'log.py --limit N' para ver mais commits.[/dim]")
+    if skip + shown < total_commits or skip:
+        console.print(f"\n[blue]Mostrando commits {skip + 1 if shown else skip}-{skip + shown} "
+                      f"(do mais recente) de {total_commits} total.[/blue]")
+        if skip + shown < total_commits:
+            console.print(f"[dim]Use 'log --skip {skip + shown} --limit {limit}' para ver os próximos.[/dim]")
     
     return True
 
+@locked(exclusive=False)
 def show_commit_details(commit_hash):
     """Exibe detalhes específicos de um commit"""
+    from rich.table import Table
+    from rich.panel import Panel
+    
     repo_path = find_repo_root()
     if repo_path is None:
         console.print('[red]Repositório ChromaGit não encontrado![/red]')
         return False
     
-    config_path = repo_path / CHROMAGIT_DIR / CONFIG_FILE
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    config_path = chromagit_path / CONFIG_FILE
     
     if not config_path.exists():
         console.print('[red]Repositório não inicializado![/red]')
         return False
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-    
-    commits = config.get('commits', [])
+    ensure_migrated(chromagit_path)
     
-    # Procura o commit pelo hash
-    target_commit = None
-    for commit in commits:
-        if commit['hash'].startswith(commit_hash):
-            target_commit = commit
-            break
+    # Procura o commit pelo hash (completo ou abreviado) no índice de hashes
+    matches = find_commits_by_prefix(chromagit_path, commit_hash)
     
-    if target_commit is None:
+    if not matches:
         console.print(f'[red]Commit {commit_hash} não encontrado![/red]')
         return False
     
+    if len(matches) > 1:
+        console.print(f'[red]Hash {commit_hash} é ambíguo! Commits possíveis:[/red]')
+        for full_hash, position in matches:
+            console.print(f"  [yellow]{full_hash}[/yellow] (commit #{position + 1})")
+        return False
+    
+    target_commit = read_commit(chromagit_path, matches[0][1])
+    
     # Exibe detalhes completos
-    try:
-        from datetime import datetime
-        dt = datetime.fromisoformat(target_commit['timestamp'])
-        date_str = dt.strftime("%d/%m/%Y %H:%M:%S")
-    except:
-        date_str = target_commit['timestamp']
+    date_str = format_date(target_commit['timestamp'])
     
     console.print(f"\n[bold]Detalhes do Commit[/bold]\n")
     
@@ -178,18 +197,30 @@ def show_commit_details(commit_hash):
     
     return True
 
-if __name__ == "__main__":
+# Função para linha de comando
+def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Exibe o histórico de commits do ChromaGit')
-    parser.add_argument('--limit', type=int, default=10, help='Número máximo de commits a exibir')
+    parser.add_argument('-n', '--limit', type=int, default=10, help='Número máximo de commits a exibir')
+    parser.add_argument('--skip', type=int, default=0, help='Número de commits recentes a pular (paginação)')
+    parser.add_argument('--oneline', action='store_true', help='Uma linha por commit, sem cores (ideal para pipes e pagers)')
     parser.add_argument('--hash', help='Hash do commit para exibir detalhes específicos')
     
     args = parser.parse_args()
     
-    if args.hash:
-        success = show_commit_details(args.hash)
-    else:
-        success = show_log(args.limit)
+    try:
+        if args.hash:
+            success = show_commit_details(args.hash)
+        else:
+            success = show_log(args.limit, args.skip, args.oneline)
+    except BrokenPipeError:
+        # Pager ou 'head' fechou a saída antes do fim; evita outro erro ao sair
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        success = True
     
     sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
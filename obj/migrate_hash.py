@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import tempfile
+import time
+import shutil
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from hashing import HASH_ALGORITHMS, CHUNK_SIZE, get_hasher, repository_algorithm, resolve_workers
+from storage import open_object, remap_references
+from pack import load_packs, close_packs, write_pack, packable, KIND_RAW, KIND_GZIP
+from repack import iter_loose_objects
+from index import FileIndex
+from staging import load_staged, save_staged
+from journal import ensure_migrated, rewrite_commits
+from backup import create_snapshot
+from oplog import get_logger
+from lock import locked
+from ui import LazyConsole
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+CONFIG_FILE = 'config.json'
+PACKAGES_DIR = 'packages'
+BACKUP_DIR = 'backup'
+TEMP_DIR = 'temp'
+WATCH_DIR = 'watch'
+WORKTREE_CACHE = 'worktree.json'
+BENCHMARK_SIZE = 64 * 1024 * 1024
+BENCHMARK_ROUNDS = 3
+
+# A migração troca o algoritmo de hash do repositório (settings.hash_algorithm):
+#   1. lê o conteúdo de cada objeto uma vez, calculando o hash antigo (que confere
+#      a integridade) e o novo ao mesmo tempo
+#   2. grava todos os objetos em um pack novo, com os nomes novos e as
+#      referências de deltas e listas de chunks trocadas
+#   3. reescreve staging, índice e journal de commits, cada um em uma passada
+#   4. remove os objetos e packs antigos
+# Os hashes de commit não mudam: são identificadores já usados em referências
+# (parent, log, checkout por prefixo). O remoto recalcula os hashes no próximo
+# push, porque o manifesto remoto registra o algoritmo.
+
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path):
+    get_logger(chromagit_path, 'migrate-hash').log(operation, details)
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+# Função para criar backup antes de operações (incremental, ver backup.py)
+def create_backup(config_path):
+    return create_snapshot(config_path.parent, 'migrate-hash')
+
+# Função para calcular os hashes antigo e novo em uma única leitura
+def digest_pair(f, old_algorithm, new_algorithm):
+    old_digest = get_hasher(old_algorithm)()
+    new_digest = get_hasher(new_algorithm)()
+    for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+        old_digest.update(block)
+        new_digest.update(block)
+    return old_digest.hexdigest(), new_digest.hexdigest()
+
+# Função para listar os objetos do repositório: {hash: (tipo, origem)}
+def collect_objects(packages_path):
+    """origem é o caminho do objeto solto ou a fatia do pack; objetos soltos têm prioridade"""
+    objects = {}
+    for pack in load_packs(packages_path):
+        for file_hash, offset, length, kind in pack:
+            objects.setdefault(file_hash, (kind, pack.view(offset, length)))
+    for file_hash, kind, path in iter_loose_objects(packages_path):
+        if packable(file_hash):
+            objects[file_hash] = (kind, path)
+    return objects
+
+# Função para medir a velocidade de cada algoritmo neste computador
+def benchmark(current=None):
+    from rich.table import Table
+
+    data = os.urandom(BENCHMARK_SIZE)
+    table = Table(title="Velocidade dos algoritmos de hash")
+    table.add_column("Algoritmo", style="cyan")
+    table.add_column("MB/s", style="green", justify="right")
+    table.add_column("", style="yellow")
+    for algorithm in sorted(HASH_ALGORITHMS):
+        hasher = get_hasher(algorithm)
+        best = None
+        for _ in range(BENCHMARK_ROUNDS):
+            start = time.perf_counter()
+            digest = hasher()
+            digest.update(data)
+            digest.hexdigest()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        table.add_row(algorithm, f"{BENCHMARK_SIZE / 1024 / 1024 / best:.0f}",
+                      "atual" if algorithm == current else "")
+    console.print(table)
+    return True
+
+# Função principal para migrar o algoritmo de hash do repositório
+@locked()
+def migrate_hash(algorithm, options=None):
+    from rich.table import Table
+
+    options = options or {}
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        return False
+
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    config_path = chromagit_path / CONFIG_FILE
+    packages_path = chromagit_path / PACKAGES_DIR
+    if not config_path.exists():
+        console.print('[red]Repositório não inicializado![/red]')
+        return False
+
+    config = ensure_migrated(chromagit_path)
+    current = repository_algorithm(config)
+    if options.get('benchmark', False):
+        return benchmark(current)
+    if algorithm is None:
+        console.print(f'[blue]Algoritmo de hash atual: {current}[/blue]')
+        return True
+    if algorithm == current:
+        console.print(f'[green]O repositório já usa {algorithm}.[/green]')
+        return True
+
+    start_time = time.time()
+    backup_file = create_backup(config_path)
+    if backup_file is not None:
+        console.print(f'[blue]Backup criado: {backup_file.id}[/blue]')
+
+    # 1. Novo hash de cada objeto, conferindo o conteúdo pelo hash antigo
+    objects = collect_objects(packages_path) if packages_path.is_dir() else {}
+
+    def rehash(file_hash):
+        try:
+            with open_object(packages_path, file_hash) as f:
+                old_hash, new_hash = digest_pair(f, current, algorithm)
+        except Exception as e:
+            return file_hash, None, str(e) or type(e).__name__
+        if old_hash != file_hash:
+            return file_hash, None, 'conteúdo não confere com o hash'
+        return file_hash, new_hash, None
+
+    mapping = {}
+    failures = []
+    with console.status(f"[bold blue]Calculando hashes {algorithm} de {len(objects)} objetos..."):
+        with ThreadPoolExecutor(max_workers=resolve_workers(options.get('hash_workers'))) as executor:
+            for file_hash, new_hash, error in executor.map(rehash, list(objects)):
+                if error is not None:
+                    failures.append(f"{file_hash}: {error}")
+                else:
+                    mapping[file_hash] = new_hash
+
+    # Deltas e listas de chunks precisam que todos os objetos referenciados tenham hash novo
+    stored = {}
+    for file_hash, (kind, source) in objects.items():
+        if file_hash not in mapping or kind in (KIND_RAW, KIND_GZIP):
+            continue
+        data = source.read_bytes() if isinstance(source, Path) else source
+        try:
+            stored[file_hash] = remap_references(kind, data, mapping)
+        except (KeyError, ValueError) as e:
+            failures.append(f"{file_hash}: referência sem hash novo ({e})")
+
+    if failures:
+        console.print(f'[red]{len(failures)} objetos não puderam ser migrados; nada foi alterado.[/red]')
+        for failure in failures[:10]:
+            console.print(f'  - {failure}')
+        log_operation("MIGRATE_HASH_ABORTED", f"{current} -> {algorithm}: {len(failures)} falhas", chromagit_path)
+        return False
+
+    # 2. Todos os objetos em um pack novo (as fatias dos packs antigos são copiadas sem reler o disco)
+    def renamed_objects():
+        for file_hash, (kind, source) in objects.items():
+            yield mapping[file_hash], kind, stored.get(file_hash, source)
+
+    index_path, packed = write_pack(packages_path, renamed_objects()) if objects else (None, 0)
+
+    # 3. Metadados: índice de stat, staging e journal
+    index_entries = 0
+    with FileIndex(chromagit_path) as index:
+        for rel_path, entry in list(index.entries.items()):
+            new_hash = mapping.get(entry['hash'])
+            if new_hash is None:
+                # Conteúdo sem objeto: aproveita o arquivo da área de trabalho se o stat não mudou
+                try:
+                    st = (repo_path / rel_path).stat()
+                    if index.lookup(rel_path, st) is not None:
+                        with open(repo_path / rel_path, 'rb') as f:
+                            old_hash, new_hash = digest_pair(f, current, algorithm)
+                        if old_hash == entry['hash']:
+                            mapping[old_hash] = new_hash
+                        else:
+                            new_hash = None
+                except OSError:
+                    new_hash = None
+            if new_hash is None:
+                del index.entries[rel_path]
+            else:
+                index.entries[rel_path] = dict(entry, hash=new_hash)
+                index_entries += 1
+        index.compact()
+
+    staged = load_staged(config)
+    for record in staged.values():
+        if record.get('hash') is not None:
+            # Sem hash novo conhecido, o commit recalcula o hash a partir do arquivo
+            record['hash'] = mapping.get(record['hash'])
+    save_staged(config, staged)
+
+    unmapped = []
+
+    def remap_commit(commit_data):
+        for file_info in commit_data.get('files', []):
+            file_hash = file_info.get('hash')
+            if file_hash in mapping:
+                file_info['hash'] = mapping[file_hash]
+            elif file_hash is not None:
+                unmapped.append(file_hash)
+        return commit_data
+
+    commits = rewrite_commits(chromagit_path, remap_commit)
+
+    try:
+        (chromagit_path / WATCH_DIR / WORKTREE_CACHE).unlink()
+    except FileNotFoundError:
+        pass
+
+    config.setdefault('settings', {})['hash_algorithm'] = algorithm
+    (chromagit_path / TEMP_DIR).mkdir(exist_ok=True)
+    fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path / TEMP_DIR)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
+
+    # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
+    if os.name == 'nt' and config_path.exists():
+        os.system(f'attrib -r -h "{config_path}"')
+
+    shutil.move(temp_config, config_path)
+
+    # Restaura atributo oculto após salvar (Windows)
+    if os.name == 'nt':
+        os.system(f'attrib +h "{config_path}"')
+
+    # 4. Objetos antigos só são removidos depois que pack e metadados estão gravados
+    migrated = set(objects)
+    objects.clear()  # Libera as fatias dos packs antigos antes de fechá-los
+    stored.clear()
+    old_packs = [pack for pack in load_packs(packages_path) if pack.index_path != index_path]
+    close_packs(packages_path)
+    for pack in old_packs:
+        pack.index_path.unlink()
+        pack.pack_path.unlink()
+    removed = 0
+    for file_hash, _, path in list(iter_loose_objects(packages_path)):
+        if file_hash in migrated:
+            path.unlink()
+            removed += 1
+
+    duration = time.time() - start_time
+    log_operation("MIGRATE_HASH", f"{current} -> {algorithm}: {packed} objetos, {commits} commits, "
+                  f"{len(unmapped)} hashes sem objeto, {duration:.2f}s", chromagit_path)
+
+    table = Table(title=f"Migração {current} → {algorithm}", show_header=False)
+    table.add_column("Item", style="cyan")
+    table.add_column("Valor", style="green")
+    table.add_row("Objetos migrados", str(packed))
+    table.add_row("Objetos soltos removidos", str(removed))
+    table.add_row("Packs substituídos", str(len(old_packs)))
+    table.add_row("Commits reescritos", str(commits))
+    table.add_row("Entradas do índice mantidas", str(index_entries))
+    table.add_row("Tempo", f"{duration:.2f} segundos")
+    console.print(table)
+    if unmapped:
+        console.print(f'[yellow]{len(set(unmapped))} hashes do histórico não têm objeto armazenado e '
+                      f'foram mantidos em {current}.[/yellow]')
+    return True
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Troca o algoritmo de hash do repositório, migrando objetos e metadados')
+    parser.add_argument('algorithm', nargs='?', choices=sorted(HASH_ALGORITHMS), help='Novo algoritmo de hash')
+    parser.add_argument('-b', '--benchmark', action='store_true', help='Mede a velocidade de cada algoritmo neste computador')
+    parser.add_argument('-w', '--workers', type=int, help='Número de threads para cálculo de hash')
+
+    args = parser.parse_args()
+
+    success = migrate_hash(args.algorithm, {'benchmark': args.benchmark, 'hash_workers': args.workers})
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import atexit
+import datetime
+import time
+from pathlib import Path
+
+# Constantes compatíveis com add.py
+LOGS_DIR = 'logs'
+MAX_BUFFERED_EVENTS = 1000
+MAX_BUFFER_SECONDS = 2.0
+
+class OperationLogger:
+    """Log de operações de um comando, gravado em lotes em logs/<origem>_operations_<data>.log.
+
+    Eventos ficam em memória e são gravados quando o buffer enche, quando o
+    último flush tem mais de MAX_BUFFER_SECONDS, na saída do processo ou
+    imediatamente no caso de erros.
+    """
+
+    def __init__(self, chromagit_path, source):
+        self.logs_path = Path(chromagit_path) / LOGS_DIR
+        self.source = source
+        self.per_file = True
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def log(self, operation, details, per_file=False):
+        # Eventos por arquivo podem ser desligados em operações muito grandes
+        if per_file and not self.per_file:
+            return
+        now = datetime.datetime.now()
+        self.buffer.append((now.date(), f"[{now.isoformat()}] {operation}: {details}\n"))
+
+        if ('ERROR' in operation or len(self.buffer) >= MAX_BUFFERED_EVENTS
+                or time.monotonic() - self.last_flush >= MAX_BUFFER_SECONDS):
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        events, self.buffer = self.buffer, []
+
+        # Agrupa por dia para abrir cada arquivo de log uma única vez
+        by_day = {}
+        for day, line in events:
+            by_day.setdefault(day, []).append(line)
+
+        self.logs_path.mkdir(exist_ok=True)
+        for day, lines in by_day.items():
+            log_file = self.logs_path / f"{self.source}_operations_{day}.log"
+            with open(log_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+
+_loggers = {}
+
+# Função para obter o logger compartilhado de um repositório/comando
+def get_logger(chromagit_path, source):
+    key = (str(Path(chromagit_path).resolve()), source)
+    if key not in _loggers:
+        _loggers[key] = OperationLogger(chromagit_path, source)
+    return _loggers[key]
+
+# Função para gravar todos os eventos pendentes
+def flush_all():
+    for logger in list(_loggers.values()):
+        try:
+            logger.flush()
+        except OSError:
+            pass
+
+atexit.register(flush_all)
@@ -0,0 +1,208 @@
+import os
+import mmap
+import time
+import struct
+from pathlib import Path
+
+# Constantes compatíveis com storage.py
+PACK_DIR = 'pack'
+PACK_SUFFIX = '.pack'
+INDEX_SUFFIX = '.idx'
+PACK_MAGIC = b'CGPACK1\n'
+INDEX_MAGIC = b'CGPIDX1\n'
+KEY_SIZE = 32  # Hash em binário (64 caracteres hexadecimais)
+RECORD_FORMAT = f'>{KEY_SIZE}sQQB'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+COPY_CHUNK = 1024 * 1024
+
+# Tipos de objeto, iguais aos formatos dos objetos soltos em packages/
+KIND_RAW = 0
+KIND_GZIP = 1
+KIND_DELTA = 2
+KIND_CHUNKED = 3
+
+# Um pack junta muitos objetos em um único arquivo:
+#   packages/pack/pack-<id>.pack - PACK_MAGIC seguido do conteúdo gravado de cada objeto
+#   packages/pack/pack-<id>.idx  - INDEX_MAGIC seguido de registros (hash, offset,
+#                                  tamanho, tipo) ordenados por hash
+# O conteúdo de cada objeto é exatamente o do arquivo solto equivalente (bruto,
+# gzip, delta ou lista de chunks), então os mesmos decodificadores servem para
+# os dois casos.
+# Os dois arquivos são lidos por mmap e a busca no índice é binária. O .idx é
+# renomeado por último: um pack só é visível depois de completamente gravado.
+
+# Packs abertos neste processo: {pasta de packs: (nomes dos índices, [Pack])}
+_open_packs = {}
+
+def _key(file_hash):
+    try:
+        key = bytes.fromhex(file_hash)
+    except (TypeError, ValueError):
+        return None
+    return key if len(key) == KEY_SIZE else None
+
+# Função para verificar se o hash cabe no índice do pack (os demais objetos ficam soltos)
+def packable(file_hash):
+    return _key(file_hash) is not None
+
+class Pack:
+    """Pack aberto por mmap; lookup faz busca binária no índice"""
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        self.pack_path = self.index_path.with_suffix(PACK_SUFFIX)
+        self._index_file = open(self.index_path, 'rb')
+        self._pack_file = open(self.pack_path, 'rb')
+        try:
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = mmap.mmap(self._pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.close()
+            raise ValueError(f"Pack vazio: {self.pack_path}")
+        if self._index[:len(INDEX_MAGIC)] != INDEX_MAGIC or self._data[:len(PACK_MAGIC)] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Pack inválido: {self.pack_path}")
+        self.count = (len(self._index) - len(INDEX_MAGIC)) // RECORD_SIZE
+
+    def _record(self, position):
+        return struct.unpack_from(RECORD_FORMAT, self._index, len(INDEX_MAGIC) + position * RECORD_SIZE)
+
+    # Retorna (offset, tamanho, tipo) do objeto, ou None se não estiver neste pack
+    def lookup(self, file_hash):
+        key = _key(file_hash)
+        if key is None:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = len(INDEX_MAGIC) + middle * RECORD_SIZE
+            if self._index[start:start + KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            record_key, offset, length, kind = self._record(low)
+            if record_key == key:
+                return offset, length, kind
+        return None
+
+    # Conteúdo gravado do objeto sem cópia (fatia do mmap)
+    def view(self, offset, length):
+        return memoryview(self._data)[offset:offset + length]
+
+    def __iter__(self):
+        for position in range(self.count):
+            key, offset, length, kind = self._record(position)
+            yield key.hex(), offset, length, kind
+
+    def close(self):
+        for name in ('_index', '_data'):
+            mapped = getattr(self, name, None)
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass  # Ainda há fatias em uso; o mapeamento é liberado junto com elas
+        self._index_file.close()
+        self._pack_file.close()
+
+def pack_dir(packages_path):
+    return Path(packages_path) / PACK_DIR
+
+# Função para obter os packs do repositório, reabrindo só quando a pasta muda
+def load_packs(packages_path):
+    directory = pack_dir(packages_path)
+    try:
+        names = tuple(sorted((name for name in os.listdir(directory) if name.endswith(INDEX_SUFFIX)),
+                             reverse=True))
+    except FileNotFoundError:
+        names = ()
+    cached = _open_packs.get(str(directory))
+    if cached is not None and cached[0] == names:
+        return cached[1]
+
+    reused = {pack.index_path.name: pack for pack in cached[1]} if cached else {}
+    packs = []
+    for name in names:
+        pack = reused.pop(name, None)
+        if pack is None:
+            try:
+                pack = Pack(directory / name)
+            except (OSError, ValueError):
+                continue
+        packs.append(pack)
+    for pack in reused.values():
+        pack.close()
+    _open_packs[str(directory)] = (names, packs)
+    return packs
+
+# Função para fechar os packs abertos (antes de removê-los)
+def close_packs(packages_path):
+    cached = _open_packs.pop(str(pack_dir(packages_path)), None)
+    if cached is not None:
+        for pack in cached[1]:
+            pack.close()
+
+# Função para localizar um objeto nos packs: (pack, offset, tamanho, tipo) ou None
+def find_packed(packages_path, file_hash):
+    for pack in load_packs(packages_path):
+        found = pack.lookup(file_hash)
+        if found is not None:
+            return (pack,) + found
+    return None
+
+# Função para gravar um pack a partir de objetos soltos e de outros packs
+def write_pack(packages_path, objects):
+    """objects: iterável de (hash, tipo, origem), onde origem é um caminho ou bytes.
+
+    Retorna (caminho do índice, número de objetos), ou (None, 0) se nada foi gravado.
+    """
+    directory = pack_dir(packages_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"pack-{time.time_ns():x}{os.getpid():x}"
+    pack_path = directory / (name + PACK_SUFFIX)
+    index_path = directory / (name + INDEX_SUFFIX)
+    temp_pack = pack_path.with_name(pack_path.name + '.tmp')
+    temp_index = index_path.with_name(index_path.name + '.tmp')
+
+    records = {}
+    try:
+        with open(temp_pack, 'wb') as f:
+            f.write(PACK_MAGIC)
+            for file_hash, kind, source in objects:
+                key = _key(file_hash)
+                if key is None or key in records:
+                    continue
+                offset = f.tell()
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    f.write(source)
+                else:
+                    with open(source, 'rb') as f_in:
+                        while True:
+                            chunk = f_in.read(COPY_CHUNK)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                records[key] = (offset, f.tell() - offset, kind)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if not records:
+            temp_pack.unlink()
+            return None, 0
+
+        with open(temp_index, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            for key in sorted(records):
+                f.write(struct.pack(RECORD_FORMAT, key, *records[key]))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_pack, pack_path)
+        os.replace(temp_index, index_path)
+    except Exception:
+        for temp in (temp_pack, temp_index):
+            if temp.exists():
+                temp.unlink()
+        raise
+    return index_path, len(records)
@@ -1,19 +1,24 @@
 import os
 import json
+import tempfile
 import shutil
 import datetime
 import argparse
 import sys
-import hashlib
 from pathlib import Path
-from rich import print
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Confirm
+from hashing import hash_files, repository_algorithm, DEFAULT_ALGORITHM
+from index import FileIndex
+from transfer import CopyJob, copy_files
+from storage import object_chunks, CHUNKED_MIN_SIZE
+from chunking import changed_chunks
+from oplog import get_logger
+from journal import count_commits, ensure_migrated
+from backup import create_snapshot
+from lock import locked
+from ui import LazyConsole
 
-console = Console()
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
 
 # Constantes compatíveis com outros módulos ChromaGit
 CHROMAGIT_DIR = '.chromagit'
@@ -23,6 +28,8 @@ BACKUP_DIR = 'backup'
 LOGS_DIR = 'logs'
 TEMP_DIR = 'temp'
 ENV_FILE = '.env'
+REMOTE_MANIFEST_FILE = '.chromagit-manifest.json'
+REMOTE_MANIFEST_VERSION = 1
 
 # Função para carregar configurações do .env
 def load_env_config(repo_path):
@@ -45,14 +52,9 @@ def load_env_config(repo_path):
     
     return config
 
-# Função para log de operações
-def log_operation(operation, details, chromagit_path):
-    logs_path = chromagit_path / LOGS_DIR
-    logs_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().isoformat()
-    log_file = logs_path / f"push_operations_{datetime.date.today()}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {operation}: {details}\n")
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path, per_file=False):
+    get_logger(chromagit_path, 'push').log(operation, details, per_file=per_file)
 
 # Função para encontrar a raiz do repositório
 def find_repo_root(start_path=None):
@@ -70,14 +72,9 @@ def find_repo_root(start_path=None):
     
     return None
 
-# Função para criar backup antes de operações
+# Função para criar backup antes de operações (incremental, ver backup.py)
 def create_backup(config_path):
-    backup_path = config_path.parent / BACKUP_DIR
-    backup_path.mkdir(exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = backup_path / f"push_backup_{timestamp}.json"
-    shutil.copy2(config_path, backup_file)
-    return backup_file
+    return create_snapshot(config_path.parent, 'push')
 
 # Função para gerar nome da subpasta do projeto
 def get_project_folder_name(repo_path):
@@ -112,6 +109,8 @@ def get_project_folder_name(repo_path):
 # Função para validar e preparar o diretório remoto
 def prepare_remote_directory(base_path, project_name, force=False):
     """Prepara o diretório remoto para receber o push"""
+    from rich.prompt import Confirm
+    
     base_path = Path(base_path)
     remote_path = base_path / project_name
     
@@ -146,21 +145,71 @@ def prepare_remote_directory(base_path, project_name, force=False):
     
     return True, remote_path
 
-# Função para calcular hash de arquivo
-def calculate_file_hash(file_path):
-    """Calcula hash SHA-256 de um arquivo"""
-    sha256_hash = hashlib.sha256()
+# Função para carregar o manifesto do remoto (caminho -> hash, tamanho, mtime)
+def load_remote_manifest(remote_repo, algorithm=None):
+    """Retorna o dicionário de arquivos do manifesto ou vazio se não existir/for
+    inválido ou se os hashes forem de outro algoritmo"""
+    manifest_path = Path(remote_repo) / REMOTE_MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
     try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != REMOTE_MANIFEST_VERSION:
+            return {}
+        if manifest.get('algorithm', DEFAULT_ALGORITHM) != (algorithm or DEFAULT_ALGORITHM):
+            return {}
+        return manifest.get('files', {})
+    except Exception as e:
+        console.print(f'[yellow]Aviso: manifesto remoto inválido, será recriado: {e}[/yellow]')
+        return {}
+
+# Função para gravar o manifesto do remoto de forma atômica
+def save_remote_manifest(remote_repo, files, algorithm=None):
+    manifest_path = Path(remote_repo) / REMOTE_MANIFEST_FILE
+    temp_path = manifest_path.with_name(f"{REMOTE_MANIFEST_FILE}.tmp{os.getpid()}")
+    manifest = {
+        'version': REMOTE_MANIFEST_VERSION,
+        'algorithm': algorithm or DEFAULT_ALGORITHM,
+        'updated_at': datetime.datetime.now().isoformat(),
+        'files': files
+    }
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, manifest_path)
+
+# Função para obter os chunks de um arquivo grande já gravado pelo add (None se não houver)
+def local_chunks(packages_path, file_hash, size):
+    if file_hash is None or size < CHUNKED_MIN_SIZE:
         return None
+    try:
+        return object_chunks(packages_path, file_hash)
+    except (OSError, ValueError):
+        return None
+
+# Função para criar a entrada do manifesto remoto de um arquivo
+def manifest_entry(file_hash, remote_stat, chunks=None):
+    entry = {
+        'hash': file_hash,
+        'size': remote_stat.st_size,
+        'mtime_ns': remote_stat.st_mtime_ns
+    }
+    if chunks is not None:
+        entry['chunks'] = [list(chunk) for chunk in chunks]
+    return entry
 
 # Função para sincronizar arquivos
 def sync_files(local_repo, remote_repo, options=None):
-    """Sincroniza arquivos do repositório local para o remoto"""
+    """Sincroniza arquivos do repositório local para o remoto.
+
+    Com check_hash, o hash do arquivo remoto vem do manifesto gravado no último
+    push sempre que o tamanho e o mtime do remoto não mudaram; só arquivos
+    alterados fora do ChromaGit (ou todos, com verify_remote) são lidos do remoto.
+    Arquivos grandes que o add gravou em chunks guardam a lista de chunks no
+    manifesto, e o próximo push copia só os trechos dos chunks que mudaram.
+    """
     if options is None:
         options = {}
     
@@ -171,6 +220,9 @@ def sync_files(local_repo, remote_repo, options=None):
         'errors': 0,
         'total_size': 0
     }
+    check_hash = options.get('check_hash', True)
+    algorithm = options.get('hash_algorithm')
+    packages_path = local_repo / CHROMAGIT_DIR / PACKAGES_DIR
     
     # Lista todos os arquivos do repositório local (exceto .chromagit temporariamente)
     local_files = []
@@ -182,9 +234,115 @@ def sync_files(local_repo, remote_repo, options=None):
         for file in files:
             file_path = Path(root) / file
             rel_path = file_path.relative_to(local_repo)
+            if rel_path.as_posix() == REMOTE_MANIFEST_FILE:
+                continue
             local_files.append(rel_path)
     
+    # Obtém o stat local e remoto de cada arquivo uma única vez
+    local_stats = {}
+    remote_stats = {}
+    for rel_path in local_files:
+        try:
+            local_stats[rel_path] = (local_repo / rel_path).stat()
+        except OSError:
+            continue
+        try:
+            remote_stats[rel_path] = (remote_repo / rel_path).stat()
+        except OSError:
+            pass
+    
+    manifest = {} if options.get('verify_remote', False) else load_remote_manifest(remote_repo, algorithm)
+    new_manifest = dict(manifest)
+    local_hashes = {}
+    remote_hashes = {}
+    
+    if check_hash:
+        with console.status("[bold blue]Comparando hashes..."), FileIndex(local_repo / CHROMAGIT_DIR) as index:
+            # Hash local: reaproveita o índice de stat (área de trabalho) ou o manifesto
+            # (arquivos do .chromagit, copiados com o mesmo mtime) e calcula em paralelo o restante
+            local_misses = []
+            for rel_path, local_stat in local_stats.items():
+                if rel_path.parts[0] == CHROMAGIT_DIR:
+                    entry = manifest.get(rel_path.as_posix())
+                    cached = None
+                    if (entry and entry['size'] == local_stat.st_size
+                            and entry['mtime_ns'] == local_stat.st_mtime_ns):
+                        cached = entry['hash']
+                else:
+                    cached = index.lookup(rel_path.as_posix(), local_stat)
+                if cached is None:
+                    local_misses.append(rel_path)
+                else:
+                    local_hashes[rel_path] = cached
+            computed = hash_files([local_repo / p for p in local_misses],
+                                  sizes=[local_stats[p].st_size for p in local_misses],
+                                  workers=options.get('hash_workers'),
+                                  algorithm=algorithm)
+            for rel_path, file_hash in zip(local_misses, computed):
+                local_hashes[rel_path] = file_hash
+                # O índice guarda apenas a área de trabalho, a mesma que add e status consultam
+                if rel_path.parts[0] != CHROMAGIT_DIR:
+                    index.record(rel_path.as_posix(), local_stats[rel_path], file_hash)
+            
+            # Hash remoto: usa o manifesto quando o stat do remoto confere
+            remote_misses = []
+            for rel_path, remote_stat in remote_stats.items():
+                entry = manifest.get(rel_path.as_posix())
+                if (entry and entry['size'] == remote_stat.st_size
+                        and entry['mtime_ns'] == remote_stat.st_mtime_ns):
+                    remote_hashes[rel_path] = entry['hash']
+                else:
+                    remote_misses.append(rel_path)
+            computed = hash_files([remote_repo / p for p in remote_misses],
+                                  sizes=[remote_stats[p].st_size for p in remote_misses],
+                                  workers=options.get('hash_workers'),
+                                  algorithm=algorithm)
+            remote_hashes.update(zip(remote_misses, computed))
+    
+    # Decide o que copiar usando apenas os stats e hashes já obtidos
+    copy_jobs = []
+    for rel_path in local_files:
+        manifest_key = rel_path.as_posix()
+        if rel_path not in local_stats:
+            console.print(f'[red]Erro ao copiar {rel_path}: arquivo local não pode ser lido[/red]')
+            sync_stats['errors'] += 1
+            new_manifest.pop(manifest_key, None)
+            continue
+        
+        remote_stat = remote_stats.get(rel_path)
+        if remote_stat is None:
+            copy_jobs.append(CopyJob(rel_path, local_repo / rel_path, remote_repo / rel_path,
+                                     local_stats[rel_path].st_size))
+            continue
+        
+        # Verifica se precisa atualizar
+        if check_hash:
+            local_hash = local_hashes.get(rel_path)
+            unchanged = local_hash is not None and local_hash == remote_hashes.get(rel_path)
+        else:
+            # Compara por timestamp
+            unchanged = local_stats[rel_path].st_mtime <= remote_stat.st_mtime
+        
+        if unchanged:
+            sync_stats['skipped'] += 1
+            if check_hash:
+                chunks = local_chunks(packages_path, remote_hashes[rel_path], remote_stat.st_size)
+                new_manifest[manifest_key] = manifest_entry(remote_hashes[rel_path], remote_stat, chunks)
+            continue
+        
+        # Remoto com lista de chunks conhecida: copia só os chunks alterados
+        entry = manifest.get(manifest_key)
+        chunks = local_chunks(packages_path, local_hashes.get(rel_path), local_stats[rel_path].st_size) if check_hash else None
+        if chunks is not None and entry and entry.get('chunks') and entry['hash'] == remote_hashes.get(rel_path):
+            ranges = [(offset, size) for offset, _, size in changed_chunks(chunks, entry['chunks'])]
+            copy_jobs.append(CopyJob(rel_path, local_repo / rel_path, remote_repo / rel_path,
+                                     sum(size for _, size in ranges), overwrite=True, ranges=ranges))
+        else:
+            copy_jobs.append(CopyJob(rel_path, local_repo / rel_path, remote_repo / rel_path,
+                                     local_stats[rel_path].st_size, overwrite=True))
+    
     # Progress bar para sincronização
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
     with Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]Sincronizando..."),
@@ -194,56 +352,38 @@ def sync_files(local_repo, remote_repo, options=None):
         console=console
     ) as progress:
         
-        task = progress.add_task("Copiando arquivos...", total=len(local_files))
+        task = progress.add_task("Copiando arquivos...", total=len(copy_jobs))
         
-        for rel_path in local_files:
+        # Chamado na thread principal, um arquivo por vez: os contadores ficam exatos
+        def on_copy_complete(job, dest_stat, error):
             progress.update(task, advance=1)
+            manifest_key = job.key.as_posix()
+            if error is not None:
+                console.print(f'[red]Erro ao copiar {job.key}: {error}[/red]')
+                sync_stats['errors'] += 1
+                new_manifest.pop(manifest_key, None)
+                return
             
-            local_file = local_repo / rel_path
-            remote_file = remote_repo / rel_path
+            sync_stats['updated' if job.overwrite else 'copied'] += 1
+            sync_stats['total_size'] += job.size
             
-            try:
-                # Cria diretório pai se necessário
-                remote_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Verifica se precisa copiar/atualizar
-                should_copy = True
-                action = "copied"
-                
-                if remote_file.exists():
-                    if options.get('check_hash', True):
-                        local_hash = calculate_file_hash(local_file)
-                        remote_hash = calculate_file_hash(remote_file)
-                        
-                        if local_hash == remote_hash:
-                            should_copy = False
-                            action = "skipped"
-                        else:
-                            action = "updated"
-                    else:
-                        # Compara por timestamp
-                        local_mtime = local_file.stat().st_mtime
-                        remote_mtime = remote_file.stat().st_mtime
-                        
-                        if local_mtime <= remote_mtime:
-                            should_copy = False
-                            action = "skipped"
-                        else:
-                            action = "updated"
-                
-                if should_copy:
-                    # Remove atributos de somente leitura no destino (Windows)
-                    if os.name == 'nt' and remote_file.exists():
-                        os.system(f'attrib -r -h "{remote_file}"')
-                    
-                    shutil.copy2(local_file, remote_file)
-                    sync_stats['total_size'] += local_file.stat().st_size
-                
-                sync_stats[action] += 1
-                
-            except Exception as e:
-                console.print(f'[red]Erro ao copiar {rel_path}: {e}[/red]')
-                sync_stats['errors'] += 1
+            # Atualiza o manifesto (sem hash conhecido, a entrada é descartada para ser verificada depois)
+            file_hash = local_hashes.get(job.key)
+            if check_hash and file_hash is not None:
+                chunks = local_chunks(packages_path, file_hash, dest_stat.st_size)
+                new_manifest[manifest_key] = manifest_entry(file_hash, dest_stat, chunks)
+            else:
+                new_manifest.pop(manifest_key, None)
+        
+        copy_files(copy_jobs,
+                   workers=options.get('copy_workers'),
+                   max_inflight_bytes=options.get('max_inflight_bytes'),
+                   on_complete=on_copy_complete)
+    
+    try:
+        save_remote_manifest(remote_repo, new_manifest, algorithm)
+    except Exception as e:
+        console.print(f'[yellow]Aviso: não foi possível gravar o manifesto remoto: {e}[/yellow]')
     
     return sync_stats
 
@@ -272,8 +412,13 @@ def update_push_metadata(config, remote_path, sync_stats, project_name=None, bas
     return config
 
 # Função principal para push
+@locked()
 def push(base_remote_path=None, options=None):
     """Executa o push do repositório local para o remoto"""
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich.prompt import Confirm
+    
     if options is None:
         options = {}
     
@@ -311,15 +456,15 @@ def push(base_remote_path=None, options=None):
     
     # Cria backup do config
     backup_file = create_backup(config_path)
-    console.print(f'[blue]Backup criado: {backup_file.name}[/blue]')
+    if backup_file is not None:
+        console.print(f'[blue]Backup criado: {backup_file.id}[/blue]')
     
-    # Carrega configuração local
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    # Carrega configuração local (commits antigos guardados no config.json vão para o journal)
+    config = ensure_migrated(chromagit_path)
     
     # Verifica se há commits para fazer push
-    commits = config.get('commits', [])
-    if not commits and not options.get('force', False):
+    total_commits = count_commits(chromagit_path)
+    if not total_commits and not options.get('force', False):
         console.print('[yellow]Nenhum commit encontrado para push.[/yellow]')
         if not Confirm.ask("Fazer push mesmo assim?"):
             return False
@@ -337,7 +482,7 @@ def push(base_remote_path=None, options=None):
         f"[green]Diretório Base Remoto:[/green] {base_remote_path}\n"
         f"[yellow]Projeto Remoto:[/yellow] {remote_path}\n"
         f"[blue]Nome do Projeto:[/blue] {project_name}\n"
-        f"[magenta]Commits a sincronizar:[/magenta] {len(commits)}\n"
+        f"[magenta]Commits a sincronizar:[/magenta] {total_commits}\n"
         f"[white]Modo:[/white] {'Forçado' if options.get('force') else 'Normal'}",
         title="Informações do Push",
         border_style="blue"
@@ -346,16 +491,16 @@ def push(base_remote_path=None, options=None):
     
     # Sincroniza arquivos
     console.print('\n[bold]Iniciando sincronização de arquivos...[/bold]')
-    sync_stats = sync_files(repo_path, remote_path, options)
+    sync_stats = sync_files(repo_path, remote_path, dict(options, hash_algorithm=repository_algorithm(config)))
     
     # Atualiza configuração com metadados do push
     config = update_push_metadata(config, remote_path, sync_stats, project_name, base_remote_path)
     
     # Salva configuração atualizada
-    temp_config = chromagit_path / TEMP_DIR / 'config_temp.json'
-    temp_config.parent.mkdir(exist_ok=True)
+    (chromagit_path / TEMP_DIR).mkdir(exist_ok=True)
+    fd, temp_config = tempfile.mkstemp(prefix='config_', suffix='.json', dir=chromagit_path / TEMP_DIR)
     
-    with open(temp_config, 'w', encoding='utf-8') as f:
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4)
     
     # Remove atributos de somente leitura/oculto antes de sobrescrever (Windows)
@@ -405,8 +550,12 @@ def push(base_remote_path=None, options=None):
     return True
 
 # Função para verificar status do remote
+@locked(exclusive=False)
 def status_remote(options=None):
     """Verifica o status do repositório remoto"""
+    from rich.table import Table
+    from rich.panel import Panel
+    
     if options is None:
         options = {}
     
@@ -469,6 +618,10 @@ def main():
     parser.add_argument('--no-hash', action='store_true', help='Não verifica hash dos arquivos (mais rápido)')
     parser.add_argument('--status', action='store_true', help='Exibe status do repositório remoto')
     parser.add_argument('--include-chromagit', action='store_true', help='Inclui diretório .chromagit no push')
+    parser.add_argument('-j', '--jobs', type=int, help='Número de cópias simultâneas para o remoto (padrão: 8)')
+    parser.add_argument('--max-inflight-mb', type=int, help='Limite de MB sendo copiados ao mesmo tempo (padrão: 64)')
+    parser.add_argument('--verify-remote', action='store_true', help='Ignora o manifesto e relê todos os arquivos remotos (auditoria completa)')
+    parser.add_argument('-w', '--workers', type=int, help='Número de threads para cálculo de hash')
     
     args = parser.parse_args()
     
@@ -479,7 +632,11 @@ def main():
             'force': args.force,
             'check_hash': not args.no_hash,
             'include_chromagit': args.include_chromagit,
-            'project_name': args.project_name
+            'project_name': args.project_name,
+            'verify_remote': args.verify_remote,
+            'copy_workers': args.jobs,
+            'max_inflight_bytes': args.max_inflight_mb * 1024 * 1024 if args.max_inflight_mb else None,
+            'hash_workers': args.workers
         }
         
         success = push(args.remote, options)
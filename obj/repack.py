@@ -0,0 +1,147 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+from storage import COMPRESSED_SUFFIX, DELTA_SUFFIX, CHUNKS_SUFFIX, FANOUT_LENGTH
+from pack import PACK_SUFFIX, KIND_RAW, KIND_GZIP, KIND_DELTA, KIND_CHUNKED, load_packs, close_packs, find_packed, write_pack, packable
+from oplog import get_logger
+from lock import locked
+from ui import LazyConsole
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+CHROMAGIT_DIR = '.chromagit'
+PACKAGES_DIR = 'packages'
+
+# Função para log de operações (bufferizado pelo logger compartilhado em oplog.py)
+def log_operation(operation, details, chromagit_path):
+    get_logger(chromagit_path, 'repack').log(operation, details)
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+# Função para listar os objetos soltos: (hash, tipo, caminho)
+def iter_loose_objects(packages_path):
+    with os.scandir(packages_path) as fanout:
+        for directory in fanout:
+            if len(directory.name) != FANOUT_LENGTH or not directory.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(directory.path) as it:
+                for entry in it:
+                    name = entry.name
+                    if '.tmp' in name or not entry.is_file(follow_symlinks=False):
+                        continue
+                    if name.endswith(DELTA_SUFFIX):
+                        kind, name = KIND_DELTA, name[:-len(DELTA_SUFFIX)]
+                    elif name.endswith(CHUNKS_SUFFIX):
+                        kind, name = KIND_CHUNKED, name[:-len(CHUNKS_SUFFIX)]
+                    elif name.endswith(COMPRESSED_SUFFIX):
+                        kind, name = KIND_GZIP, name[:-len(COMPRESSED_SUFFIX)]
+                    else:
+                        kind = KIND_RAW
+                    yield directory.name + name, kind, Path(entry.path)
+
+# Função para consolidar objetos soltos (e, com all_packs, os packs existentes) em um pack
+@locked()
+def repack(options=None):
+    from rich.table import Table
+
+    options = options or {}
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        return False
+
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    packages_path = chromagit_path / PACKAGES_DIR
+    if not packages_path.is_dir():
+        console.print('[yellow]Nenhum objeto armazenado.[/yellow]')
+        return True
+
+    loose = []
+    already_packed = []
+    for file_hash, kind, path in iter_loose_objects(packages_path):
+        if not packable(file_hash):
+            continue
+        if find_packed(packages_path, file_hash) is not None:
+            already_packed.append(path)
+        else:
+            loose.append((file_hash, kind, path))
+
+    old_packs = list(load_packs(packages_path)) if options.get('all_packs', False) else []
+    if not loose and len(old_packs) <= 1:
+        for path in already_packed:
+            path.unlink()
+        console.print('[green]Nada a empacotar: não há objetos soltos.[/green]')
+        return True
+
+    def objects():
+        for file_hash, kind, path in loose:
+            yield file_hash, kind, path
+        for pack in old_packs:
+            for file_hash, offset, length, kind in pack:
+                yield file_hash, kind, pack.view(offset, length)
+
+    index_path, count = write_pack(packages_path, objects())
+
+    # Objetos só são removidos depois que o pack novo está completo e visível
+    removed = 0
+    for path in already_packed + [path for _, _, path in loose]:
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    for directory in {path.parent for _, _, path in loose}:
+        try:
+            directory.rmdir()
+        except OSError:
+            pass  # Pasta ainda tem objetos (gravados durante o repack, ou com hash fora do padrão)
+
+    if old_packs:
+        close_packs(packages_path)
+        for pack in old_packs:
+            if pack.index_path == index_path:
+                continue
+            pack.index_path.unlink()
+            pack.pack_path.unlink()
+
+    pack_size = index_path.with_suffix(PACK_SUFFIX).stat().st_size if index_path else 0
+    log_operation("REPACK", f"{count} objetos em {index_path.name if index_path else '-'}, "
+                  f"{removed} soltos removidos, {len(old_packs)} packs consolidados", chromagit_path)
+
+    table = Table(title="Repack", show_header=False)
+    table.add_column("Item", style="cyan")
+    table.add_column("Valor", style="green")
+    table.add_row("Objetos no pack novo", str(count))
+    table.add_row("Arquivos soltos removidos", str(removed))
+    table.add_row("Packs consolidados", str(len(old_packs)))
+    table.add_row("Tamanho do pack", f"{pack_size / 1024 / 1024:.2f} MB")
+    console.print(table)
+    return True
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Consolida os objetos soltos de .chromagit/packages em packs')
+    parser.add_argument('-a', '--all', action='store_true', help='Junta também os packs existentes em um único pack')
+
+    args = parser.parse_args()
+
+    success = repack({'all_packs': args.all})
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
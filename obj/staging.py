@@ -0,0 +1,26 @@
+# Funções para manipular o staging (config['staged'])
+#
+# Cada entrada do staging é o registro completo produzido pelo add
+# (path, hash, size, type, permissions, mtime_ns, ...). Configurações antigas
+# guardavam apenas o caminho; essas entradas viram registros sem hash e o
+# commit recalcula o hash delas.
+
+# Função para carregar o staging como dicionário caminho -> registro
+def load_staged(config):
+    records = {}
+    for entry in config.get('staged', []):
+        if isinstance(entry, str):
+            entry = {'path': entry}
+        records[entry['path']] = entry
+    return records
+
+# Função para gravar o staging no config em ordem determinística
+def save_staged(config, records):
+    config['staged'] = [records[path] for path in sorted(records)]
+    return config
+
+# Função para verificar se o arquivo mudou desde o add usando apenas o stat
+def is_modified_since_staged(record, file_stat):
+    if 'mtime_ns' not in record:
+        return False
+    return record['size'] != file_stat.st_size or record['mtime_ns'] != file_stat.st_mtime_ns
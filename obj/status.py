@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from collections import namedtuple
+from index import FileIndex
+from hashing import hash_files, repository_algorithm
+from staging import load_staged, is_modified_since_staged
+from journal import ensure_migrated, load_head_tree
+from walker import scan_files, stat_entry
+from lock import locked
+from ui import LazyConsole
+
+# Componentes do rich são importados nas funções que os usam (ver ui.py)
+console = LazyConsole()
+
+CHROMAGIT_DIR = '.chromagit'
+CONFIG_FILE = 'config.json'
+WATCH_DIR = 'watch'
+WORKTREE_CACHE = 'worktree.json'
+
+# Com o watcher em execução, o status guarda em .chromagit/watch/worktree.json a
+# lista de arquivos da área de trabalho (stat e hash já calculado) junto com a
+# posição do dirty.log a que ela corresponde. O próximo status relê apenas os
+# caminhos registrados depois dessa posição em vez de varrer o repositório.
+
+# Caches já carregados neste processo (daemon): {caminho: (stat do arquivo, posição, arquivos)}
+_worktrees = {}
+
+# Categorias na ordem de exibição: (chave, título, código do formato curto, cor)
+CATEGORIES = [
+    ('staged', 'Em staging', 'A', 'green'),
+    ('modified', 'Modificados', 'M', 'yellow'),
+    ('deleted', 'Removidos', 'D', 'red'),
+    ('untracked', 'Não rastreados', '?', 'magenta'),
+    ('unchanged', 'Sem alterações', ' ', 'dim'),
+]
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+# Stat mínimo guardado no cache da área de trabalho (compatível com FileIndex.lookup)
+CachedStat = namedtuple('CachedStat', 'st_size st_mtime_ns st_ino')
+
+def _scan_worktree(folder, repo_path, ignore_matcher):
+    files = {}
+    for entry in scan_files(folder, repo_path, ignore_matcher):
+        st = entry.stat
+        files[entry.rel_path] = [st.st_size, st.st_mtime_ns, st.st_ino, None]
+    return files
+
+# Função para converter chaves gravadas com '\\' (add no Windows, versões anteriores)
+# para o formato do walker, que usa '/' em qualquer sistema
+def _posix_keys(mapping):
+    if os.sep == '/':
+        return mapping
+    return {key.replace(os.sep, '/'): value for key, value in mapping.items()}
+
+def _file_key(path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+def _load_worktree_cache(chromagit_path):
+    cache_path = chromagit_path / WATCH_DIR / WORKTREE_CACHE
+    key = _file_key(cache_path)
+    if key is None:
+        return None
+    cached = _worktrees.get(str(cache_path))
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data['position'], data['files']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _save_worktree_cache(chromagit_path, position, files):
+    cache_path = chromagit_path / WATCH_DIR / WORKTREE_CACHE
+    temp_path = cache_path.with_name(f"{WORKTREE_CACHE}.tmp{os.getpid()}")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            # json.dumps usa o codificador em C; json.dump grava em pedaços pelo codificador em Python
+            f.write(json.dumps({'position': position, 'files': files}, separators=(',', ':')))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        return
+    _worktrees[str(cache_path)] = (_file_key(cache_path), position, files)
+
+# Função para obter os arquivos da área de trabalho, relendo só o que o watcher registrou
+def load_worktree(repo_path, ignore_matcher, use_watcher=True):
+    """Retorna (files, position, changed).
+
+    files mapeia caminho -> [tamanho, mtime_ns, inode, hash ou None]. position é
+    a posição do dirty.log a que files corresponde (None sem watcher) e changed
+    indica que o cache precisa ser regravado.
+    """
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    if not use_watcher:
+        return _scan_worktree(repo_path, repo_path, ignore_matcher), None, False
+
+    from watch import changes_since
+    cached = _load_worktree_cache(chromagit_path)
+    dirty, position = changes_since(chromagit_path, cached[0] if cached else None)
+    if position is None:
+        return _scan_worktree(repo_path, repo_path, ignore_matcher), None, False
+    if dirty is None or cached is None or '' in dirty.dirs:
+        # Eventos anteriores à sincronização já foram gravados: a varredura começa depois dela
+        return _scan_worktree(repo_path, repo_path, ignore_matcher), position, True
+
+    files = cached[1]
+    if not len(dirty):
+        return files, position, False
+
+    # Pastas criadas, removidas ou movidas são relidas por inteiro
+    if dirty.dirs:
+        prefixes = tuple(rel_dir + '/' for rel_dir in dirty.dirs)
+        for rel_path in [p for p in files if p.startswith(prefixes)]:
+            del files[rel_path]
+        for rel_dir in dirty.dirs:
+            folder = repo_path / rel_dir
+            if folder.is_dir() and not ignore_matcher.match(rel_dir, is_dir=True):
+                files.update(_scan_worktree(folder, repo_path, ignore_matcher))
+
+    for rel_path in dirty.files:
+        entry = stat_entry(repo_path / rel_path, repo_path)
+        if entry is None or not os.path.isfile(entry.path) or ignore_matcher.match(rel_path):
+            files.pop(rel_path, None)
+        else:
+            st = entry.stat
+            files[rel_path] = [st.st_size, st.st_mtime_ns, st.st_ino, None]
+    return files, position, True
+
+# Função para classificar os arquivos comparando área de trabalho, staging e último commit
+def collect_status(repo_path, options=None):
+    """Retorna {categoria: [caminhos]} com as categorias de CATEGORIES.
+
+    Com o watcher em execução, apenas os caminhos registrados desde o último
+    status são relidos. Sem ele a área de trabalho é varrida, e arquivos cujo stat
+    confere com o índice (.chromagit/index) são decididos sem ler o conteúdo.
+    Arquivos em staging que mudaram depois do add aparecem também em 'modified'.
+    """
+    from add import read_gitignore
+    options = options or {}
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    config = ensure_migrated(chromagit_path)
+    staged = _posix_keys(load_staged(config))
+    head = _posix_keys(load_head_tree(chromagit_path))
+    ignore_matcher = read_gitignore(repo_path)
+
+    worktree, position, changed = load_worktree(repo_path, ignore_matcher, options.get('use_watcher', True))
+
+    # Arquivos rastreados fora da varredura (removidos ou agora ignorados) são consultados direto
+    extra = {}
+    missing = []
+    for rel_path in set(head).union(staged).difference(worktree):
+        entry = stat_entry(repo_path / rel_path, repo_path)
+        if entry is not None and os.path.isfile(entry.path):
+            st = entry.stat
+            extra[rel_path] = [st.st_size, st.st_mtime_ns, st.st_ino, None]
+        else:
+            missing.append(rel_path)
+
+    result = {key: [] for key, _, _, _ in CATEGORIES}
+    result['deleted'] = missing
+    index = None
+    misses = []
+    try:
+        for files in (worktree, extra):
+            for rel_path, item in files.items():
+                record = staged.get(rel_path)
+                if record is not None:
+                    result['staged'].append(rel_path)
+                    if is_modified_since_staged(record, CachedStat(*item[:3])):
+                        result['modified'].append(rel_path)
+                    continue
+                head_hash = head.get(rel_path)
+                if head_hash is None:
+                    result['untracked'].append(rel_path)
+                    continue
+                file_hash = item[3]
+                if file_hash is None:
+                    # Índice carregado apenas se algum arquivo não tiver o hash no cache
+                    if index is None:
+                        index = FileIndex(chromagit_path)
+                    file_hash = index.lookup(rel_path, CachedStat(*item[:3]))
+                    if file_hash is None:
+                        misses.append((rel_path, item))
+                        continue
+                    item[3] = file_hash
+                    changed = True
+                if file_hash == head_hash:
+                    result['unchanged'].append(rel_path)
+                else:
+                    result['modified'].append(rel_path)
+
+        # Só o conteúdo de arquivos com stat diferente do índice é lido
+        if misses:
+            computed = hash_files([os.path.join(repo_path, rel_path) for rel_path, _ in misses],
+                                  sizes=[item[0] for _, item in misses],
+                                  workers=options.get('hash_workers'),
+                                  algorithm=repository_algorithm(config))
+            for (rel_path, item), file_hash in zip(misses, computed):
+                index.record(rel_path, CachedStat(*item[:3]), file_hash)
+                item[3] = file_hash
+                changed = True
+                if file_hash is not None and file_hash == head[rel_path]:
+                    result['unchanged'].append(rel_path)
+                else:
+                    result['modified'].append(rel_path)
+    finally:
+        if index is not None:
+            index.close()
+
+    if position is not None and changed:
+        _save_worktree_cache(chromagit_path, position, worktree)
+
+    for paths in result.values():
+        paths.sort()
+    return result
+
+# Função para exibir o status do repositório
+@locked(exclusive=False)
+def show_status(options=None):
+    options = options or {}
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        return False
+
+    if not (repo_path / CHROMAGIT_DIR / CONFIG_FILE).exists():
+        console.print('[red]Repositório não inicializado![/red]')
+        return False
+
+    result = collect_status(repo_path, options)
+    show_unchanged = options.get('show_unchanged', False)
+
+    # Formato curto: uma linha por arquivo, sem cores (ideal para scripts)
+    if options.get('short', False):
+        lines = []
+        for key, _, code, _ in CATEGORIES:
+            if key == 'unchanged' and not show_unchanged:
+                continue
+            lines.extend(f"{code} {path}\n" for path in result[key])
+        sys.stdout.write(''.join(lines))
+        sys.stdout.flush()
+        return True
+
+    from rich.panel import Panel
+
+    summary = []
+    for key, title, _, color in CATEGORIES:
+        summary.append(f"[{color}]{title}:[/{color}] {len(result[key])}")
+    console.print(Panel("\n".join(summary), title="Status do Repositório", border_style="blue"))
+
+    limit = options.get('limit')
+    modified = set(result['modified'])
+    for key, title, code, color in CATEGORIES:
+        paths = result[key]
+        if not paths or (key == 'unchanged' and not show_unchanged):
+            continue
+        console.print(f"\n[bold {color}]{title}:[/bold {color}]")
+        shown = paths if limit is None else paths[:limit]
+        for path in shown:
+            note = ' [dim](modificado após o add)[/dim]' if key == 'staged' and path in modified else ''
+            console.print(f"  [{color}]{code}[/{color}] {path}{note}")
+        if len(shown) < len(paths):
+            console.print(f"  [dim]... e mais {len(paths) - len(shown)} arquivos[/dim]")
+
+    if not any(result[key] for key in ('staged', 'modified', 'deleted', 'untracked')):
+        console.print('\n[green]Nada a commitar, área de trabalho limpa.[/green]')
+    return True
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Exibe arquivos não rastreados, modificados, em staging e removidos')
+    parser.add_argument('-s', '--short', action='store_true', help='Uma linha por arquivo, sem cores')
+    parser.add_argument('-u', '--unchanged', action='store_true', help='Lista também os arquivos sem alterações')
+    parser.add_argument('-n', '--limit', type=int, default=50, help='Máximo de arquivos listados por categoria (0 = todos)')
+    parser.add_argument('-w', '--workers', type=int, help='Número de threads para cálculo de hash')
+    parser.add_argument('--full-scan', action='store_true', help='Ignora o watcher e varre todas as pastas')
+
+    args = parser.parse_args()
+
+    options = {
+        'short': args.short,
+        'show_unchanged': args.unchanged,
+        'limit': args.limit or None,
+        'hash_workers': args.workers,
+        'use_watcher': not args.full_scan
+    }
+
+    try:
+        success = show_status(options)
+    except BrokenPipeError:
+        # Pager ou 'head' fechou a saída antes do fim; evita outro erro ao sair
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        success = True
+
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
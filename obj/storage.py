@@ -0,0 +1,366 @@
+import io
+import os
+import gzip
+import zlib
+import time
+import shutil
+from pathlib import Path
+from pack import find_packed, KIND_RAW, KIND_GZIP, KIND_DELTA, KIND_CHUNKED
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+PACKAGES_DIR = 'packages'
+FANOUT_LENGTH = 2  # Primeiros caracteres do hash usados como subpasta
+COMPRESSED_SUFFIX = '.gz'
+COPY_CHUNK = 1024 * 1024
+DELTA_SUFFIX = '.delta'
+DELTA_MAGIC = b'CGDELTA1'
+DELTA_HEADER_MAX = 256  # Magic, hash da base e três varints cabem com folga
+MAX_DELTA_DEPTH = 8  # Uma leitura aplica no máximo 8 deltas sobre um objeto completo
+DELTA_MIN_SIZE = 4 * 1024  # Arquivos menores são sempre gravados por inteiro
+DELTA_MAX_SIZE = 64 * 1024 * 1024  # Base e alvo ficam em memória ao calcular o delta
+DELTA_MAX_RATIO = 0.5  # O delta só é usado se ocupar menos da metade do arquivo
+CHUNKS_SUFFIX = '.chunks'
+CHUNKS_MAGIC = b'CGCHUNK1'
+CHUNKED_MIN_SIZE = DELTA_MAX_SIZE  # Arquivos acima do limite do delta são gravados em chunks
+
+# Objetos delta (packages/ab/cdef....delta) guardam uma versão como diferença
+# em relação a outro objeto (a versão anterior do mesmo arquivo):
+#   DELTA_MAGIC, <varint tamanho><hash da base>, <varint profundidade>,
+#   <varint tamanho do conteúdo>, operações do delta (delta.py) comprimidas com zlib
+# A profundidade é 1 + a da base (objetos completos têm profundidade 0); ao
+# passar de MAX_DELTA_DEPTH a nova versão é gravada por inteiro, o que mantém
+# as leituras rápidas.
+#
+# Arquivos a partir de CHUNKED_MIN_SIZE são divididos em chunks definidos pelo
+# conteúdo (chunking.py). Cada chunk é um objeto comum, endereçado pelo próprio
+# hash, e o arquivo vira uma lista de chunks (packages/ab/cdef....chunks):
+#   CHUNKS_MAGIC, <varint tamanho total>, <varint número de chunks> e, para cada
+#   chunk, <varint tamanho><varint tamanho do hash><hash>
+# Uma nova versão grava apenas os chunks que ainda não existem.
+#
+# Objetos podem estar soltos (um arquivo por objeto) ou consolidados em packs
+# pelo comando repack (pack.py); as funções de leitura procuram nos dois.
+
+# Função para obter o caminho de um objeto a partir do hash do conteúdo
+def object_path(packages_path, file_hash):
+    """Retorna packages/<2 primeiros caracteres>/<restante do hash>"""
+    return Path(packages_path) / file_hash[:FANOUT_LENGTH] / file_hash[FANOUT_LENGTH:]
+
+# Função para localizar um objeto solto já armazenado (comprimido, delta ou não)
+def find_object(packages_path, file_hash):
+    base = object_path(packages_path, file_hash)
+    for candidate in (base, base.with_name(base.name + COMPRESSED_SUFFIX),
+                      base.with_name(base.name + DELTA_SUFFIX),
+                      base.with_name(base.name + CHUNKS_SUFFIX)):
+        if candidate.exists():
+            return candidate
+    return None
+
+# Função para verificar se o conteúdo já existe no armazenamento (solto ou em pack)
+def has_object(packages_path, file_hash):
+    return (find_object(packages_path, file_hash) is not None
+            or find_packed(packages_path, file_hash) is not None)
+
+def _loose_kind(path):
+    if path.name.endswith(DELTA_SUFFIX):
+        return KIND_DELTA
+    if path.name.endswith(CHUNKS_SUFFIX):
+        return KIND_CHUNKED
+    if path.name.endswith(COMPRESSED_SUFFIX):
+        return KIND_GZIP
+    return KIND_RAW
+
+# Função para obter o conteúdo gravado de um objeto: (tipo, bytes ou fatia do pack)
+def _read_stored(packages_path, file_hash):
+    path = find_object(packages_path, file_hash)
+    if path is not None:
+        return _loose_kind(path), path.read_bytes()
+    packed = find_packed(packages_path, file_hash)
+    if packed is None:
+        raise FileNotFoundError(f"Objeto {file_hash} não encontrado")
+    pack, offset, length, kind = packed
+    return kind, pack.view(offset, length)
+
+def _write_atomic(dest, data):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    temp_dest = dest.with_name(f"{dest.name}.tmp{os.getpid()}")
+    try:
+        with open(temp_dest, 'wb') as f:
+            f.write(data)
+        os.replace(temp_dest, dest)
+    except Exception:
+        if temp_dest.exists():
+            temp_dest.unlink()
+        raise
+
+# Função para ler o cabeçalho de um objeto delta: (hash da base, profundidade, tamanho, início das operações)
+def _parse_delta_header(data):
+    from delta import read_varint
+    if bytes(data[:len(DELTA_MAGIC)]) != DELTA_MAGIC:
+        raise ValueError('Objeto delta inválido')
+    try:
+        length, position = read_varint(data, len(DELTA_MAGIC))
+        base_hash = bytes(data[position:position + length]).decode('ascii')
+        depth, position = read_varint(data, position + length)
+        size, position = read_varint(data, position)
+    except IndexError:
+        raise ValueError('Cabeçalho de delta truncado')
+    return base_hash, depth, size, position
+
+# Função para obter a profundidade da cadeia de deltas de um objeto (0 = completo)
+def object_depth(packages_path, file_hash):
+    path = find_object(packages_path, file_hash)
+    if path is not None:
+        if _loose_kind(path) != KIND_DELTA:
+            return 0
+        with open(path, 'rb') as f:
+            return _parse_delta_header(f.read(DELTA_HEADER_MAX))[1]
+    packed = find_packed(packages_path, file_hash)
+    if packed is None or packed[3] != KIND_DELTA:
+        return 0
+    pack, offset, length, _ = packed
+    return _parse_delta_header(pack.view(offset, min(length, DELTA_HEADER_MAX)))[1]
+
+# Função para ler a lista de chunks: [(hash, tamanho)]
+def _parse_chunks(data):
+    from delta import read_varint
+    if bytes(data[:len(CHUNKS_MAGIC)]) != CHUNKS_MAGIC:
+        raise ValueError('Lista de chunks inválida')
+    try:
+        total, position = read_varint(data, len(CHUNKS_MAGIC))
+        count, position = read_varint(data, position)
+        chunks = []
+        for _ in range(count):
+            size, position = read_varint(data, position)
+            length, position = read_varint(data, position)
+            chunks.append((bytes(data[position:position + length]).decode('ascii'), size))
+            position += length
+    except IndexError:
+        raise ValueError('Lista de chunks truncada')
+    if sum(size for _, size in chunks) != total:
+        raise ValueError('Lista de chunks corrompida: tamanho não confere')
+    return chunks
+
+# Função para obter os chunks de um objeto gravado em chunks (None para os demais objetos)
+def object_chunks(packages_path, file_hash):
+    path = find_object(packages_path, file_hash)
+    if path is not None:
+        return _parse_chunks(path.read_bytes()) if _loose_kind(path) == KIND_CHUNKED else None
+    packed = find_packed(packages_path, file_hash)
+    if packed is None or packed[3] != KIND_CHUNKED:
+        return None
+    pack, offset, length, _ = packed
+    return _parse_chunks(pack.view(offset, length))
+
+# Função para gravar um arquivo grande como lista de chunks
+def _store_chunked(source, packages_path, file_hash, level=None, algorithm=None):
+    """Grava só os chunks que ainda não existem; retorna (caminho da lista, bytes gravados)"""
+    from chunking import iter_chunks
+    from hashing import hash_bytes
+    chunks = []
+    written = 0
+    for data in iter_chunks(source):
+        chunk_hash = hash_bytes(data, algorithm)
+        chunks.append((chunk_hash, len(data)))
+        if has_object(packages_path, chunk_hash):
+            continue
+        dest = object_path(packages_path, chunk_hash)
+        if level is not None:
+            data = gzip.compress(data, compresslevel=level)
+            dest = dest.with_name(dest.name + COMPRESSED_SUFFIX)
+        _write_atomic(dest, data)
+        written += len(data)
+
+    manifest = _chunks_manifest(chunks)
+    dest = object_path(packages_path, file_hash)
+    dest = dest.with_name(dest.name + CHUNKS_SUFFIX)
+    _write_atomic(dest, manifest)
+    return dest, written + len(manifest)
+
+def _delta_header(base_hash, depth, size):
+    from delta import write_varint
+    header = bytearray(DELTA_MAGIC)
+    write_varint(header, len(base_hash))
+    header.extend(base_hash.encode('ascii'))
+    write_varint(header, depth)
+    write_varint(header, size)
+    return bytes(header)
+
+def _chunks_manifest(chunks):
+    from delta import write_varint
+    manifest = bytearray(CHUNKS_MAGIC)
+    write_varint(manifest, sum(size for _, size in chunks))
+    write_varint(manifest, len(chunks))
+    for chunk_hash, size in chunks:
+        write_varint(manifest, size)
+        write_varint(manifest, len(chunk_hash))
+        manifest.extend(chunk_hash.encode('ascii'))
+    return bytes(manifest)
+
+# Função para trocar os hashes referenciados por um objeto delta ou lista de chunks
+def remap_references(kind, data, mapping):
+    """Retorna o conteúdo gravado com cada hash referenciado trocado por mapping[hash]
+    (KeyError se faltar algum); objetos completos são retornados sem alteração"""
+    if kind == KIND_DELTA:
+        base_hash, depth, size, position = _parse_delta_header(data)
+        return _delta_header(mapping[base_hash], depth, size) + bytes(data[position:])
+    if kind == KIND_CHUNKED:
+        return _chunks_manifest([(mapping[chunk_hash], size) for chunk_hash, size in _parse_chunks(data)])
+    return data
+
+# Função para tentar gravar o conteúdo como delta da versão anterior
+def _store_delta(source, packages_path, file_hash, base_hash):
+    """Retorna o caminho do objeto delta, ou None se o objeto completo for melhor"""
+    from delta import create_delta
+    size = os.path.getsize(source)
+    if size < DELTA_MIN_SIZE or size > DELTA_MAX_SIZE:
+        return None
+    if not has_object(packages_path, base_hash) or object_chunks(packages_path, base_hash) is not None:
+        return None
+    depth = object_depth(packages_path, base_hash) + 1
+    if depth > MAX_DELTA_DEPTH:
+        return None
+
+    base = read_object(packages_path, base_hash)
+    if len(base) > DELTA_MAX_SIZE:
+        return None
+    with open(source, 'rb') as f:
+        target = f.read()
+    payload = zlib.compress(create_delta(base, target))
+    if len(payload) >= len(target) * DELTA_MAX_RATIO:
+        return None
+
+    dest = object_path(packages_path, file_hash)
+    dest = dest.with_name(dest.name + DELTA_SUFFIX)
+    _write_atomic(dest, _delta_header(base_hash, depth, len(target)) + payload)
+    return dest
+
+# Função para armazenar o conteúdo de um arquivo endereçado pelo hash
+def store_object(source, packages_path, file_hash, compress=False, base_hash=None, stats=None, algorithm=None):
+    """Grava o conteúdo uma única vez; retorna (caminho do objeto, se foi gravado agora).
+
+    Com `base_hash` (hash da versão anterior do mesmo arquivo), o conteúdo é
+    gravado como delta quando isso economiza mais da metade do espaço. Arquivos
+    a partir de CHUNKED_MIN_SIZE são gravados em chunks, e uma nova versão
+    grava só os chunks alterados. Com `compress`, a política de compression.py
+    decide se o arquivo é comprimido e em que nível; `stats` (CompressionStats)
+    acumula o resultado. `algorithm` é o algoritmo de hash do repositório,
+    usado para nomear os chunks.
+    """
+    existing = find_object(packages_path, file_hash)
+    if existing is not None:
+        return existing, False
+    packed = find_packed(packages_path, file_hash)
+    if packed is not None:
+        return packed[0].pack_path, False
+
+    if base_hash is not None and base_hash != file_hash:
+        dest = _store_delta(source, packages_path, file_hash, base_hash)
+        if dest is not None:
+            return dest, True
+
+    level = None
+    if compress:
+        from compression import choose_level
+        level = choose_level(source)
+        if level is None and stats is not None:
+            stats.skipped += 1
+
+    start = time.perf_counter()
+    size_in = os.path.getsize(source)
+    if size_in >= CHUNKED_MIN_SIZE:
+        dest, size_out = _store_chunked(source, packages_path, file_hash, level, algorithm)
+        if level is not None and stats is not None:
+            stats.record(size_in, size_out, time.perf_counter() - start)
+        return dest, True
+
+    dest = object_path(packages_path, file_hash)
+    if level is not None:
+        dest = dest.with_name(dest.name + COMPRESSED_SUFFIX)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    # Grava em arquivo temporário e renomeia para nunca deixar objeto parcial;
+    # a compressão acontece em blocos durante a cópia
+    temp_dest = dest.with_name(f"{dest.name}.tmp{os.getpid()}")
+    try:
+        with open(source, 'rb') as f_in:
+            if level is not None:
+                with gzip.open(temp_dest, 'wb', compresslevel=level) as f_out:
+                    shutil.copyfileobj(f_in, f_out, COPY_CHUNK)
+            else:
+                with open(temp_dest, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out, COPY_CHUNK)
+        os.replace(temp_dest, dest)
+    except Exception:
+        if temp_dest.exists():
+            temp_dest.unlink()
+        raise
+
+    if level is not None and stats is not None:
+        stats.record(size_in, dest.stat().st_size, time.perf_counter() - start)
+    return dest, True
+
+# Função para ler o conteúdo completo de um objeto, aplicando deltas se necessário
+def read_object(packages_path, file_hash):
+    from delta import apply_delta
+    # Percorre a cadeia até um objeto completo e aplica os deltas da base para o topo
+    chain = []
+    current = file_hash
+    kind, data = _read_stored(packages_path, current)
+    while kind == KIND_DELTA:
+        base_hash, _, size, position = _parse_delta_header(data)
+        chain.append((zlib.decompress(data[position:]), size))
+        if len(chain) > MAX_DELTA_DEPTH:
+            raise ValueError(f"Cadeia de deltas de {file_hash} excede {MAX_DELTA_DEPTH}")
+        current = base_hash
+        kind, data = _read_stored(packages_path, current)
+
+    if kind == KIND_CHUNKED:
+        data = b''.join(read_object(packages_path, chunk_hash) for chunk_hash, _ in _parse_chunks(data))
+    elif kind == KIND_GZIP:
+        data = gzip.decompress(data)
+    else:
+        data = bytes(data)
+    for ops, size in reversed(chain):
+        data = apply_delta(data, ops)
+        if len(data) != size:
+            raise ValueError(f"Delta de {file_hash} gerou tamanho inesperado")
+    return data
+
+class ChunkReader(io.RawIOBase):
+    """Leitura sequencial de um objeto em chunks, com um chunk em memória por vez"""
+
+    def __init__(self, packages_path, chunks):
+        self.packages_path = packages_path
+        self.chunks = iter(chunks)
+        self.current = b''
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.position >= len(self.current):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.current = read_object(self.packages_path, chunk[0])
+            self.position = 0
+        size = min(len(buffer), len(self.current) - self.position)
+        buffer[:size] = self.current[self.position:self.position + size]
+        self.position += size
+        return size
+
+# Função para abrir um objeto armazenado para leitura
+def open_object(packages_path, file_hash):
+    """Objetos soltos completos e em chunks são lidos em partes; os demais são reconstruídos em memória"""
+    path = find_object(packages_path, file_hash)
+    if path is not None and path.name.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, 'rb')
+    if path is not None and _loose_kind(path) == KIND_RAW:
+        return open(path, 'rb')
+    chunks = object_chunks(packages_path, file_hash)
+    if chunks is not None:
+        return io.BufferedReader(ChunkReader(packages_path, chunks), COPY_CHUNK)
+    return io.BytesIO(read_object(packages_path, file_hash))
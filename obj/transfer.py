@@ -0,0 +1,156 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_COPY_WORKERS = 8
+MAX_COPY_WORKERS = 64
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024  # 64MB
+COPY_BLOCK = 1024 * 1024
+
+class ByteBudget:
+    """Limita quantos bytes podem estar sendo copiados ao mesmo tempo"""
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.available = self.limit
+        self._condition = threading.Condition()
+
+    def _cost(self, size):
+        # Um arquivo maior que o limite ocupa o orçamento inteiro em vez de travar
+        return min(max(size, 1), self.limit)
+
+    def acquire(self, size):
+        cost = self._cost(size)
+        with self._condition:
+            while self.available < cost:
+                self._condition.wait()
+            self.available -= cost
+
+    def try_acquire(self, size):
+        cost = self._cost(size)
+        with self._condition:
+            if self.available < cost:
+                return False
+            self.available -= cost
+            return True
+
+    def release(self, size):
+        with self._condition:
+            self.available += self._cost(size)
+            self._condition.notify_all()
+
+class CopyJob:
+    """Arquivo a ser copiado; `key` identifica o arquivo para quem chamou.
+
+    Com `ranges` (lista de (offset, tamanho)), só esses trechos são copiados
+    sobre o destino existente, que depois é truncado no tamanho da origem; `size`
+    é então o total dos trechos.
+    """
+
+    __slots__ = ('key', 'source', 'dest', 'size', 'overwrite', 'ranges')
+
+    def __init__(self, key, source, dest, size, overwrite=False, ranges=None):
+        self.key = key
+        self.source = Path(source)
+        self.dest = Path(dest)
+        self.size = size
+        self.overwrite = overwrite
+        self.ranges = ranges
+
+# Função para criar de uma vez todas as pastas de destino
+def ensure_directories(directories):
+    """Cria cada pasta distinta uma única vez; retorna {pasta: erro} das que falharam"""
+    errors = {}
+    created = set()
+    for directory in sorted({Path(d) for d in directories}, key=lambda p: len(p.parts)):
+        if directory in created:
+            continue
+        if directory.parent in errors:
+            errors[directory] = errors[directory.parent]
+            continue
+        try:
+            if directory.parent in created:
+                directory.mkdir(exist_ok=True)
+            else:
+                directory.mkdir(parents=True, exist_ok=True)
+            created.add(directory)
+        except OSError as e:
+            errors[directory] = e
+    return errors
+
+def _copy_one(job):
+    # Remove atributos de somente leitura no destino (Windows)
+    if os.name == 'nt' and job.overwrite:
+        os.system(f'attrib -r -h "{job.dest}"')
+    if job.ranges is None:
+        shutil.copy2(job.source, job.dest)
+        return job.dest.stat()
+
+    with open(job.source, 'rb') as f_in, open(job.dest, 'r+b') as f_out:
+        for offset, length in job.ranges:
+            f_in.seek(offset)
+            f_out.seek(offset)
+            while length > 0:
+                block = f_in.read(min(length, COPY_BLOCK))
+                if not block:
+                    break
+                f_out.write(block)
+                length -= len(block)
+        f_out.truncate(os.fstat(f_in.fileno()).st_size)
+    shutil.copystat(job.source, job.dest)
+    return job.dest.stat()
+
+# Função para copiar vários arquivos em paralelo
+def copy_files(jobs, workers=None, max_inflight_bytes=None, on_complete=None):
+    """Copia os arquivos com um pool de threads e bytes em trânsito limitados.
+
+    on_complete(job, dest_stat, error) é chamado na thread de quem chamou, um
+    arquivo por vez, então contadores atualizados ali não precisam de lock.
+    Um erro em um arquivo não interrompe os demais.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = max(1, min(workers or DEFAULT_COPY_WORKERS, MAX_COPY_WORKERS, len(jobs)))
+    budget = ByteBudget(max_inflight_bytes or DEFAULT_MAX_INFLIGHT_BYTES)
+
+    # As pastas de destino são criadas em lote antes das cópias
+    dir_errors = ensure_directories(job.dest.parent for job in jobs)
+
+    def finish(job, dest_stat, error):
+        if on_complete:
+            on_complete(job, dest_stat, error)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        queue = iter(jobs)
+        next_job = next(queue, None)
+
+        while next_job is not None or pending:
+            # Enfileira enquanto houver orçamento de bytes (ou nada em andamento)
+            while next_job is not None:
+                if next_job.dest.parent in dir_errors:
+                    finish(next_job, None, dir_errors[next_job.dest.parent])
+                    next_job = next(queue, None)
+                    continue
+                if pending and (len(pending) >= workers * 2 or not budget.try_acquire(next_job.size)):
+                    break
+                if not pending:
+                    budget.acquire(next_job.size)
+                pending[executor.submit(_copy_one, next_job)] = next_job
+                next_job = next(queue, None)
+
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                budget.release(job.size)
+                try:
+                    dest_stat, error = future.result(), None
+                except Exception as e:
+                    dest_stat, error = None, e
+                finish(job, dest_stat, error)
@@ -0,0 +1,26 @@
+class LazyConsole:
+    """Console do rich criado apenas na primeira saída formatada.
+
+    Importar rich.console custa dezenas de milissegundos; comandos que não
+    imprimem nada formatado (ex: log --oneline) não pagam esse custo.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._console = None
+
+    def get(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(**self._kwargs)
+        return self._console
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    # Métodos especiais não passam por __getattr__ (usados por Progress/Live)
+    def __enter__(self):
+        return self.get().__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.get().__exit__(*exc_info)
@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+class FileEntry:
+    """Arquivo encontrado na varredura, com o stat obtido uma única vez.
+
+    O Path é criado apenas quando usado: em varreduras grandes que só comparam
+    stat (status), construir um Path por arquivo domina o tempo total.
+    """
+
+    __slots__ = ('_path', 'rel_path', 'stat')
+
+    def __init__(self, path, rel_path, stat):
+        self._path = path
+        self.rel_path = rel_path
+        self.stat = stat
+
+    @property
+    def path(self):
+        if not isinstance(self._path, Path):
+            self._path = Path(self._path)
+        return self._path
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+# Função para criar a entrada de um arquivo informado explicitamente
+def stat_entry(path, repo_path):
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return FileEntry(path, path.relative_to(repo_path).as_posix(), st)
+
+# Função para percorrer uma pasta com os.scandir sem descer em pastas ignoradas
+def scan_files(folder, repo_path, ignore_matcher=None, errors=None):
+    """Gera FileEntry para cada arquivo; o tipo vem do próprio scandir (sem stat extra).
+
+    Links simbólicos para pastas não são seguidos. Pastas que não podem ser lidas
+    são registradas em `errors` (se informado) e a varredura continua.
+    """
+    folder = Path(folder)
+    repo_path = Path(repo_path)
+    start = folder.relative_to(repo_path).as_posix()
+    stack = [(str(folder), '' if start == '.' else start)]
+
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError as e:
+            if errors is not None:
+                errors.append((rel_dir or '.', e))
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if ignore_matcher is None or not ignore_matcher.match_entry(rel_path, is_dir=True):
+                        subdirs.append((entry.path, rel_path))
+                    continue
+                if not entry.is_file():
+                    continue
+                if ignore_matcher is not None and ignore_matcher.match_entry(rel_path):
+                    continue
+                yield FileEntry(entry.path, rel_path, entry.stat())
+            except OSError as e:
+                if errors is not None:
+                    errors.append((rel_path, e))
+
+        # Empilha em ordem inversa para visitar as pastas em ordem alfabética
+        subdirs.sort(reverse=True)
+        stack.extend(subdirs)
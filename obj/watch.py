@@ -0,0 +1,657 @@
+import os
+import sys
+import json
+import time
+import errno
+import select
+import signal
+import struct
+import argparse
+import subprocess
+from pathlib import Path
+from ui import LazyConsole
+
+console = LazyConsole()
+
+# Constantes compatíveis com add.py
+CHROMAGIT_DIR = '.chromagit'
+GITIGNORE_FILE = '.gitignore'
+WATCH_DIR = 'watch'
+DIRTY_LOG = 'dirty.log'
+CHECKPOINT_FILE = 'checkpoint'
+PID_FILE = 'watch.pid'
+COOKIES_DIR = 'cookies'
+OVERFLOW_MARKER = '!overflow'  # Fila do inotify estourou: eventos foram perdidos
+RESCAN_MARKER = '!rescan'      # Watcher (re)iniciado ou .gitignore alterado
+SYNC_MARKER = '!sync'
+FLUSH_INTERVAL = 0.1
+POLL_INTERVAL = 2.0
+SYNC_TIMEOUT = 2.0
+START_TIMEOUT = 5.0
+ROTATE_SIZE = 1024 * 1024  # Reinicia o dirty.log quando os consumidores já leram tudo
+
+# O watcher registra em .chromagit/watch/dirty.log, uma linha por caminho, tudo
+# que mudou no repositório ('pasta/' significa que a pasta inteira deve ser
+# relida). O arquivo checkpoint guarda até onde o último `add` do repositório
+# inteiro já consumiu o log e os arquivos que esse add deixou de fora (binários
+# sem -b, arquivos já em staging mantidos por um conflito), que continuam no
+# conjunto até serem adicionados. Linhas de marcador (!overflow, !rescan) depois
+# do checkpoint invalidam o conjunto e forçam uma varredura completa. O status
+# guarda sua própria posição no log (inode, offset); quando o log é reiniciado
+# ele é substituído por um arquivo novo, o que invalida essas posições.
+#
+# Para não perder eventos ainda não gravados, quem consulta cria um "cookie" em
+# watch/cookies/ e espera o watcher escrever '!sync <cookie>' no log: como os
+# eventos chegam em ordem, tudo que mudou antes do cookie já está gravado.
+
+# Flags do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+EVENT_HEADER = struct.Struct('iIII')
+
+def find_repo_root(start_path=None):
+    if start_path is None:
+        start_path = Path.cwd()
+    else:
+        start_path = Path(start_path)
+
+    current = start_path
+    while current != current.parent:
+        chromagit_path = current / CHROMAGIT_DIR
+        if chromagit_path.exists() and chromagit_path.is_dir():
+            return current
+        current = current.parent
+
+    return None
+
+def _watch_path(chromagit_path):
+    return Path(chromagit_path) / WATCH_DIR
+
+def _read_pid_info(chromagit_path):
+    try:
+        with open(_watch_path(chromagit_path) / PID_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# Função para verificar se há um watcher em execução para o repositório
+def watcher_alive(chromagit_path):
+    info = _read_pid_info(chromagit_path)
+    if info is None or os.name != 'posix':
+        return None
+    try:
+        os.kill(info['pid'], 0)
+    except (OSError, KeyError, TypeError):
+        return None
+    return info
+
+def _read_checkpoint(chromagit_path):
+    try:
+        with open(_watch_path(chromagit_path) / CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data['offset'], data.get('pending', [])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None, []
+
+def load_checkpoint(chromagit_path):
+    return _read_checkpoint(chromagit_path)[0]
+
+# Função para ler os arquivos deixados de fora pelo último add
+def load_pending(chromagit_path):
+    return _read_checkpoint(chromagit_path)[1]
+
+# Função para gravar até onde o dirty.log já foi consumido
+def save_checkpoint(chromagit_path, offset, pending=None):
+    """pending são os caminhos já lidos do log que ainda não entraram no staging"""
+    watch_path = _watch_path(chromagit_path)
+    temp_path = watch_path / f"{CHECKPOINT_FILE}.tmp{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'offset': offset, 'pending': sorted(pending or [])}, f)
+    os.replace(temp_path, watch_path / CHECKPOINT_FILE)
+
+# Função para esperar o watcher gravar todos os eventos pendentes
+def sync_watcher(chromagit_path, timeout=SYNC_TIMEOUT):
+    """Retorna a posição do log logo após o marcador de sincronização, ou None"""
+    watch_path = _watch_path(chromagit_path)
+    log_path = watch_path / DIRTY_LOG
+    try:
+        start = log_path.stat().st_size
+    except FileNotFoundError:
+        return None
+    token = f"{os.getpid()}_{time.time_ns()}"
+    needle = f"{SYNC_MARKER} {token}\n".encode('utf-8')
+    cookie = watch_path / COOKIES_DIR / token
+    try:
+        cookie.touch()
+    except OSError:
+        return None
+
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with open(log_path, 'rb') as f:
+                if f.seek(0, os.SEEK_END) < start:
+                    return None  # Log reiniciado durante a espera
+                f.seek(start)
+                data = f.read()
+            position = data.find(needle)
+            if position != -1:
+                return start + position + len(needle)
+            time.sleep(0.01)
+        return None
+    finally:
+        try:
+            cookie.unlink()
+        except OSError:
+            pass
+
+class DirtySet:
+    """Caminhos alterados desde o checkpoint: arquivos e pastas a reler por inteiro"""
+
+    __slots__ = ('files', 'dirs', 'offset')
+
+    def __init__(self, files, dirs, offset):
+        self.files = files
+        self.dirs = dirs
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.files) + len(self.dirs)
+
+def _read_dirty(log_path, start, end):
+    with open(log_path, 'rb') as f:
+        f.seek(start)
+        return _parse_dirty(f.read(end - start))
+
+def _parse_dirty(data):
+    files, dirs = set(), set()
+    for raw in data.decode('utf-8', errors='replace').splitlines():
+        if raw.startswith('!'):
+            if raw.startswith(SYNC_MARKER):
+                continue
+            return None  # Overflow ou reinício: o conjunto não é confiável
+        if raw.endswith('/'):
+            dirs.add(raw.rstrip('/'))
+        elif raw:
+            files.add(raw)
+    return files, dirs
+
+# Função usada por add/status para obter o que mudou desde o último checkpoint
+def snapshot(chromagit_path):
+    """Retorna (dirty, offset).
+
+    dirty é um DirtySet, ou None quando é preciso varrer o repositório inteiro.
+    offset é a posição a gravar com save_checkpoint depois de processar o
+    repositório inteiro, ou None quando não há watcher confiável.
+    """
+    if not watcher_alive(chromagit_path):
+        return None, None
+    offset = sync_watcher(chromagit_path)
+    if offset is None:
+        return None, None
+    checkpoint, pending = _read_checkpoint(chromagit_path)
+    if checkpoint is None or checkpoint > offset:
+        return None, offset
+    result = _read_dirty(_watch_path(chromagit_path) / DIRTY_LOG, checkpoint, offset)
+    if result is None:
+        return None, offset
+    result[0].update(pending)
+    return DirtySet(result[0], result[1], offset), offset
+
+# Função usada pelo status para obter o que mudou desde uma posição do log
+def changes_since(chromagit_path, since=None):
+    """Retorna (dirty, position).
+
+    position ([inode, offset] do dirty.log) marca o ponto atual do log e é None
+    quando não há watcher confiável. dirty é None quando `since` não pertence ao
+    log atual (primeira consulta, log reiniciado) ou o intervalo tem marcadores.
+    """
+    if not watcher_alive(chromagit_path):
+        return None, None
+    offset = sync_watcher(chromagit_path)
+    if offset is None:
+        return None, None
+    try:
+        with open(_watch_path(chromagit_path) / DIRTY_LOG, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if st.st_size < offset:
+                return None, None  # Log reiniciado depois da sincronização
+            position = [st.st_ino, offset]
+            if not since or since[0] != st.st_ino or since[1] > offset:
+                return None, position
+            f.seek(since[1])
+            data = f.read(offset - since[1])
+    except OSError:
+        return None, None
+    result = _parse_dirty(data)
+    if result is None:
+        return None, position
+    return DirtySet(result[0], result[1], offset), position
+
+# Função para listar os arquivos alterados dentro de uma pasta
+def iter_dirty_entries(dirty, folder, repo_path, ignore_matcher=None):
+    """Gera FileEntry dos arquivos alterados em `folder`, relendo as pastas marcadas por inteiro"""
+    from walker import scan_files, stat_entry
+    repo_path = Path(repo_path)
+    prefix = Path(folder).relative_to(repo_path).as_posix()
+    prefix = '' if prefix == '.' else prefix + '/'
+    seen = set()
+
+    for rel_dir in sorted(dirty.dirs):
+        if (rel_dir + '/').startswith(prefix):
+            target = rel_dir
+        elif prefix.startswith(rel_dir + '/') or rel_dir == '':
+            # Pasta marcada contém a pasta pedida: relê apenas a pasta pedida
+            target = prefix.rstrip('/')
+        else:
+            continue
+        target_path = repo_path / target
+        if not target_path.is_dir():
+            continue
+        if target and ignore_matcher is not None and ignore_matcher.match(target, is_dir=True):
+            continue
+        for entry in scan_files(target_path, repo_path, ignore_matcher):
+            if entry.rel_path not in seen:
+                seen.add(entry.rel_path)
+                yield entry
+
+    for rel_path in sorted(dirty.files):
+        if rel_path in seen or not rel_path.startswith(prefix):
+            continue
+        if ignore_matcher is not None and ignore_matcher.match(rel_path):
+            continue
+        entry = stat_entry(repo_path / rel_path, repo_path)
+        if entry is not None and os.path.isfile(entry.path):
+            seen.add(rel_path)
+            yield entry
+
+class Watcher:
+    """Processo que observa o repositório e grava os caminhos alterados no dirty.log"""
+
+    def __init__(self, repo_path):
+        self.repo_path = Path(repo_path).resolve()
+        self.chromagit_path = self.repo_path / CHROMAGIT_DIR
+        self.watch_path = _watch_path(self.chromagit_path)
+        self.cookies_path = self.watch_path / COOKIES_DIR
+        self.log_path = self.watch_path / DIRTY_LOG
+        self.cookies_path.mkdir(parents=True, exist_ok=True)
+        self.log_file = open(self.log_path, 'a', encoding='utf-8')
+        self.pending = set()
+        self.written = set()
+        self.checkpoint_seen = None
+        self.running = False
+        self.mode = None
+        self.matcher = None
+        self.load_matcher()
+
+    def load_matcher(self):
+        from add import read_gitignore
+        self.matcher = read_gitignore(self.repo_path)
+
+    def ignored(self, rel_path, is_dir=False):
+        return rel_path == CHROMAGIT_DIR or self.matcher.match(rel_path, is_dir=is_dir)
+
+    def mark(self, rel_path):
+        self.pending.add(rel_path)
+
+    def write_marker(self, marker):
+        self.flush()
+        self.log_file.write(marker + '\n')
+        self.log_file.flush()
+        self.written.clear()
+
+    def flush(self):
+        # Caminhos já gravados desde a última sincronização não são repetidos
+        checkpoint = load_checkpoint(self.chromagit_path)
+        if checkpoint != self.checkpoint_seen:
+            self.checkpoint_seen = checkpoint
+            self.rotate_if_consumed(checkpoint)
+        lines = sorted(self.pending - self.written)
+        self.pending.clear()
+        if lines:
+            self.log_file.write(''.join(f"{line}\n" for line in lines))
+            self.log_file.flush()
+            self.written.update(lines)
+
+    def rotate_if_consumed(self, checkpoint):
+        if checkpoint is None or checkpoint < ROTATE_SIZE:
+            return
+        if checkpoint != self.log_file.tell() or self.pending:
+            return
+        # Um arquivo novo (outro inode) invalida as posições guardadas do log antigo
+        temp_path = self.watch_path / f"{DIRTY_LOG}.tmp{os.getpid()}"
+        with open(temp_path, 'w', encoding='utf-8'):
+            pass
+        os.replace(temp_path, self.log_path)
+        self.log_file.close()
+        self.log_file = open(self.log_path, 'a', encoding='utf-8')
+        save_checkpoint(self.chromagit_path, 0, load_pending(self.chromagit_path))
+        self.checkpoint_seen = 0
+
+    def answer_cookie(self, token):
+        self.flush()
+        self.log_file.write(f"{SYNC_MARKER} {token}\n")
+        self.log_file.flush()
+        # Um consumidor pode gravar o checkpoint aqui; o que mudar depois precisa ser regravado
+        self.written.clear()
+
+    def gitignore_changed(self):
+        self.load_matcher()
+        self.write_marker(RESCAN_MARKER)
+
+    def write_pid(self):
+        info = {'pid': os.getpid(), 'mode': self.mode, 'started_at': time.time()}
+        with open(self.watch_path / PID_FILE, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+
+    def remove_pid(self):
+        info = _read_pid_info(self.chromagit_path)
+        if info and info.get('pid') == os.getpid():
+            try:
+                (self.watch_path / PID_FILE).unlink()
+            except OSError:
+                pass
+
+    def run(self):
+        """Observa com inotify quando disponível, senão por varredura periódica"""
+        def stop(signum, frame):
+            self.running = False
+        signal.signal(signal.SIGTERM, stop)
+
+        self.running = True
+        backend = None
+        if sys.platform.startswith('linux'):
+            try:
+                backend = InotifyBackend(self)
+                backend.start()
+            except OSError:
+                if backend is not None:
+                    backend.close()
+                backend = None
+        if backend is None:
+            backend = PollingBackend(self)
+            backend.start()
+        self.mode = backend.name
+        try:
+            self.write_pid()
+            # Eventos anteriores a este ponto podem ter sido perdidos
+            self.write_marker(RESCAN_MARKER)
+            backend.loop()
+        finally:
+            self.flush()
+            backend.close()
+            self.log_file.close()
+            self.remove_pid()
+
+class InotifyBackend:
+    name = 'inotify'
+
+    def __init__(self, watcher):
+        import ctypes
+        import ctypes.util
+        self.watcher = watcher
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 falhou')
+        self.get_errno = ctypes.get_errno
+        self.dirs = {}
+        self.cookie_wd = None
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(path)), WATCH_MASK)
+        if wd < 0:
+            error = self.get_errno()
+            if error == errno.ENOSPC:
+                # Limite de fs.inotify.max_user_watches atingido
+                raise OSError(error, 'limite de watches do inotify atingido')
+            return None
+        return wd
+
+    # Observa uma pasta e todas as subpastas não ignoradas
+    def add_tree(self, rel_dir):
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            wd = self.add_watch(self.watcher.repo_path / current if current else self.watcher.repo_path)
+            if wd is None:
+                continue
+            self.dirs[wd] = current
+            try:
+                with os.scandir(self.watcher.repo_path / current) as it:
+                    for entry in it:
+                        rel_path = f"{current}/{entry.name}" if current else entry.name
+                        if entry.is_dir(follow_symlinks=False) and not self.watcher.ignored(rel_path, is_dir=True):
+                            stack.append(rel_path)
+            except OSError:
+                continue
+
+    def start(self):
+        self.add_tree('')
+        self.cookie_wd = self.add_watch(self.watcher.cookies_path)
+
+    def rewatch(self):
+        for wd in list(self.dirs):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.dirs.clear()
+        self.add_tree('')
+
+    def handle(self, wd, mask, name):
+        watcher = self.watcher
+        if mask & IN_Q_OVERFLOW:
+            watcher.write_marker(OVERFLOW_MARKER)
+            self.rewatch()
+            return
+        if wd == self.cookie_wd:
+            if mask & IN_CREATE and name:
+                watcher.answer_cookie(name)
+            return
+        rel_dir = self.dirs.get(wd)
+        if rel_dir is None:
+            return
+        if mask & IN_IGNORED:
+            del self.dirs[wd]
+            return
+        if not name:
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) and rel_dir == '':
+                watcher.running = False  # Raiz do repositório removida ou movida
+            return
+
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        if rel_path == GITIGNORE_FILE:
+            watcher.gitignore_changed()
+        if mask & IN_ISDIR:
+            if watcher.ignored(rel_path, is_dir=True):
+                return
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_tree(rel_path)
+                watcher.mark(rel_path + '/')
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                watcher.mark(rel_path + '/')
+            return
+        if not watcher.ignored(rel_path):
+            watcher.mark(rel_path)
+
+    def loop(self):
+        while self.watcher.running:
+            try:
+                readable, _, _ = select.select([self.fd], [], [], FLUSH_INTERVAL)
+            except InterruptedError:
+                continue
+            if not readable:
+                self.watcher.flush()
+                continue
+            data = os.read(self.fd, 64 * 1024)
+            position = 0
+            while position + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, position)
+                position += EVENT_HEADER.size
+                name = data[position:position + length].rstrip(b'\0').decode('utf-8', errors='surrogateescape')
+                position += length
+                self.handle(wd, mask, name)
+            self.watcher.flush()
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingBackend:
+    """Alternativa sem inotify: compara o stat de todos os arquivos a cada POLL_INTERVAL"""
+
+    name = 'poll'
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.files = {}
+        self.gitignore_key = None
+        self.answered = set()
+
+    def scan(self):
+        from walker import scan_files
+        repo_path = self.watcher.repo_path
+        return {entry.rel_path: (entry.stat.st_size, entry.stat.st_mtime_ns, entry.stat.st_ino)
+                for entry in scan_files(repo_path, repo_path, self.watcher.matcher)
+                if not entry.rel_path.startswith(CHROMAGIT_DIR + '/')}
+
+    def read_gitignore_key(self):
+        try:
+            st = (self.watcher.repo_path / GITIGNORE_FILE).stat()
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self):
+        self.gitignore_key = self.read_gitignore_key()
+        self.files = self.scan()
+
+    def poll(self):
+        key = self.read_gitignore_key()
+        if key != self.gitignore_key:
+            self.gitignore_key = key
+            self.watcher.gitignore_changed()
+        current = self.scan()
+        for rel_path, state in current.items():
+            if self.files.get(rel_path) != state:
+                self.watcher.mark(rel_path)
+        for rel_path in self.files.keys() - current.keys():
+            self.watcher.mark(rel_path)
+        self.files = current
+        self.watcher.flush()
+
+    def loop(self):
+        next_poll = time.monotonic() + POLL_INTERVAL
+        while self.watcher.running:
+            try:
+                cookies = set(os.listdir(self.watcher.cookies_path))
+            except OSError:
+                cookies = set()
+            new_cookies = sorted(cookies - self.answered)
+            self.answered &= cookies
+            # Um cookie novo exige uma varredura antes da resposta
+            if new_cookies or time.monotonic() >= next_poll:
+                self.poll()
+                next_poll = time.monotonic() + POLL_INTERVAL
+            for token in new_cookies:
+                self.watcher.answer_cookie(token)
+                self.answered.add(token)
+            time.sleep(FLUSH_INTERVAL)
+
+    def close(self):
+        pass
+
+# Função para iniciar o watcher em segundo plano
+def start_watcher(repo_path):
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    if watcher_alive(chromagit_path):
+        console.print('[yellow]Watcher já está em execução para este repositório.[/yellow]')
+        return True
+
+    if getattr(sys, 'frozen', False):
+        cmd = [sys.executable, 'run']
+    else:
+        cmd = [sys.executable, str(Path(__file__).resolve()), 'run']
+    subprocess.Popen(cmd, cwd=str(repo_path), stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        info = watcher_alive(chromagit_path)
+        if info:
+            console.print(f"[green]Watcher iniciado (pid {info['pid']}, modo {info['mode']}).[/green]")
+            console.print('[dim]O próximo add do repositório inteiro faz uma varredura completa.[/dim]')
+            return True
+        time.sleep(0.05)
+    console.print('[red]Watcher não iniciou a tempo.[/red]')
+    return False
+
+def show_watcher_status(repo_path):
+    chromagit_path = repo_path / CHROMAGIT_DIR
+    info = watcher_alive(chromagit_path)
+    if not info:
+        console.print('[yellow]Watcher não está em execução.[/yellow]')
+        return False
+    console.print(f"[green]Watcher em execução[/green] (pid {info['pid']}, modo {info['mode']})")
+    dirty, _ = snapshot(chromagit_path)
+    if dirty is None:
+        console.print('[yellow]Próximo add fará uma varredura completa.[/yellow]')
+    else:
+        console.print(f"[blue]{len(dirty)} caminhos alterados desde o último add.[/blue]")
+    return True
+
+# Função para linha de comando
+def main():
+    parser = argparse.ArgumentParser(description='Observa o repositório e registra os arquivos alterados')
+    parser.add_argument('action', nargs='?', default='start', choices=['start', 'stop', 'status', 'run'],
+                        help='start (segundo plano), run (primeiro plano), stop ou status')
+
+    args = parser.parse_args()
+
+    if os.name != 'posix':
+        console.print('[red]O watcher requer um sistema POSIX (Linux usa inotify; outros, varredura periódica).[/red]')
+        sys.exit(1)
+
+    repo_path = find_repo_root()
+    if repo_path is None:
+        console.print('[red]Repositório ChromaGit não encontrado![/red]')
+        sys.exit(1)
+    chromagit_path = repo_path / CHROMAGIT_DIR
+
+    if args.action == 'start':
+        success = start_watcher(repo_path)
+    elif args.action == 'status':
+        success = show_watcher_status(repo_path)
+    elif args.action == 'stop':
+        info = watcher_alive(chromagit_path)
+        success = bool(info)
+        if info:
+            os.kill(info['pid'], signal.SIGTERM)
+            console.print('[green]Watcher encerrado.[/green]')
+        else:
+            console.print('[yellow]Watcher não está em execução.[/yellow]')
+    else:
+        if watcher_alive(chromagit_path):
+            console.print('[red]Watcher já está em execução para este repositório.[/red]')
+            sys.exit(1)
+        Watcher(repo_path).run()
+        success = True
+
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
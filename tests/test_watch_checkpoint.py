@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import json
+import contextlib
+from pathlib import Path
+
+import pytest
+
+# Os módulos de obj/ importam uns aos outros pelo nome (ex: from journal import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "obj"))
+
+import watch
+from init import init
+from add import add, load_staged
+
+# Repositório com um watcher "vivo" (o próprio processo) e o dirty.log escrito pelo teste
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        init(str(tmp_path))
+    watch_path = tmp_path / '.chromagit' / watch.WATCH_DIR
+    watch_path.mkdir(exist_ok=True)
+    (watch_path / watch.PID_FILE).write_text(json.dumps({'pid': os.getpid()}), encoding='utf-8')
+    (watch_path / watch.DIRTY_LOG).write_text('', encoding='utf-8')
+    watch.save_checkpoint(tmp_path / '.chromagit', 0)
+    # Sem watcher real, a sincronização devolve o fim atual do log
+    monkeypatch.setattr(watch, 'sync_watcher',
+                        lambda chromagit_path, timeout=None: (watch_path / watch.DIRTY_LOG).stat().st_size)
+    return tmp_path
+
+def _touch(repo, rel_path, data):
+    (repo / rel_path).write_bytes(data)
+    with open(repo / '.chromagit' / watch.WATCH_DIR / watch.DIRTY_LOG, 'a', encoding='utf-8') as f:
+        f.write(f"{rel_path}\n")
+
+def _add(options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return add(['.'], options)
+
+def _staged(repo):
+    with open(repo / '.chromagit' / 'config.json', 'r', encoding='utf-8') as f:
+        return load_staged(json.load(f))
+
+def test_skipped_binary_stays_dirty_after_checkpoint(repo):
+    _touch(repo, 'a.txt', b'texto\n')
+    _touch(repo, 'b.dat', b'\x00\x01\x02' * 100)
+
+    assert _add({})
+    assert set(_staged(repo)) == {'a.txt'}
+    assert watch.load_pending(repo / '.chromagit') == ['b.dat']
+
+    dirty, _ = watch.snapshot(repo / '.chromagit')
+    assert dirty is not None and 'b.dat' in dirty.files
+
+    assert _add({'include_binary': True, 'force_conflicts': True})
+    assert set(_staged(repo)) == {'a.txt', 'b.dat'}
+    assert watch.load_pending(repo / '.chromagit') == []
+
+def test_old_checkpoint_without_pending(repo):
+    checkpoint = repo / '.chromagit' / watch.WATCH_DIR / watch.CHECKPOINT_FILE
+    checkpoint.write_text(json.dumps({'offset': 0}), encoding='utf-8')
+    assert watch.load_checkpoint(repo / '.chromagit') == 0
+    assert watch.load_pending(repo / '.chromagit') == []